@@ -2,22 +2,52 @@ from cc3d import CompuCellSetup
 
 from mitosis_O2Steppables import (
 	OxygenInitSteppable,
+	QuasiSteadyOxygenSteppable,
 	SingleCellInitSteppable,
 	O2DrivenFateSteppable,
 	O2MitosisSteppable,
 	RadiotherapySteppable,
 	CenterCompactionSteppable,
-	LightAnalysisSteppable
+	RadialProfileSteppable,
+	LightAnalysisSteppable,
+	EventLogSteppable,
+	ActiveBoxSteppable,
+	FieldExportSteppable,
+	CadenceSteppable,
+	CheckpointSteppable,
+	ProfilingSteppable
 )
 
 # All steppables now get frequencies from XML parameters internally
 # Initialization runs once at start
-CompuCellSetup.register_steppable(OxygenInitSteppable(frequency=1))
-CompuCellSetup.register_steppable(SingleCellInitSteppable(frequency=1))
-CompuCellSetup.register_steppable(O2DrivenFateSteppable(frequency=5))
-CompuCellSetup.register_steppable(O2MitosisSteppable(frequency=1))
-CompuCellSetup.register_steppable(RadiotherapySteppable(frequency=1))
-CompuCellSetup.register_steppable(CenterCompactionSteppable(frequency=1))
-CompuCellSetup.register_steppable(LightAnalysisSteppable())
+radiotherapy = RadiotherapySteppable(frequency=1)
+steppables = [
+	OxygenInitSteppable(frequency=1),
+	SingleCellInitSteppable(frequency=1),
+	QuasiSteadyOxygenSteppable(frequency=1),
+	O2DrivenFateSteppable(frequency=5),
+	O2MitosisSteppable(frequency=1),
+	radiotherapy,
+	CenterCompactionSteppable(frequency=1),
+	RadialProfileSteppable(),
+	LightAnalysisSteppable(radiotherapy=radiotherapy),
+	EventLogSteppable(),
+]
+for steppable in steppables:
+	CompuCellSetup.register_steppable(steppable)
+# After everything that moves cells: refits the active box and grows the lattice if enabled
+active_box = ActiveBoxSteppable(frequency=1, steppables=steppables)
+# Hands lattice snapshots to a background writer every ExportPeriod MCS
+exporter = FieldExportSteppable()
+# With AdaptiveCadence=1, calls fate, mitosis and compaction only when their state changed enough
+cadence = CadenceSteppable(frequency=1, steppables=steppables)
+# Checkpoints completed MCS and restores after every other start()
+checkpoint = CheckpointSteppable(frequency=1, steppables=steppables + [active_box, cadence])
+CompuCellSetup.register_steppable(active_box)
+CompuCellSetup.register_steppable(exporter)
+CompuCellSetup.register_steppable(cadence)
+CompuCellSetup.register_steppable(checkpoint)
+# Wraps every steppable above with timers when Profiling=1; does nothing otherwise
+CompuCellSetup.register_steppable(ProfilingSteppable(frequency=1, steppables=steppables + [active_box, exporter, checkpoint]))
 
 CompuCellSetup.run()
@@ -0,0 +1,530 @@
+"""Offline per-steppable benchmarks on a mock CompuCell3D runtime.
+
+``install_mock_runtime()`` registers a small stand-in for ``cc3d.core.PySteppables``. It
+provides ``SteppableBasePy`` and ``MitosisSteppableBase`` backed by a Python cell list with
+settable COM/type/volume, and a NumPy ``field.Oxygen``. mitosis_O2Steppables then imports
+and runs unchanged, without CompuCell3D. Cells painted through ``cell_field`` own real voxels
+and take their volume and COM from them, so checkpoints round-trip; the synthetic population
+is not painted.
+
+Each benchmark case builds a synthetic spheroid: a necrotic core, a hypoxic shell and a
+normoxic rim in the ``--mix`` proportions, with a radial oxygen profile that matches the
+fate thresholds. The registered pipeline then runs for ``--mcs`` MCS. Between MCS a crude
+"engine" relaxes volumes toward targets and jitters COMs. It is not timed.
+
+For every steppable the harness reports:
+
+- mean and median per-call latency, and throughput (cells per second);
+- peak Python allocation per call (tracemalloc, measured in a separate pass so it does not
+  distort the timings).
+
+Results are written as JSON. ``--compare`` checks them against an earlier file and exits
+non-zero when a steppable's mean call time grew by more than ``--tolerance``.
+
+Usage:
+    python mitosis_O2Benchmark.py --cells 1000 10000 100000 --mcs 10 --out bench.json
+    python mitosis_O2Benchmark.py --out new.json --compare bench.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CELLS = (1000, 10000, 100000)
+# Normoxic, hypoxic, necrotic fractions of the synthetic spheroid
+DEFAULT_MIX = (0.7, 0.2, 0.1)
+MEAN_CELL_VOLUME = 40.0
+DOMAIN_PADDING = 12
+SNAPSHOT = 'CellSnapshot'
+
+
+# ------------------------- MOCK RUNTIME ---------------------------- #
+class MockCell:
+    __slots__ = ('id', 'type', 'volume', 'surface', 'xCOM', 'yCOM', 'zCOM', 'targetVolume', 'targetSurface',
+                 'lambdaVolume', 'lambdaSurface', 'lambdaVecX', 'lambdaVecY', 'lambdaVecZ', 'dict')
+
+    def __init__(self, cell_id: int, cell_type: int):
+        self.id = cell_id
+        self.type = cell_type
+        self.volume = 0
+        self.surface = 0.0
+        self.xCOM = self.yCOM = self.zCOM = 0.0
+        self.targetVolume = self.targetSurface = 0.0
+        self.lambdaVolume = self.lambdaSurface = 0.0
+        self.lambdaVecX = self.lambdaVecY = self.lambdaVecZ = 0.0
+        self.dict = {}
+
+
+class MockWorld:
+    """Cells, lattice dimensions, fields and the MCS counter shared by all mock steppables.
+
+    Voxel ownership is allocated on the first ``paint``; until then every cell is a free COM
+    and volume. Painted cells get the surface of a sphere of their volume. ``moments`` holds ``[voxels, sum x, sum y, sum z]`` of each painted cell.
+    """
+
+    def __init__(self, shape=(100, 100, 100)):
+        self.reset(shape)
+
+    def reset(self, shape):
+        self.cells = {}
+        self.next_id = 1
+        self.dim = types.SimpleNamespace(x=int(shape[0]), y=int(shape[1]), z=int(shape[2]))
+        self.field = types.SimpleNamespace(Oxygen=np.ones(tuple(int(n) for n in shape)))
+        self.mcs = 0
+        self.owner = None
+        self.moments = {}
+
+    def add_cell(self, cell_type: int) -> MockCell:
+        cell = MockCell(self.next_id, cell_type)
+        self.next_id += 1
+        self.cells[cell.id] = cell
+        return cell
+
+    def paint(self, index, cell):
+        """Give the voxels at ``index`` (ints and slices, as in ``cell_field[x, y, z]``) to ``cell``."""
+        shape = (self.dim.x, self.dim.y, self.dim.z)
+        axes = [np.arange(*i.indices(n)) if isinstance(i, slice) else np.array([int(i)])
+                for i, n in zip(index, shape)]
+        xyz = np.stack([a.ravel() for a in np.meshgrid(*axes, indexing='ij')], axis=1)
+        self.assign(xyz, cell.id if cell is not None else 0)
+
+    def assign(self, xyz, cell_id: int):
+        """Move the (n, 3) voxels ``xyz`` to ``cell_id`` (0 is Medium) and update every affected cell."""
+        if self.owner is None:
+            self.owner = np.zeros((self.dim.x, self.dim.y, self.dim.z), dtype=np.int64)
+        index = tuple(xyz.T)
+        old = self.owner[index]
+        self.owner[index] = cell_id
+        for owner in np.unique(old).tolist():
+            if owner != cell_id:
+                moved = xyz[old == owner]
+                self._move(owner, -len(moved), -moved.sum(axis=0))
+        moved = xyz[old != cell_id]
+        self._move(cell_id, len(moved), moved.sum(axis=0))
+
+    def voxels(self, cell_id: int) -> np.ndarray:
+        return np.argwhere(self.owner == cell_id)
+
+    def _move(self, cell_id: int, count: int, sums):
+        if cell_id == 0:
+            return
+        moments = self.moments.setdefault(cell_id, np.zeros(4, dtype=np.int64))
+        moments[0] += count
+        moments[1:] += sums
+        cell = self.cells.get(cell_id)
+        if cell is not None:
+            # Integer sums keep the COM independent of the order voxels were painted in
+            cell.volume = int(moments[0])
+            cell.surface = (36.0 * math.pi) ** (1.0 / 3.0) * cell.volume ** (2.0 / 3.0)
+            cell.xCOM, cell.yCOM, cell.zCOM = (moments[1:] / max(1, moments[0])).tolist()
+
+
+WORLD = MockWorld((1, 1, 1))
+
+
+class _CellList:
+    def __iter__(self):
+        return iter(list(WORLD.cells.values()))
+
+    def __len__(self):
+        return len(WORLD.cells)
+
+
+class _CellField:
+    def __setitem__(self, index, cell):
+        WORLD.paint(index, cell)
+
+
+class _Pixel:
+    __slots__ = ('pixel',)
+
+    def __init__(self, x, y, z):
+        self.pixel = types.SimpleNamespace(x=x, y=y, z=z)
+
+
+class MockSteppableBasePy:
+    """The subset of cc3d's SteppableBasePy that mitosis_O2Steppables uses."""
+
+    MEDIUM, NORMOXIC, HYPOXIC, NECROTIC = 0, 1, 2, 3
+
+    def __init__(self, frequency: int = 1):
+        self.frequency = frequency
+        self.cell_list = _CellList()
+        self.cell_field = _CellField()
+
+    @property
+    def field(self):
+        return WORLD.field
+
+    @property
+    def dim(self):
+        return WORLD.dim
+
+    @property
+    def mcs(self):
+        return WORLD.mcs
+
+    def start(self):
+        pass
+
+    def step(self, mcs):
+        pass
+
+    def finish(self):
+        pass
+
+    def new_cell(self, cell_type: int) -> MockCell:
+        return WORLD.add_cell(cell_type)
+
+    def delete_cell(self, cell):
+        WORLD.cells.pop(cell.id, None)
+        if WORLD.moments.pop(cell.id, None) is not None:
+            WORLD.owner[WORLD.owner == cell.id] = 0
+
+    def fetch_cell_by_id(self, cell_id: int):
+        return WORLD.cells.get(cell_id)
+
+    def stop_simulation(self):
+        pass
+
+    def add_new_plot_window(self, **kwargs):
+        return types.SimpleNamespace(add_plot=lambda *a, **k: None, add_data_point=lambda *a, **k: None)
+
+    def get_cell_pixel_list(self, cell):
+        if cell.id in WORLD.moments:
+            return [_Pixel(x, y, z) for x, y, z in WORLD.voxels(cell.id).tolist()]
+        # Cube of the cell's volume around its COM, clipped to the lattice
+        half = max(1, int(round(cell.volume ** (1.0 / 3.0) / 2.0)))
+        cx, cy, cz = (int(round(v)) for v in (cell.xCOM, cell.yCOM, cell.zCOM))
+        dim = WORLD.dim
+        return [_Pixel(x, y, z)
+                for x in range(max(0, cx - half), min(dim.x, cx + half))
+                for y in range(max(0, cy - half), min(dim.y, cy + half))
+                for z in range(max(0, cz - half), min(dim.z, cz + half))]
+
+    def resize_and_shift_lattice(self, new_size, shift_vec):
+        old = WORLD.field.Oxygen
+        new = np.zeros(tuple(new_size))
+        src = tuple(slice(max(0, -s), min(o, n - s)) for o, n, s in zip(old.shape, new_size, shift_vec))
+        dst = tuple(slice(a.start + s, a.stop + s) for a, s in zip(src, shift_vec))
+        new[dst] = old[src]
+        WORLD.field.Oxygen = new
+        if WORLD.owner is not None:
+            owner = np.zeros(tuple(new_size), dtype=np.int64)
+            owner[dst] = WORLD.owner[src]
+            WORLD.owner = owner
+            for moments in WORLD.moments.values():
+                moments[1:] += moments[0] * np.asarray(shift_vec, dtype=np.int64)
+        WORLD.dim = types.SimpleNamespace(x=new_size[0], y=new_size[1], z=new_size[2])
+        for cell in WORLD.cells.values():
+            cell.xCOM += shift_vec[0]
+            cell.yCOM += shift_vec[1]
+            cell.zCOM += shift_vec[2]
+
+
+class MockMitosisSteppableBase(MockSteppableBasePy):
+    def __init__(self, frequency: int = 1):
+        super().__init__(frequency)
+        self.parent_cell = None
+        self.child_cell = None
+
+    def set_parent_child_position_flag(self, flag: int):
+        pass
+
+    def divide_cell_random_orientation(self, cell):
+        child = WORLD.add_cell(cell.type)
+        offset = np.random.standard_normal(3)
+        if cell.id in WORLD.moments:
+            # Painted cells split their voxels across a random plane; the child takes the far half
+            voxels = WORLD.voxels(cell.id)
+            order = np.argsort(voxels @ offset, kind='stable')
+            WORLD.assign(voxels[order[len(order) - len(order) // 2:]], child.id)
+            self.parent_cell, self.child_cell = cell, child
+            self.update_attributes()
+            return
+        offset *= 0.5 * cell.volume ** (1.0 / 3.0) / max(np.linalg.norm(offset), 1e-9)
+        child.xCOM, child.yCOM, child.zCOM = cell.xCOM + offset[0], cell.yCOM + offset[1], cell.zCOM + offset[2]
+        child.volume = cell.volume // 2
+        cell.volume -= child.volume
+        self.parent_cell, self.child_cell = cell, child
+        self.update_attributes()
+
+    def clone_parent_2_child(self):
+        for name in ('targetVolume', 'targetSurface', 'lambdaVolume', 'lambdaSurface',
+                     'lambdaVecX', 'lambdaVecY', 'lambdaVecZ'):
+            setattr(self.child_cell, name, getattr(self.parent_cell, name))
+
+    def update_attributes(self):
+        pass
+
+
+def install_mock_runtime():
+    """Register the mock as ``cc3d.core.PySteppables`` (call before importing mitosis_O2Steppables)."""
+    module = types.ModuleType('cc3d.core.PySteppables')
+    module.SteppableBasePy = MockSteppableBasePy
+    module.MitosisSteppableBase = MockMitosisSteppableBase
+    module.__all__ = ['SteppableBasePy', 'MitosisSteppableBase']
+    cc3d = types.ModuleType('cc3d')
+    core = types.ModuleType('cc3d.core')
+    cc3d.core, core.PySteppables = core, module
+    sys.modules.update({'cc3d': cc3d, 'cc3d.core': core, 'cc3d.core.PySteppables': module})
+
+
+# ------------------------- SYNTHETIC POPULATION ---------------------------- #
+def build_population(n_cells: int, mix=DEFAULT_MIX, thresholds=(0.15, 0.05), necrotic_lifetime: int = 50,
+                     seed: int = 0):
+    """Reset WORLD to a layered spheroid of ``n_cells`` cells and a matching oxygen field.
+
+    Cells fill a ball (necrotic core, hypoxic shell, normoxic rim). Oxygen falls from 1 at
+    the rim of the domain through the normoxic/hypoxic threshold at the hypoxic shell and
+    the hypoxic/necrotic threshold at the core, so most cells already sit in their state.
+    Necrotic cells get ages spread over ``necrotic_lifetime`` so removals occur throughout.
+    """
+    rng = np.random.default_rng(seed)
+    mix = np.asarray(mix, dtype=np.float64) / np.sum(mix)
+    radius = np.cbrt(3.0 * n_cells * MEAN_CELL_VOLUME / (4.0 * math.pi))
+    size = int(2 * radius) + 2 * DOMAIN_PADDING
+    WORLD.reset((size, size, size))
+    center = size / 2.0
+
+    # Uniform points in the ball, sorted by radius so the layers follow the mix
+    direction = rng.standard_normal((n_cells, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    r = np.sort(radius * np.cbrt(rng.random(n_cells)))
+    com = center + direction * r[:, None]
+    n_necrotic, n_hypoxic = int(mix[2] * n_cells), int(mix[1] * n_cells)
+    cell_types = np.full(n_cells, MockSteppableBasePy.NORMOXIC)
+    cell_types[:n_necrotic] = MockSteppableBasePy.NECROTIC
+    cell_types[n_necrotic:n_necrotic + n_hypoxic] = MockSteppableBasePy.HYPOXIC
+    volume = rng.integers(int(0.6 * MEAN_CELL_VOLUME), int(1.4 * MEAN_CELL_VOLUME), n_cells)
+    # Normoxic cells spread over the growth cycle so divisions occur every MCS
+    target = np.where(cell_types == MockSteppableBasePy.NORMOXIC, rng.uniform(31.0, 63.0, n_cells), volume)
+    necrotic_age = rng.integers(0, max(1, int(necrotic_lifetime)), n_cells)
+    for i in range(n_cells):
+        cell = WORLD.add_cell(int(cell_types[i]))
+        cell.xCOM, cell.yCOM, cell.zCOM = com[i].tolist()
+        cell.volume = int(volume[i])
+        cell.surface = (36.0 * math.pi) ** (1.0 / 3.0) * cell.volume ** (2.0 / 3.0)
+        cell.targetVolume = float(target[i])
+        cell.targetSurface = (36.0 * math.pi) ** (1.0 / 3.0) * cell.targetVolume ** (2.0 / 3.0)
+        if cell_types[i] == MockSteppableBasePy.NECROTIC:
+            cell.dict['necrotic_mcs'] = -int(necrotic_age[i])
+
+    # Piecewise-linear radial oxygen through both thresholds at the layer boundaries
+    o2_nh, o2_hn = thresholds
+    r_core = r[n_necrotic - 1] if n_necrotic else 0.0
+    r_shell = r[n_necrotic + n_hypoxic - 1] if n_hypoxic + n_necrotic else 0.0
+    grid = np.ogrid[0:size, 0:size, 0:size]
+    distance = np.sqrt(sum((g - center + 0.5) ** 2 for g in grid))
+    WORLD.field.Oxygen = np.interp(distance, [0.0, r_core, r_shell, center],
+                                   [0.5 * o2_hn, o2_hn, o2_nh, 1.0])
+    return WORLD
+
+
+def engine_step(rng):
+    """Stand-in for the Potts step: volumes relax toward targets, COMs jitter; painted cells stay put."""
+    cells = list(WORLD.cells.values())
+    jitter = rng.normal(0.0, 0.3, (len(cells), 3)).tolist()
+    for cell, (dx, dy, dz) in zip(cells, jitter):
+        if cell.id in WORLD.moments:
+            continue
+        cell.volume = max(1, int(round(cell.targetVolume)))
+        cell.xCOM += dx
+        cell.yCOM += dy
+        cell.zCOM += dz
+    WORLD.mcs += 1
+
+
+# ------------------------- BENCHMARK ---------------------------- #
+BENCH_PARAMETERS = {
+    'AnalysisPlots': 0, 'OutputFrequency': 1, 'CheckpointPeriod': 0, 'Profiling': 0,
+    # A fraction every 5 MCS so radiotherapy cost shows up in a short run
+    'RT_Enable': 1, 'RT_StartMCS': 0, 'RT_PeriodMCS': 5, 'RT_Fractions': 1000, 'RT_DoseGy': 0.5,
+}
+
+
+def build_pipeline(S):
+    """The steppables of mitosis_O2.py that act on an existing population, in registration order."""
+    radiotherapy = S.RadiotherapySteppable(frequency=1)
+    return [
+        S.QuasiSteadyOxygenSteppable(frequency=1),
+        S.O2DrivenFateSteppable(frequency=5),
+        S.O2MitosisSteppable(frequency=1),
+        radiotherapy,
+        S.CenterCompactionSteppable(frequency=1),
+        S.RadialProfileSteppable(),
+        S.LightAnalysisSteppable(radiotherapy=radiotherapy),
+        S.ActiveBoxSteppable(frequency=1),
+    ]
+
+
+def run_case(n_cells: int, n_mcs: int, memory_mcs: int = 2, mix=DEFAULT_MIX, seed: int = 0,
+             steady: bool = False) -> list:
+    """Benchmark every pipeline steppable at ``n_cells`` cells; one result dict per steppable.
+
+    Analysis output streams to a temporary directory, as in a headless run.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        return _run_case(n_cells, n_mcs, memory_mcs, mix, seed, steady, tmp)
+
+
+def _run_case(n_cells, n_mcs, memory_mcs, mix, seed, steady, tmp) -> list:
+    import mitosis_O2Steppables as S
+    from mitosis_O2Params import PARAMETERS
+
+    PARAMETERS.override(**BENCH_PARAMETERS, O2SteadyState=int(steady),
+                        AnalysisOutput=os.path.join(tmp, 'summary.cols'),
+                        ProfileOutput=os.path.join(tmp, 'profile.cols'))
+    thresholds = (PARAMETERS.get('O2_Thresh_NormoxicHypoxic'), PARAMETERS.get('O2_Thresh_HypoxicNecrotic'))
+    build_population(n_cells, mix, thresholds, PARAMETERS.get('NecroticLifetime'), seed)
+    np.random.seed(seed)
+    S.random.seed(seed)
+    S.RANDOM_STREAMS.reseed(seed)
+    S.CELL_SNAPSHOT.invalidate()
+    S.RUN_CLOCK.offset = 0
+    steppables = build_pipeline(S)
+    for steppable in steppables:
+        steppable.start()
+    names = [SNAPSHOT] + [type(s).__name__ for s in steppables]
+    seconds = {name: [] for name in names}
+    cells = {name: [] for name in names}
+    peak = dict.fromkeys(names, 0)
+    rng = np.random.default_rng(seed)
+
+    def one_mcs(measure_memory: bool):
+        mcs = WORLD.mcs
+        calls = [(SNAPSHOT, lambda: S.CELL_SNAPSHOT.get(steppables[0]))]
+        calls += [(name, (lambda s=s: s.step(mcs))) for name, s in zip(names[1:], steppables)
+                  if mcs % s.frequency == 0]
+        for name, call in calls:
+            n = len(WORLD.cells)
+            if measure_memory:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                call()
+                peak[name] = max(peak[name], tracemalloc.get_traced_memory()[1] - base)
+                continue
+            t0 = time.perf_counter()
+            call()
+            seconds[name].append(time.perf_counter() - t0)
+            cells[name].append(n)
+        engine_step(rng)
+
+    for _ in range(n_mcs):
+        one_mcs(False)
+    if memory_mcs:
+        tracemalloc.start()
+        for _ in range(memory_mcs):
+            one_mcs(True)
+        tracemalloc.stop()
+    for steppable in steppables:
+        steppable.finish()
+    PARAMETERS.clear_overrides()
+
+    results = []
+    for name in names:
+        if not seconds[name]:
+            continue
+        t = np.asarray(seconds[name])
+        n = np.asarray(cells[name], dtype=np.float64)
+        results.append({
+            'steppable': name, 'cells': n_cells, 'calls': int(t.size),
+            'median_seconds': float(np.median(t)), 'mean_seconds': float(t.mean()),
+            'min_seconds': float(t.min()), 'max_seconds': float(t.max()),
+            'cells_per_second': float(n.sum() / max(t.sum(), 1e-12)),
+            'peak_bytes': int(peak[name]),
+        })
+    return results
+
+
+def run_benchmarks(cell_counts=DEFAULT_CELLS, n_mcs: int = 10, memory_mcs: int = 2, mix=DEFAULT_MIX,
+                   seed: int = 0, steady: bool = False) -> dict:
+    results = []
+    for n_cells in cell_counts:
+        t0 = time.perf_counter()
+        results.extend(run_case(int(n_cells), n_mcs, memory_mcs, mix, seed, steady))
+        logger.info(f"[BENCH] {n_cells} cells: {n_mcs} MCS in {time.perf_counter() - t0:.1f}s")
+    return {
+        'meta': {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+                 'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'mcs': n_mcs, 'mix': list(mix), 'seed': seed, 'steady': steady},
+        'results': results,
+    }
+
+
+# ------------------------- COMPARISON ---------------------------- #
+def compare(current: dict, baseline: dict, tolerance: float = 0.25, floor_seconds: float = 5e-5) -> list:
+    """(steppable, cells, baseline s, current s, ratio, regressed) for every case in both result sets.
+
+    Mean seconds per call are compared, so bursty steppables (divisions, RT fractions) count
+    their bursts. Slowdowns of less than ``floor_seconds`` per call are timer noise, not
+    regressions.
+    """
+    base = {(r['steppable'], r['cells']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        key = (result['steppable'], result['cells'])
+        if key not in base:
+            continue
+        old, new = base[key]['mean_seconds'], result['mean_seconds']
+        ratio = new / old if old > 0 else float('inf')
+        rows.append((key[0], key[1], old, new, ratio, ratio > 1.0 + tolerance and new - old > floor_seconds))
+    return rows
+
+
+def format_results(results: dict) -> str:
+    lines = [f"{'steppable':<28} {'cells':>7} {'mean ms':>9} {'median ms':>10} {'cells/s':>10} {'peak MB':>8}"]
+    for r in results['results']:
+        lines.append(f"{r['steppable']:<28} {r['cells']:>7} {r['mean_seconds'] * 1e3:>9.3f} "
+                     f"{r['median_seconds'] * 1e3:>10.3f} {r['cells_per_second']:>10.3g} {r['peak_bytes'] / 1e6:>8.2f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--cells', type=int, nargs='+', default=list(DEFAULT_CELLS), help='Population sizes')
+    parser.add_argument('--mcs', type=int, default=10, help='Timed MCS per population')
+    parser.add_argument('--memory-mcs', type=int, default=2, help='Extra MCS under tracemalloc (0 = skip)')
+    parser.add_argument('--mix', type=float, nargs=3, default=list(DEFAULT_MIX),
+                        help='Normoxic, hypoxic and necrotic fractions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--steady', action='store_true', help='Include the quasi-steady oxygen solve')
+    parser.add_argument('--out', default=None, help='Write results JSON here')
+    parser.add_argument('--compare', default=None, help='Baseline results JSON to check against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed mean slowdown (0.25 = 25%%)')
+    parser.add_argument('--floor-ms', type=float, default=0.05, help='Ignore slowdowns below this per call')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    install_mock_runtime()
+    # Per-event steppable logging would swamp the report
+    logging.getLogger('mitosis_O2Steppables').setLevel(logging.WARNING)
+    results = run_benchmarks(args.cells, args.mcs, args.memory_mcs, tuple(args.mix), args.seed, args.steady)
+    print(format_results(results))
+    if args.out:
+        with open(args.out, 'w') as fh:
+            json.dump(results, fh, indent=1)
+    if args.compare:
+        with open(args.compare) as fh:
+            rows = compare(results, json.load(fh), args.tolerance, args.floor_ms * 1e-3)
+        regressed = [row for row in rows if row[5]]
+        for name, n_cells, old, new, ratio, bad in rows:
+            print(f"{'REGRESSED' if bad else 'ok':<9} {name:<28} {n_cells:>7} "
+                  f"{old * 1e3:>9.3f} -> {new * 1e3:>9.3f} ms ({ratio:.2f}x)")
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Adaptive call cadence for steppables, driven by how fast the state they act on changes.
+
+A ``Cadence`` replaces a steppable's fixed ``frequency`` with an interval that is bounded
+by ``[min_interval, max_interval]``. After every call the steppable suggests its next
+interval from a change metric observed in that call, and the controller adopts it:
+
+- a shorter suggestion is taken at once, so bursts of change are caught;
+- a longer one at most doubles the interval per call (``growth``), so a quiet spell does
+  not jump straight to the maximum.
+
+Scheduled events can force an earlier call: ``due(mcs, next_event)`` is true once the
+interval has elapsed or once the MCS returned by ``next_event()`` (e.g. the next
+predicted division) has come.
+
+Change metrics that map onto an interval:
+
+- ``proportional_interval``: the interval at which a fraction of the work (e.g. cells whose
+  COM drifted past a tolerance) would hit a target, assuming it grows linearly with time;
+- ``threshold_crossing_mcs``: the MCS until a fraction of the values reach one of the
+  thresholds, extrapolating each value's recent rate of change.
+
+No CompuCell3D dependency.
+"""
+import math
+
+import numpy as np
+
+
+class Cadence:
+    """Interval between calls of one steppable, adapted after each call."""
+
+    def __init__(self, base: int, min_interval: int = 1, max_interval: int = 20, growth: float = 2.0):
+        self.base = max(1, int(base))
+        self.min_interval = max(1, int(min_interval))
+        self.max_interval = max(self.min_interval, int(max_interval))
+        self.growth = float(growth)
+        self.calls = 0
+        self.skipped = 0
+        self.reset()
+
+    def reset(self):
+        self.interval = min(max(self.base, self.min_interval), self.max_interval)
+        self.last_call = None
+        self.next_call = 0
+
+    def due(self, mcs: int, next_event=None) -> bool:
+        """Whether the steppable runs at ``mcs``: its interval elapsed or an event came due.
+
+        ``next_event()`` returns the MCS of the earliest pending event (or None); it is only
+        asked while the interval has not elapsed.
+        """
+        if mcs >= self.next_call:
+            return True
+        if next_event is None:
+            return False
+        event_mcs = next_event()
+        return event_mcs is not None and event_mcs <= mcs
+
+    def elapsed(self, mcs: int) -> int:
+        """MCS since the previous call (the base period before the first call)."""
+        return self.base if self.last_call is None else mcs - self.last_call
+
+    def called(self, mcs: int, suggested: float):
+        """Record a call at ``mcs`` and set the next interval from the steppable's suggestion."""
+        limit = min(self.max_interval, self.interval * self.growth)
+        interval = max(self.min_interval, min(float(suggested), limit))
+        self.interval = int(interval)
+        self.last_call = mcs
+        self.next_call = mcs + self.interval
+        self.calls += 1
+
+    def state(self) -> tuple:
+        """(interval, last call, next call); the last call is NaN before the first call."""
+        return self.interval, math.nan if self.last_call is None else self.last_call, self.next_call
+
+    def load_state(self, interval, last_call, next_call):
+        self.interval = int(interval)
+        self.last_call = None if math.isnan(last_call) else int(last_call)
+        self.next_call = int(next_call)
+
+
+def proportional_interval(observed: float, target: float, elapsed: float) -> float:
+    """Interval at which ``observed`` (seen after ``elapsed`` MCS) would reach ``target``; inf if nothing changed."""
+    if observed <= 0:
+        return math.inf
+    return elapsed * target / observed
+
+def threshold_crossing_mcs(values, previous, elapsed: float, thresholds, fraction: float = 0.0) -> float:
+    """MCS until ``fraction`` of ``values`` reach a threshold at their rate since ``previous``.
+
+    With ``fraction=0`` this is the first crossing. The rate is taken as an absolute value,
+    so a value moving away from a threshold still counts as approaching it (conservative).
+    Values that did not change, or whose previous value is NaN (not seen before), never
+    cross; inf when fewer than ``fraction`` of the values can.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    if values.size == 0:
+        return math.inf
+    rate = np.abs(values - previous) / max(float(elapsed), 1.0)
+    margin = np.full(values.size, np.inf)
+    for threshold in thresholds:
+        np.minimum(margin, np.abs(values - threshold), out=margin)
+    moving = rate > 0  # NaN compares False
+    time = np.full(values.size, np.inf)
+    time[moving] = margin[moving] / rate[moving]
+    k = min(int(fraction * values.size), values.size - 1)
+    return float(np.partition(time, k)[k])
@@ -0,0 +1,190 @@
+"""Compressed, chunked checkpoint files for resuming or forking mitosis_O2 runs.
+
+A checkpoint is a zip archive (readable with ``np.load``) holding ``meta.json`` plus each
+array split along its first axis into ``<name>/<chunk>.npy`` members of at most
+``CHUNK_BYTES``, each deflated separately. Large fields therefore never need one huge
+compression buffer, and a reader can pull single chunks.
+
+``CheckpointWriter`` performs the compression and file I/O on a background thread. The
+step loop only pays for copying the arrays it hands over. Files are written to a
+temporary name and renamed, so a crash never leaves a truncated checkpoint behind.
+
+This module has no CompuCell3D dependency; the steppable side lives in
+mitosis_O2Steppables.CheckpointSteppable.
+"""
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import zipfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CHUNK_BYTES = 4 << 20
+CHECKPOINT_PATTERN = 'checkpoint_{mcs:08d}.npz'
+META_MEMBER = 'meta.json'
+
+
+# ------------------------- FILE FORMAT ---------------------------- #
+def write_checkpoint(path: str, meta: dict, arrays: dict, compresslevel: int = 6):
+    """Write ``meta`` and ``arrays`` to ``path`` atomically."""
+    meta = dict(meta, format_version=FORMAT_VERSION,
+                arrays={name: [list(np.shape(a)), np.asarray(a).dtype.str] for name, a in arrays.items()})
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        zf.writestr(META_MEMBER, json.dumps(meta))
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            row_bytes = max(1, array[:1].nbytes) if array.ndim else array.nbytes
+            rows = max(1, CHUNK_BYTES // row_bytes)
+            n_rows = len(array) if array.ndim else 1
+            for index, start in enumerate(range(0, max(n_rows, 1), rows)):
+                chunk = array[start:start + rows] if array.ndim else array
+                with zf.open(f"{name}/{index:05d}.npy", 'w', force_zip64=True) as fh:
+                    np.lib.format.write_array(fh, chunk, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+def read_checkpoint(path: str) -> tuple:
+    """Return (meta, arrays) from a checkpoint written by ``write_checkpoint``."""
+    with zipfile.ZipFile(path) as zf:
+        meta = json.loads(zf.read(META_MEMBER))
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise RuntimeError(f"Checkpoint {path} has format {meta.get('format_version')}, "
+                               f"expected {FORMAT_VERSION}")
+        chunks = {}
+        for member in sorted(zf.namelist()):
+            if member == META_MEMBER:
+                continue
+            name = member.rsplit('/', 1)[0]
+            with zf.open(member) as fh:
+                chunks.setdefault(name, []).append(np.lib.format.read_array(fh, allow_pickle=False))
+    arrays = {}
+    for name, (shape, dtype) in meta['arrays'].items():
+        parts = chunks.get(name)
+        if not parts:
+            array = np.empty(shape, dtype=dtype)
+        elif len(shape) == 0:
+            array = parts[0]
+        else:
+            array = np.concatenate(parts)
+        arrays[name] = array.reshape(shape).astype(dtype, copy=False)
+    return meta, arrays
+
+def list_checkpoints(directory: str) -> list:
+    """Checkpoint paths in ``directory``, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, CHECKPOINT_PATTERN.replace('{mcs:08d}', '[0-9]' * 8))))
+
+def latest_checkpoint(directory: str):
+    paths = list_checkpoints(directory)
+    return paths[-1] if paths else None
+
+
+# ------------------------- STATE ENCODING ---------------------------- #
+def encode_random_state(state) -> list:
+    """``random.getstate()`` as JSON-friendly lists."""
+    version, internal, gauss_next = state
+    return [version, list(internal), gauss_next]
+
+def decode_random_state(encoded) -> tuple:
+    version, internal, gauss_next = encoded
+    return version, tuple(internal), gauss_next
+
+def voxel_runs(flat_indices, row_length: int) -> tuple:
+    """Split sorted flat C-order indices into (start, length) runs along the last axis.
+
+    Runs never cross a row, so each maps onto one ``field[x, y, z0:z0 + length]`` slice.
+    """
+    flat = np.asarray(flat_indices, dtype=np.int64)
+    if flat.size == 0:
+        return flat, flat
+    breaks = (np.diff(flat) != 1) | (flat[1:] % row_length == 0)
+    starts = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+    lengths = np.diff(np.append(starts, flat.size))
+    return flat[starts], lengths
+
+
+class RestoreMap:
+    """Translate checkpointed cell ids and MCS values into the resumed run.
+
+    CompuCell3D assigns fresh cell ids and restarts at MCS 0, so ids are remapped (cells are
+    recreated in ascending old-id order, which keeps id ordering intact) and every stored MCS
+    is shifted by ``mcs_shift``.
+    """
+
+    def __init__(self, old_ids, new_ids, mcs_shift: int):
+        order = np.argsort(old_ids)
+        self.old_ids = np.asarray(old_ids, dtype=np.int64)[order]
+        self.new_ids = np.asarray(new_ids, dtype=np.int64)[order]
+        self.mcs_shift = int(mcs_shift)
+
+    def ids(self, old_ids) -> np.ndarray:
+        """New ids for ``old_ids``; cells that no longer exist get distinct negative ids."""
+        old_ids = np.asarray(old_ids, dtype=np.int64)
+        if self.old_ids.size == 0:
+            return -1 - np.arange(old_ids.size, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.old_ids, old_ids), self.old_ids.size - 1)
+        found = self.old_ids[pos] == old_ids
+        return np.where(found, self.new_ids[pos], -1 - np.arange(old_ids.size, dtype=np.int64))
+
+    def mcs(self, value):
+        return value + self.mcs_shift
+
+
+# ------------------------- BACKGROUND WRITER ---------------------------- #
+class CheckpointWriter:
+    """Serialize checkpoints on a worker thread, keeping the newest ``keep`` files.
+
+    At most one checkpoint waits in the queue. ``submit`` only blocks if another one is
+    still queued behind the one being written. A failed write is re-raised by the next
+    ``submit`` or by ``close``.
+    """
+
+    def __init__(self, directory: str, keep: int = 3, compresslevel: int = 6):
+        self.directory = directory
+        self.keep = max(1, int(keep))
+        self.compresslevel = compresslevel
+        self._queue = queue.Queue(maxsize=1)
+        self._error = None
+        self._thread = None
+
+    def submit(self, mcs: int, meta: dict, arrays: dict) -> str:
+        self._raise_pending_error()
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+            self._thread.start()
+        path = os.path.join(self.directory, CHECKPOINT_PATTERN.format(mcs=mcs))
+        self._queue.put((path, meta, arrays))
+        return path
+
+    def close(self):
+        """Flush queued checkpoints and stop the worker."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_pending_error()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            path, meta, arrays = job
+            try:
+                write_checkpoint(path, meta, arrays, self.compresslevel)
+                for stale in list_checkpoints(self.directory)[:-self.keep]:
+                    os.remove(stale)
+                logger.info(f"[CHECKPOINT] Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+            except Exception as exc:  # Surfaced on the simulation thread
+                self._error = exc
+
+    def _raise_pending_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Checkpoint write failed: {error}") from error
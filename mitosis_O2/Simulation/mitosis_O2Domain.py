@@ -0,0 +1,126 @@
+"""Active subdomain around the spheroid and lattice-growth planning.
+
+The spheroid starts as one cell in the middle of the lattice and fills only a small part of
+it for most of a run. ``ActiveBox`` keeps a bounding box of all cells (their centre of mass
+plus a sphere-equivalent radius from their volume, padded by ``margin`` voxels), and code
+that would otherwise touch the whole field can work on ``box.view(array)`` instead.
+
+The box grows as soon as a cell reaches past it, but shrinks only after the cells have
+pulled back more than two margins. Views therefore keep the same shape for long stretches
+of a run. ``growth_plan`` picks a larger, re-centred lattice once the cells come within a
+margin of its faces. No CompuCell3D dependency.
+"""
+import math
+
+import numpy as np
+
+SPHERE_RADIUS_COEFF = 3.0 / (4.0 * math.pi)
+
+
+def cell_extent(com, volume) -> tuple:
+    """Tight voxel bounds [lo, hi) covering every cell's sphere-equivalent extent, or None without cells."""
+    com = np.asarray(com, dtype=np.float64).reshape(-1, 3)
+    if com.shape[0] == 0:
+        return None
+    radius = np.cbrt(SPHERE_RADIUS_COEFF * np.asarray(volume, dtype=np.float64))[:, None]
+    lo = np.floor((com - radius).min(axis=0)).astype(np.int64)
+    hi = np.ceil((com + radius).max(axis=0)).astype(np.int64) + 1
+    return lo, hi
+
+
+class ActiveBox:
+    """Padded bounding box of the cells inside a lattice of ``shape``."""
+
+    def __init__(self, shape=(0, 0, 0), margin: int = 4):
+        self.shape = np.asarray(shape, dtype=np.int64)
+        self.margin = int(margin)
+        self.lo = np.zeros(3, dtype=np.int64)
+        self.hi = np.zeros(3, dtype=np.int64)
+        self.tight = None
+        self.key = None
+        self.updates = 0
+
+    @property
+    def slices(self) -> tuple:
+        return tuple(slice(int(a), int(b)) for a, b in zip(self.lo, self.hi))
+
+    @property
+    def size(self) -> tuple:
+        return tuple(int(n) for n in self.hi - self.lo)
+
+    @property
+    def voxels(self) -> int:
+        return int(np.prod(self.hi - self.lo))
+
+    def view(self, array):
+        """The part of a lattice-shaped array inside the box (a view, not a copy)."""
+        return array[self.slices]
+
+    def update(self, com, volume, shape=None, key=None) -> bool:
+        """Fit the box to the cells; return True if its bounds changed.
+
+        ``key`` identifies the cell state (e.g. a snapshot version); an unchanged key skips
+        the pass over the cells.
+        """
+        if shape is not None and tuple(shape) != tuple(self.shape):
+            self.shape = np.asarray(shape, dtype=np.int64)
+            self.key = None
+        if key is not None and key == self.key:
+            return False
+        self.key = key
+        self.updates += 1
+        self.tight = cell_extent(com, volume)
+        if self.tight is None:
+            lo = hi = self.shape // 2
+        else:
+            tight_lo, tight_hi = self.tight
+            inside = np.all(tight_lo >= self.lo) and np.all(tight_hi <= self.hi)
+            slack = 2 * self.margin
+            loose = np.any(tight_lo - self.lo > slack) or np.any(self.hi - tight_hi > slack)
+            if inside and not loose and self.hi[0] > self.lo[0]:
+                return False
+            lo = np.clip(tight_lo - self.margin, 0, self.shape)
+            hi = np.clip(tight_hi + self.margin, 0, self.shape)
+        changed = not (np.array_equal(lo, self.lo) and np.array_equal(hi, self.hi))
+        self.lo, self.hi = lo, hi
+        return changed
+
+    def near_boundary(self, distance: int | None = None) -> np.ndarray:
+        """Per axis, whether the cells come within ``distance`` (default: margin) voxels of a face."""
+        if self.tight is None:
+            return np.zeros(3, dtype=bool)
+        distance = max(1, self.margin) if distance is None else int(distance)
+        tight_lo, tight_hi = self.tight
+        return (tight_lo < distance) | (tight_hi > self.shape - distance)
+
+    def shifted(self, shape, shift):
+        """Move the box with lattice content shifted by ``shift`` into a lattice of ``shape``."""
+        shift = np.asarray(shift, dtype=np.int64)
+        self.shape = np.asarray(shape, dtype=np.int64)
+        self.lo = np.clip(self.lo + shift, 0, self.shape)
+        self.hi = np.clip(self.hi + shift, 0, self.shape)
+        if self.tight is not None:
+            self.tight = (self.tight[0] + shift, self.tight[1] + shift)
+        self.key = None
+
+
+def growth_plan(box: ActiveBox, factor: float, max_size: int):
+    """(new_shape, shift) that grows the axes the cells are crowding and re-centres them, or None.
+
+    Axes are grown by ``factor`` up to ``max_size``; content is shifted so the cells' tight
+    box sits in the middle of the new lattice. None when no axis is crowded or nothing fits.
+    """
+    crowded = box.near_boundary()
+    if box.tight is None or not crowded.any():
+        return None
+    shape = box.shape.copy()
+    grown = np.minimum(np.ceil(shape * float(factor)).astype(np.int64), int(max_size))
+    shape[crowded] = np.maximum(shape[crowded], grown[crowded])
+    tight_lo, tight_hi = box.tight
+    shift = shape // 2 - (tight_lo + tight_hi) // 2
+    # Only worth doing if every crowded axis ends up with more room than it had
+    old_room = np.minimum(tight_lo, box.shape - tight_hi)
+    new_room = np.minimum(tight_lo + shift, shape - tight_hi - shift)
+    if not np.all(new_room[crowded] > old_room[crowded]):
+        return None
+    return tuple(int(n) for n in shape), tuple(int(s) for s in shift)
@@ -0,0 +1,214 @@
+"""Background export of lattice snapshots (cell types/ids, Oxygen) for visualisation.
+
+``FieldExporter`` owns a small pool of preallocated snapshot buffers. The simulation
+thread copies (optionally strided and cropped) fields into a free buffer with ``acquire``
+and hands it over with ``submit``. A worker thread compresses and writes it, then returns
+the buffer to the pool. The step loop therefore only pays for the copy. When every buffer
+is still queued or being written, ``acquire`` blocks until one is free (backpressure), and
+the time spent waiting is recorded in ``wait_seconds``.
+
+Two formats:
+
+- ``vti``: VTK XML ImageData with zlib-compressed appended data, one file per snapshot
+  plus a ``fields.pvd`` collection for ParaView time series. Values are cell data, so a
+  voxel is one VTK cell; ``Origin`` is the region's lower corner and ``Spacing`` the stride.
+- ``npz``: the chunked, compressed zip container of mitosis_O2Checkpoint, readable with
+  ``read_checkpoint`` or ``np.load``; ``meta.json`` holds mcs, origin and spacing.
+
+No CompuCell3D dependency.
+"""
+import glob
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+
+import numpy as np
+
+from mitosis_O2Checkpoint import write_checkpoint
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('vti', 'npz')
+EXPORT_PATTERN = 'fields_{mcs:08d}.{ext}'
+COLLECTION_NAME = 'fields.pvd'
+BLOCK_BYTES = 1 << 20
+VTK_TYPES = {
+    'int8': 'Int8', 'uint8': 'UInt8', 'int16': 'Int16', 'uint16': 'UInt16', 'int32': 'Int32',
+    'uint32': 'UInt32', 'int64': 'Int64', 'uint64': 'UInt64', 'float32': 'Float32', 'float64': 'Float64',
+}
+NUMPY_TYPES = {vtk: np.dtype(name) for name, vtk in VTK_TYPES.items()}
+
+
+# ------------------------- VTK IMAGE DATA ---------------------------- #
+def _zlib_blocks(data: bytes, compresslevel: int) -> bytes:
+    """``data`` in vtkZLibDataCompressor layout: UInt64 block header, then the compressed blocks."""
+    blocks = [zlib.compress(data[i:i + BLOCK_BYTES], compresslevel) for i in range(0, len(data), BLOCK_BYTES)]
+    last = len(data) - (len(blocks) - 1) * BLOCK_BYTES if blocks else 0
+    header = np.array([len(blocks), BLOCK_BYTES, last] + [len(b) for b in blocks], dtype='<u8')
+    return header.tobytes() + b''.join(blocks)
+
+def write_vti(path: str, arrays: dict, origin=(0, 0, 0), spacing=(1, 1, 1), compresslevel: int = 1):
+    """Write equally shaped 3D ``arrays`` as the cell data of one ImageData file, atomically."""
+    shape = next(iter(arrays.values())).shape
+    extent = ' '.join(f"0 {n}" for n in shape)
+    payloads, entries, offset = [], [], 0
+    for name, array in arrays.items():
+        # VTK runs x fastest: Fortran order (a view for the exporter's buffers)
+        payload = _zlib_blocks(np.asarray(array).astype(array.dtype.newbyteorder('<'), copy=False)
+                               .ravel(order='F').tobytes(), compresslevel)
+        entries.append(f'        <DataArray type="{VTK_TYPES[array.dtype.name]}" Name="{name}" '
+                       f'format="appended" offset="{offset}"/>')
+        payloads.append(payload)
+        offset += len(payload)
+    header = '\n'.join([
+        '<?xml version="1.0"?>',
+        '<VTKFile type="ImageData" version="1.0" byte_order="LittleEndian" header_type="UInt64" '
+        'compressor="vtkZLibDataCompressor">',
+        f'  <ImageData WholeExtent="{extent}" Origin="{" ".join(f"{v:g}" for v in origin)}" '
+        f'Spacing="{" ".join(f"{v:g}" for v in spacing)}">',
+        f'    <Piece Extent="{extent}">',
+        f'      <CellData Scalars="{next(iter(arrays))}">',
+        *entries,
+        '      </CellData>',
+        '    </Piece>',
+        '  </ImageData>',
+        '  <AppendedData encoding="raw">',
+        '   _',
+    ]).encode()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as fh:
+        fh.write(header)
+        for payload in payloads:
+            fh.write(payload)
+        fh.write(b'\n  </AppendedData>\n</VTKFile>\n')
+    os.replace(tmp_path, path)
+
+def read_vti(path: str) -> tuple:
+    """Return ({name: 3D array}, origin, spacing) from a file written by ``write_vti``."""
+    with open(path, 'rb') as fh:
+        raw = fh.read()
+    start = raw.index(b'<AppendedData')
+    start = raw.index(b'_', start) + 1
+    end = raw.rindex(b'</AppendedData>')
+    root = ET.fromstring(raw[:start - 1] + raw[end:])
+    image = root.find('ImageData')
+    extent = [int(v) for v in image.get('WholeExtent').split()]
+    shape = tuple(extent[i + 1] - extent[i] for i in (0, 2, 4))
+    arrays = {}
+    for node in image.iter('DataArray'):
+        pos = start + int(node.get('offset'))
+        n_blocks = int(np.frombuffer(raw, '<u8', 1, pos)[0])
+        sizes = np.frombuffer(raw, '<u8', n_blocks, pos + 24)
+        pos += 24 + 8 * n_blocks
+        parts = []
+        for size in sizes.tolist():
+            parts.append(zlib.decompress(raw[pos:pos + size]))
+            pos += size
+        values = np.frombuffer(b''.join(parts), dtype=NUMPY_TYPES[node.get('type')].newbyteorder('<'))
+        arrays[node.get('Name')] = values.reshape(shape, order='F')
+    origin = tuple(float(v) for v in image.get('Origin').split())
+    spacing = tuple(float(v) for v in image.get('Spacing').split())
+    return arrays, origin, spacing
+
+def write_collection(directory: str):
+    """(Re)write ``fields.pvd`` listing every vti snapshot in ``directory`` by MCS."""
+    rows = []
+    for path in sorted(glob.glob(os.path.join(directory, 'fields_*.vti'))):
+        name = os.path.basename(path)
+        mcs = int(re.search(r'(\d+)\.vti$', name).group(1))
+        rows.append(f'    <DataSet timestep="{mcs}" part="0" file="{name}"/>')
+    text = '\n'.join(['<?xml version="1.0"?>', '<VTKFile type="Collection" version="1.0">', '  <Collection>',
+                      *rows, '  </Collection>', '</VTKFile>', ''])
+    with open(os.path.join(directory, COLLECTION_NAME), 'w') as fh:
+        fh.write(text)
+
+
+# ------------------------- EXPORTER ---------------------------- #
+class FieldExporter:
+    """Pool of ``queue_size + 1`` snapshot buffers written by one worker thread.
+
+    A failed write is re-raised by the next ``acquire`` or by ``close``.
+    """
+
+    def __init__(self, directory: str, fmt: str = 'vti', queue_size: int = 2, compresslevel: int = 1):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(EXPORT_FORMATS)})")
+        self.directory = directory
+        self.format = fmt
+        self.compresslevel = int(compresslevel)
+        # vti streams x fastest, so its buffers are Fortran-ordered and need no transpose copy
+        self.order = 'F' if fmt == 'vti' else 'C'
+        self._free = queue.Queue()
+        for _ in range(max(1, int(queue_size)) + 1):
+            self._free.put({})
+        self._jobs = queue.Queue()
+        self._error = None
+        self._thread = None
+        self.written = 0
+        self.bytes_written = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, specs: dict) -> dict:
+        """A free buffer set {name: array} for ``specs`` {name: (shape, dtype)}; blocks while all are busy."""
+        self._raise_pending_error()
+        t0 = time.perf_counter()
+        buffers = self._free.get()
+        self.wait_seconds += time.perf_counter() - t0
+        for name in list(buffers):
+            if name not in specs:
+                del buffers[name]
+        for name, (shape, dtype) in specs.items():
+            buffer = buffers.get(name)
+            if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != np.dtype(dtype):
+                # Reallocated only when the region or stride changed
+                buffers[name] = np.empty(shape, dtype=dtype, order=self.order)
+        return buffers
+
+    def submit(self, mcs: int, buffers: dict, origin=(0, 0, 0), spacing=(1, 1, 1)) -> str:
+        """Queue ``buffers`` (from ``acquire``) for writing; they return to the pool once written."""
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='field-exporter', daemon=True)
+            self._thread.start()
+        path = os.path.join(self.directory, EXPORT_PATTERN.format(mcs=mcs, ext=self.format))
+        self._jobs.put((path, mcs, buffers, tuple(origin), tuple(spacing)))
+        return path
+
+    def close(self):
+        """Write everything queued, stop the worker and update the vti collection."""
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join()
+            self._thread = None
+            if self.format == 'vti':
+                write_collection(self.directory)
+        self._raise_pending_error()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            path, mcs, buffers, origin, spacing = job
+            try:
+                if self.format == 'vti':
+                    write_vti(path, buffers, origin, spacing, self.compresslevel)
+                else:
+                    write_checkpoint(path, {'mcs': mcs, 'origin': list(origin), 'spacing': list(spacing)},
+                                     buffers, self.compresslevel)
+                self.written += 1
+                self.bytes_written += os.path.getsize(path)
+            except Exception as exc:  # Surfaced on the simulation thread
+                self._error = exc
+            finally:
+                self._free.put(buffers)
+
+    def _raise_pending_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Field export failed: {error}") from error
@@ -0,0 +1,146 @@
+"""Initial cell configurations built as NumPy label volumes.
+
+A configuration is an int32 volume of the lattice's shape: 0 is medium, label k > 0 is
+cell k. All of them are built with array operations:
+
+- ``single_sphere``: one ball of a given radius (the original single seed cell);
+- ``packed_spheres``: one ball per seed, with overlaps split between the nearest seeds;
+- ``voronoi_ball``: a solid ball partitioned into the Voronoi cells of the seeds, i.e. a
+  pre-formed spheroid without gaps;
+- ``load_labels``: a segmented label volume (``.npy``, or ``.npz`` with ``labels`` and an
+  optional per-label ``types`` array), relabelled to 1..n and centred in the lattice.
+
+``lattice_seeds`` places n seeds on a cubic grid of one cell's diameter around a centre.
+``paint_nearest`` does the nearest-seed assignment seed by seed inside a small box, so
+its cost grows with the painted volume rather than voxels times seeds. ``fill_nearest``
+assigns the few voxels it leaves out. ``label_voxels``
+groups the voxels per label in sorted flat order, ready for ``voxel_runs`` slices. No
+CompuCell3D dependency.
+"""
+import math
+
+import numpy as np
+
+
+def sphere_radius(volume) -> np.ndarray:
+    """Radius of a sphere of ``volume`` voxels."""
+    return np.cbrt(3.0 * np.asarray(volume, dtype=np.float64) / (4.0 * math.pi))
+
+def lattice_seeds(n_cells: int, cell_volume: float, center, jitter: float = 0.0, rng=None) -> np.ndarray:
+    """(n, 3) seed positions: the ``n_cells`` grid points nearest ``center`` on a cubic grid of one cell's size.
+
+    ``jitter`` displaces every seed uniformly by up to that fraction of the grid spacing,
+    drawing from ``rng`` (anything with ``random_batch(n)``).
+    """
+    spacing = float(cell_volume) ** (1.0 / 3.0)
+    reach = int(math.ceil(sphere_radius(n_cells) + 1))
+    axis = np.arange(-reach, reach + 1, dtype=np.float64)
+    grid = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    # Stable sort: equidistant points keep grid order, so the choice is deterministic
+    nearest = np.argsort((grid * grid).sum(axis=1), kind='stable')[:int(n_cells)]
+    seeds = grid[nearest] * spacing
+    if jitter > 0 and rng is not None:
+        seeds += (rng.random_batch(seeds.size).reshape(seeds.shape) * 2.0 - 1.0) * jitter * spacing
+    return seeds + np.asarray(center, dtype=np.float64)
+
+def paint_nearest(shape, seeds, radius: float, mask=None) -> np.ndarray:
+    """Label every voxel within ``radius`` of a seed (and inside ``mask``) with its nearest seed (1-based)."""
+    shape = tuple(int(n) for n in shape)
+    labels = np.zeros(shape, dtype=np.int32)
+    best = np.full(shape, np.inf, dtype=np.float32)
+    r = float(radius)
+    limit = np.array(shape)
+    for label, seed in enumerate(np.asarray(seeds, dtype=np.float64).reshape(-1, 3), start=1):
+        lo = np.clip(np.floor(seed - r).astype(np.int64), 0, limit)
+        hi = np.clip(np.floor(seed + r).astype(np.int64) + 1, 0, limit)
+        if (hi <= lo).any():
+            continue
+        box = tuple(slice(int(a), int(b)) for a, b in zip(lo, hi))
+        dx, dy, dz = (np.arange(a, b) - c for a, b, c in zip(lo, hi, seed))
+        dist2 = dx[:, None, None] ** 2 + dy[None, :, None] ** 2 + dz[None, None, :] ** 2
+        closer = (dist2 <= r * r) & (dist2 < best[box])
+        if mask is not None:
+            closer &= mask[box]
+        best[box][closer] = dist2[closer]
+        labels[box][closer] = label
+    return labels
+
+def ball_mask(shape, center, radius: float) -> np.ndarray:
+    """Voxels with ``|x - center|^2 <= radius^2``."""
+    dx, dy, dz = (np.arange(n) - c for n, c in zip(shape, center))
+    return dx[:, None, None] ** 2 + dy[None, :, None] ** 2 + dz[None, None, :] ** 2 <= float(radius) ** 2
+
+def single_sphere(shape, center, radius: float) -> np.ndarray:
+    """One cell filling the ball of ``radius`` around ``center``."""
+    return ball_mask(shape, center, radius).astype(np.int32)
+
+def packed_spheres(shape, seeds, cell_volume: float) -> np.ndarray:
+    """One ball of ``cell_volume`` per seed; where balls overlap, voxels go to the nearest seed."""
+    return paint_nearest(shape, seeds, float(sphere_radius(cell_volume)))
+
+def voronoi_ball(shape, seeds, center, radius: float, cell_volume: float, jitter: float = 0.0) -> np.ndarray:
+    """The ball of ``radius`` around ``center`` split into the Voronoi cells of ``seeds``.
+
+    Inside the seed grid, a voxel's nearest seed is within half a grid diagonal plus the
+    largest jitter displacement, sqrt(3) * (1/2 + ``jitter``) spacings. That bounds the paint
+    radius. Voxels near the ball's surface can lie beyond it (the n grid points only
+    approximate the ball), so whatever is left unlabelled goes to its nearest seed.
+    """
+    spacing = float(cell_volume) ** (1.0 / 3.0)
+    mask = ball_mask(shape, center, radius)
+    labels = paint_nearest(shape, seeds, math.sqrt(3.0) * (0.5 + float(jitter)) * spacing, mask=mask)
+    fill_nearest(labels, seeds, mask)
+    return labels
+
+def fill_nearest(labels, seeds, mask, chunk: int = 4096):
+    """Label every unlabelled voxel of ``mask`` with its nearest seed (1-based), in place."""
+    seeds = np.asarray(seeds, dtype=np.float64).reshape(-1, 3)
+    holes = np.flatnonzero(mask.ravel() & (labels.ravel() == 0))
+    if holes.size == 0 or seeds.size == 0:
+        return
+    flat = labels.reshape(-1)
+    # Chunked so the (holes, seeds) distance matrix stays small
+    for start in range(0, holes.size, chunk):
+        part = holes[start:start + chunk]
+        points = np.stack(np.unravel_index(part, labels.shape), axis=1).astype(np.float64)
+        dist2 = ((points[:, None, :] - seeds[None, :, :]) ** 2).sum(axis=2)
+        flat[part] = dist2.argmin(axis=1).astype(np.int32) + 1
+
+def load_labels(path: str, shape) -> tuple:
+    """(labels, types) from a label volume file, relabelled 1..n and centred in a lattice of ``shape``.
+
+    ``types`` is None unless the ``.npz`` carries a ``types`` array with one entry per
+    original label (sorted label order, background excluded).
+    """
+    types = None
+    if path.endswith('.npz'):
+        with np.load(path, allow_pickle=False) as data:
+            raw = data['labels']
+            if 'types' in data:
+                types = np.asarray(data['types'], dtype=np.int64)
+    else:
+        raw = np.load(path, allow_pickle=False)
+    if raw.ndim != 3:
+        raise ValueError(f"Label volume {path} must be 3D, got shape {raw.shape}")
+    shape = tuple(int(n) for n in shape)
+    if any(a > b for a, b in zip(raw.shape, shape)):
+        raise ValueError(f"Label volume {path} of shape {raw.shape} does not fit the lattice {shape}")
+    values, inverse = np.unique(raw, return_inverse=True)
+    # Background (0) stays 0; every other label becomes its rank
+    foreground = values != 0
+    relabel = np.cumsum(foreground).astype(np.int32) * foreground
+    if types is not None and types.size != np.count_nonzero(foreground):
+        raise ValueError(f"Label volume {path} has {np.count_nonzero(foreground)} labels but {types.size} types")
+    labels = np.zeros(shape, dtype=np.int32)
+    offset = [(b - a) // 2 for a, b in zip(raw.shape, shape)]
+    labels[tuple(slice(o, o + n) for o, n in zip(offset, raw.shape))] = relabel[inverse].reshape(raw.shape)
+    return labels, types
+
+def label_voxels(labels) -> tuple:
+    """(flat, counts): flat C-order indices of labels 1..n grouped by label (sorted within), and voxels per label."""
+    values = labels.ravel()
+    flat = np.flatnonzero(values)
+    # Stable sort keeps each label's voxels in ascending flat order
+    flat = flat[np.argsort(values[flat], kind='stable')]
+    counts = np.bincount(values[flat], minlength=int(values.max(initial=0)) + 1)[1:]
+    return flat, counts
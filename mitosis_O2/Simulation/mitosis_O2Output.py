@@ -0,0 +1,191 @@
+"""Append-only columnar time-series files for headless mitosis_O2 runs.
+
+Layout (Arrow-style record batches, little-endian):
+
+    MAGIC
+    block*:  <u4 header length> <JSON header> <column 0 bytes> <column 1 bytes> ...
+
+Each header lists ``rows`` and the ``columns`` as ``[name, dtype]`` pairs; column data
+follows in that order. ``close()`` appends a header-only block marked ``closed``. Data
+is only ever appended, so earlier blocks are never rewritten. A crash can at worst leave
+one truncated block at the tail, and readers skip it.
+
+``ColumnarWriter`` fills preallocated per-column buffers of ``chunk_rows`` rows and
+writes one block when they are full. Memory therefore stays bounded, and the per-row
+cost is a few array stores even at ``OutputFrequency=1``. This module has no
+CompuCell3D dependency, so sweep tooling can read the files directly.
+"""
+import json
+import os
+import shutil
+import struct
+
+import numpy as np
+
+MAGIC = b'MO2COLS1'
+HEADER_LENGTH = struct.Struct('<I')
+DEFAULT_CHUNK_ROWS = 256
+
+
+# ------------------------- WRITER ---------------------------- #
+class ColumnarWriter:
+    """Buffer rows column-wise and append them to ``path`` one block per ``chunk_rows``."""
+
+    def __init__(self, path: str, columns: dict, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.path = path
+        self.names = tuple(columns)
+        self.dtypes = tuple(np.dtype(dtype).newbyteorder('<') for dtype in columns.values())
+        self.chunk_rows = max(1, int(chunk_rows))
+        self._buffers = [np.empty(self.chunk_rows, dtype=dtype) for dtype in self.dtypes]
+        self._rows = 0
+        self.rows_written = 0
+        # The file is created on the first write, so a writer built only to ``restore`` into
+        # its own path does not empty the rows it is about to resume after
+        self._fh = None
+        self._closed = False
+        self.bytes_written = len(MAGIC)
+
+    def append(self, *values):
+        """Add one row; values are given in column order."""
+        row = self._rows
+        for buffer, value in zip(self._buffers, values):
+            buffer[row] = value
+        self._rows = row + 1
+        if self._rows == self.chunk_rows:
+            self.flush()
+
+    def extend(self, *columns):
+        """Add many rows at once; each argument is one column's values (scalars broadcast)."""
+        n = max((np.size(col) for col in columns), default=0)
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_rows - self._rows)
+            for buffer, col in zip(self._buffers, columns):
+                buffer[self._rows:self._rows + take] = col if np.ndim(col) == 0 else col[start:start + take]
+            self._rows += take
+            start += take
+            if self._rows == self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        """Append buffered rows as one block."""
+        if self._rows == 0:
+            return
+        n = self._rows
+        self._write_block({'rows': n, 'columns': [[name, dtype.str] for name, dtype in zip(self.names, self.dtypes)]},
+                          [buffer[:n] for buffer in self._buffers])
+        self.rows_written += n
+        self._rows = 0
+
+    def close(self):
+        """Flush and mark the file complete."""
+        if self._closed:
+            return
+        self.flush()
+        self._write_block({'rows': 0, 'columns': [], 'closed': True}, [])
+        self._fh.close()
+        self._fh = None
+        self._closed = True
+
+    def checkpoint(self) -> dict:
+        """Flush and return the position a resumed run should continue from."""
+        self.flush()
+        self._open()
+        return {'path': os.path.abspath(self.path), 'bytes': self.bytes_written}
+
+    def restore(self, position: dict):
+        """Continue from a ``checkpoint()`` position if its file still exists."""
+        if position and os.path.exists(position['path']):
+            self.restart_from(position['path'], position['bytes'])
+
+    def restart_from(self, source: str, length: int):
+        """Continue after the first ``length`` bytes of ``source`` (e.g. when resuming a checkpoint)."""
+        if self._fh is not None:
+            self._fh.close()
+        if os.path.abspath(source) == os.path.abspath(self.path):
+            # In place: drop everything after the checkpoint and append from there
+            self._fh = open(self.path, 'r+b')
+            self._fh.truncate(length)
+            self._fh.seek(length)
+        else:
+            with open(source, 'rb') as src, open(self.path, 'wb') as dst:
+                shutil.copyfileobj(_LimitedReader(src, length), dst)
+            self._fh = open(self.path, 'ab')
+        self.bytes_written = length
+        self.rows_written = sum(len(block[self.names[0]]) for block in _iter_blocks(self.path) if block)
+        self._rows = 0
+
+    def _open(self):
+        if self._fh is None:
+            self._fh = open(self.path, 'wb')
+            self._fh.write(MAGIC)
+            self._fh.flush()
+            self.bytes_written = len(MAGIC)
+
+    def _write_block(self, header: dict, columns: list):
+        self._open()
+        encoded = json.dumps(header).encode()
+        parts = [HEADER_LENGTH.pack(len(encoded)), encoded] + [np.ascontiguousarray(col).tobytes() for col in columns]
+        data = b''.join(parts)
+        self._fh.write(data)
+        self._fh.flush()
+        self.bytes_written += len(data)
+
+
+class _LimitedReader:
+    def __init__(self, fh, remaining: int):
+        self.fh = fh
+        self.remaining = remaining
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+# ------------------------- READER ---------------------------- #
+def _iter_blocks(path: str):
+    """Yield {column: array} per data block and None for the closing block; stop at a truncated tail."""
+    with open(path, 'rb') as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise RuntimeError(f"{path} is not a mitosis_O2 columnar file")
+        while True:
+            raw = fh.read(HEADER_LENGTH.size)
+            if len(raw) < HEADER_LENGTH.size:
+                return
+            encoded = fh.read(HEADER_LENGTH.unpack(raw)[0])
+            try:
+                header = json.loads(encoded)
+            except ValueError:
+                return
+            if header.get('closed'):
+                yield None
+                continue
+            block = {}
+            for name, dtype in header['columns']:
+                dtype = np.dtype(dtype)
+                data = fh.read(header['rows'] * dtype.itemsize)
+                if len(data) < header['rows'] * dtype.itemsize:
+                    return
+                block[name] = np.frombuffer(data, dtype=dtype)
+            yield block
+
+def read_columns(path: str) -> dict:
+    """Concatenate every complete block of ``path`` into one array per column."""
+    parts = {}
+    for block in _iter_blocks(path):
+        for name, values in (block or {}).items():
+            parts.setdefault(name, []).append(values)
+    return {name: np.concatenate(values) for name, values in parts.items()}
+
+def is_closed(path: str) -> bool:
+    """True once the writer closed the file, i.e. the run finished cleanly."""
+    if not os.path.exists(path):
+        return False
+    closed = False
+    for block in _iter_blocks(path):
+        closed = block is None
+    return closed
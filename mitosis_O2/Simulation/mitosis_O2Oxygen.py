@@ -0,0 +1,506 @@
+"""Pure-NumPy 3D oxygen reaction-diffusion engine mirroring the DiffusionSolverFE setup.
+
+The solver reads the same ``<DiffusionField Name="Oxygen">`` block as CompuCell3D
+(diffusion/decay constants, initial concentration, per-type ``Uptake`` and the
+boundary planes) and advances the field with explicit finite differences on a
+lattice with one ghost layer per face. Uptake is driven by a cell-type label array,
+so the oxygen coupling can be prototyped or cross-checked without CC3D.
+
+Each MCS is split into ``substeps`` so that ``D * dt <= max_stable_diffusion``
+(1/6 on the 6-neighbour 3D stencil). Uptake and decay are divided evenly over the
+substeps, and every substep applies uptake before diffusion, as DiffusionSolverFE
+does. Uptake models:
+
+* ``'fe'``: CC3D semantics. With ``MichaelisMentenCoef`` the uptake is
+  ``MaxUptake * c / (c + Km)``. Otherwise it is ``min(c * RelativeUptakeRate, MaxUptake)``.
+* ``'michaelis_menten'``: always Michaelis–Menten. When no coefficient is given,
+  ``Km = MaxUptake / RelativeUptakeRate``, which has the same low-O2 slope and
+  the same saturation as the FE clamp.
+
+All buffers are allocated once; stepping does no per-step allocation.
+
+``solve_steady_state`` instead jumps straight to the quasi-steady field
+``D*lap(c) - decay*c - uptake(c) = 0`` for the current cell configuration. It runs
+inexact Newton iterations warm-started from the current field, and solves each
+linearised system with conjugate gradients preconditioned by a geometric multigrid
+V-cycle (Galerkin coarsening, damped Jacobi smoothing). The Jacobian is symmetric
+negative definite because uptake is non-decreasing in ``c``. Oxygen relaxes much
+faster than cells grow, so one solve stands in for thousands of explicit MCS until the
+configuration changes.
+"""
+import math
+import os
+import time
+import xml.etree.ElementTree as ET
+from typing import NamedTuple
+
+import numpy as np
+
+AXES = ('X', 'Y', 'Z')
+BC_VALUE = 'value'
+BC_DERIVATIVE = 'derivative'
+BC_PERIODIC = 'periodic'
+UPTAKE_FE = 'fe'
+UPTAKE_MICHAELIS_MENTEN = 'michaelis_menten'
+# Explicit FTCS stability bound for the 6-neighbour stencil in 3D (dx = dt = 1)
+MAX_STABLE_DIFFUSION_3D = 1.0 / 6.0
+# Inexact Newton forcing term: each linear solve only reduces the residual by this factor
+NEWTON_FORCING = 0.1
+# Multigrid: coarsen until the smallest axis has at most this many voxels
+MULTIGRID_COARSEST = 4
+MULTIGRID_SMOOTHING = 2
+MULTIGRID_COARSE_SWEEPS = 30
+JACOBI_DAMPING = 0.8
+
+
+class SteadyStateReport(NamedTuple):
+    """Outcome of one quasi-steady solve; ``residual`` is max |dc/dt| per MCS at the result."""
+    newton_iterations: int
+    krylov_iterations: int
+    residual: float
+    initial_residual: float
+    seconds: float
+    converged: bool
+
+
+# ------------------------- XML CONFIGURATION ---------------------------- #
+def read_diffusion_config(xml_path: str, field_name: str = 'Oxygen') -> dict:
+    """Extract dims, cell types, diffusion data, uptake and boundaries for one FE field."""
+    root = ET.parse(xml_path).getroot()
+    dims = root.find('Potts/Dimensions')
+    shape = tuple(int(dims.get(a.lower(), 1)) for a in AXES)
+    type_ids = {node.get('TypeName'): int(node.get('TypeId'))
+                for node in root.iter('CellType') if node.get('TypeName') is not None}
+
+    field = None
+    for node in root.iter('DiffusionField'):
+        name = node.get('Name') or node.findtext('DiffusionData/FieldName')
+        if name == field_name:
+            field = node
+            break
+    if field is None:
+        raise RuntimeError(f"DiffusionField '{field_name}' not found in {xml_path}")
+
+    data = field.find('DiffusionData')
+    uptake = {}
+    for node in field.iter('Uptake'):
+        type_id = type_ids[node.get('Type')]
+        km = node.get('MichaelisMentenCoef')
+        uptake[type_id] = (float(node.get('MaxUptake', 0.0)),
+                           float(node.get('RelativeUptakeRate', 0.0)),
+                           None if km is None else float(km))
+
+    # CC3D default is a zero-flux boundary on every face
+    boundaries = {axis: [(BC_DERIVATIVE, 0.0), (BC_DERIVATIVE, 0.0)] for axis in AXES}
+    for plane in field.iter('Plane'):
+        axis = plane.get('Axis').upper()
+        if plane.find('Periodic') is not None:
+            boundaries[axis] = [(BC_PERIODIC, 0.0), (BC_PERIODIC, 0.0)]
+            continue
+        for tag, kind in (('ConstantValue', BC_VALUE), ('ConstantDerivative', BC_DERIVATIVE)):
+            for node in plane.findall(tag):
+                side = 0 if node.get('PlanePosition') == 'Min' else 1
+                boundaries[axis][side] = (kind, float(node.get('Value', 0.0)))
+
+    return {
+        'shape': shape,
+        'type_ids': type_ids,
+        'diffusion': float(data.findtext('DiffusionConstant', '0')),
+        'decay': float(data.findtext('DecayConstant', '0')),
+        'initial': float(data.findtext('InitialConcentration', '0')),
+        'uptake': uptake,
+        'boundaries': {axis: tuple(sides) for axis, sides in boundaries.items()},
+    }
+
+
+# ------------------------- SOLVER ---------------------------- #
+class OxygenSolver:
+    """Explicit, in-place finite-difference solver for one diffusing field with cell uptake."""
+
+    def __init__(self, shape, diffusion: float, decay: float = 0.0, initial: float = 1.0,
+                 uptake: dict | None = None, boundaries: dict | None = None,
+                 uptake_model: str = UPTAKE_FE, max_stable_diffusion: float = MAX_STABLE_DIFFUSION_3D,
+                 dtype=np.float64):
+        if uptake_model not in (UPTAKE_FE, UPTAKE_MICHAELIS_MENTEN):
+            raise ValueError(f"Unknown uptake model '{uptake_model}'")
+        self.shape = tuple(int(n) for n in shape)
+        self.diffusion = float(diffusion)
+        self.decay = float(decay)
+        self.uptake_model = uptake_model
+        self.boundaries = boundaries or {axis: ((BC_DERIVATIVE, 0.0), (BC_DERIVATIVE, 0.0)) for axis in AXES}
+        self.substeps = max(1, math.ceil(self.diffusion / max_stable_diffusion - 1e-12))
+        self.mcs = 0
+
+        # Per-substep coefficients
+        self._d = self.diffusion / self.substeps
+        self._decay = self.decay / self.substeps
+
+        padded = tuple(n + 2 for n in self.shape)
+        self._padded = np.full(padded, initial, dtype=dtype)
+        self.concentration = self._padded[1:-1, 1:-1, 1:-1]
+        self._lap = np.empty(self.shape, dtype=dtype)
+        self._tmp = np.empty(self.shape, dtype=dtype)
+        self._levels = None  # Multigrid hierarchy, allocated on the first steady solve
+
+        # Per-type uptake tables, indexed by cell type id (0 = Medium never consumes)
+        uptake = uptake or {}
+        n_types = max([0, *uptake]) + 1
+        self._vmax_by_type = np.zeros(n_types, dtype=dtype)
+        self._rel_by_type = np.zeros(n_types, dtype=dtype)
+        self._km_by_type = np.ones(n_types, dtype=dtype)
+        self._mm_by_type = np.zeros(n_types, dtype=bool)
+        for type_id, (vmax, rel, km) in uptake.items():
+            self._vmax_by_type[type_id] = vmax / self.substeps
+            self._rel_by_type[type_id] = rel / self.substeps
+            if km is None and uptake_model == UPTAKE_MICHAELIS_MENTEN and rel > 0:
+                km = vmax / rel
+            if km is not None and vmax > 0:
+                self._km_by_type[type_id] = km
+                self._mm_by_type[type_id] = True
+        self._vmax = np.zeros(self.shape, dtype=dtype)
+        self._rel = np.zeros(self.shape, dtype=dtype)
+        self._km = np.ones(self.shape, dtype=dtype)
+        self._mm = np.zeros(self.shape, dtype=bool)
+        self._any_mm = False
+        self._any_clamp = False
+        self._apply_static_boundaries()
+
+    @classmethod
+    def from_xml(cls, xml_path: str | None = None, field_name: str = 'Oxygen', shape=None, **kwargs):
+        """Build a solver from the DiffusionSolverFE block of ``xml_path`` (default: mitosis_O2.xml).
+
+        ``shape`` overrides the XML lattice dimensions, e.g. after the lattice has been grown.
+        """
+        if xml_path is None:
+            xml_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mitosis_O2.xml')
+        config = read_diffusion_config(xml_path, field_name)
+        solver = cls(config['shape'] if shape is None else tuple(shape), config['diffusion'], config['decay'], config['initial'],
+                     config['uptake'], config['boundaries'], **kwargs)
+        solver.type_ids = config['type_ids']
+        return solver
+
+    # --- coupling to cells ---
+    def set_cell_types(self, labels):
+        """Set the per-voxel cell type (0 = Medium) that drives uptake; call when cells change."""
+        labels = np.asarray(labels)
+        if labels.shape != self.shape:
+            raise ValueError(f"Label array shape {labels.shape} does not match field {self.shape}")
+        np.take(self._vmax_by_type, labels, out=self._vmax, mode='clip')
+        np.take(self._rel_by_type, labels, out=self._rel, mode='clip')
+        np.take(self._km_by_type, labels, out=self._km, mode='clip')
+        np.take(self._mm_by_type, labels, out=self._mm, mode='clip')
+        self._any_mm = bool(self._mm.any())
+        self._any_clamp = bool(self._vmax.any()) and not bool(self._mm.all())
+
+    def uptake_rate(self, out=None) -> np.ndarray:
+        """Per-MCS uptake at the current concentration (all substeps combined)."""
+        out = np.empty(self.shape) if out is None else out
+        self._uptake(self.concentration, out)
+        out *= self.substeps
+        return out
+
+    # --- stepping ---
+    def step(self, n_mcs: int = 1):
+        """Advance the field by ``n_mcs`` Monte Carlo steps."""
+        c = self.concentration
+        tmp = self._tmp
+        for _ in range(int(n_mcs) * self.substeps):
+            if self._any_mm or self._any_clamp:
+                self._uptake(c, tmp)
+                c -= tmp
+                # Uptake never drives the concentration negative
+                np.maximum(c, 0.0, out=c)
+            self._diffuse()
+        self.mcs += int(n_mcs)
+
+    def _uptake(self, c, out):
+        if self._any_clamp:
+            # FE semantics: relative uptake, clamped at MaxUptake
+            np.multiply(c, self._rel, out=out)
+            np.minimum(out, self._vmax, out=out)
+        else:
+            out.fill(0.0)
+        if self._any_mm:
+            lap = self._lap  # free between diffusion passes
+            np.add(c, self._km, out=lap)
+            np.divide(c, lap, out=lap)
+            lap *= self._vmax
+            np.copyto(out, lap, where=self._mm)
+        return out
+
+    def _diffuse(self):
+        self._apply_dynamic_boundaries()
+        lap = self._neighbour_sum(self._padded, self._lap)
+        lap *= self._d
+        # c += D * (sum of neighbours - 6c) - decay * c, evaluated from the pre-update field
+        np.multiply(self.concentration, 6.0 * self._d + self._decay, out=self._tmp)
+        lap -= self._tmp
+        self.concentration += lap
+
+    @staticmethod
+    def _neighbour_sum(p, out):
+        np.add(p[:-2, 1:-1, 1:-1], p[2:, 1:-1, 1:-1], out=out)
+        out += p[1:-1, :-2, 1:-1]
+        out += p[1:-1, 2:, 1:-1]
+        out += p[1:-1, 1:-1, :-2]
+        out += p[1:-1, 1:-1, 2:]
+        return out
+
+    # --- quasi-steady state ---
+    def solve_steady_state(self, tol: float = 1e-6, max_newton: int = 20,
+                           max_krylov: int = 100) -> SteadyStateReport:
+        """Replace the field by the steady state for the current cell types (warm start).
+
+        ``tol`` bounds max |dc/dt| per MCS. The current concentration is the initial
+        guess, so re-solving after a few cell changes converges in a couple of Newton steps.
+        """
+        start = time.perf_counter()
+        levels = self._multigrid_levels()
+        fine = levels[0]
+        c = self.concentration
+        residual, delta = fine.rhs, fine.x
+        # Work in per-substep units (same root, better scaled); report per MCS
+        scale = float(self.substeps)
+        newton = krylov = 0
+        norm = initial = self._steady_residual(residual) * scale
+        while norm > tol and newton < max_newton:
+            # -J = -d*lap + decay + uptake slope; coarse levels reuse the summed reaction term
+            reaction = self._uptake_derivative(c, fine.reaction)
+            reaction += self._decay
+            for level, coarse in zip(levels, levels[1:]):
+                level.restrict(level.reaction, coarse.reaction)
+            for level in levels:
+                np.add(level.reaction, 6.0 * level.weight, out=level.diagonal)
+            krylov += self._pcg(levels, NEWTON_FORCING, max_krylov)
+            c += delta
+            np.maximum(c, 0.0, out=c)
+            newton += 1
+            norm = self._steady_residual(residual) * scale
+        self._apply_dynamic_boundaries()
+        return SteadyStateReport(newton, krylov, norm, initial, time.perf_counter() - start, norm <= tol)
+
+    def _multigrid_levels(self) -> list:
+        if self._levels is None:
+            self._levels = [_GridLevel(self.shape, self._d, self.boundaries, self._padded.dtype)]
+            while min(self._levels[-1].shape) > MULTIGRID_COARSEST:
+                fine = self._levels[-1]
+                # Galerkin coarsening with piecewise-constant transfer: 2x2 fine faces per coarse face
+                self._levels.append(_GridLevel(fine.coarse_shape, 4.0 * fine.weight,
+                                               self.boundaries, fine.dtype))
+        return self._levels
+
+    def _steady_residual(self, out) -> float:
+        """out = d*(sum of neighbours - 6c) - decay*c - uptake(c); returns max |out|."""
+        c = self.concentration
+        self._apply_dynamic_boundaries()
+        self._neighbour_sum(self._padded, out)
+        np.multiply(c, 6.0, out=self._tmp)
+        out -= self._tmp
+        out *= self._d
+        if self._decay:
+            np.multiply(c, self._decay, out=self._tmp)
+            out -= self._tmp
+        if self._any_mm or self._any_clamp:
+            out -= self._uptake(c, self._tmp)
+        np.abs(out, out=self._tmp)
+        return float(self._tmp.max()) if out.size else 0.0
+
+    def _uptake_derivative(self, c, out):
+        """d(uptake)/dc per substep: the FE clamp is piecewise linear, Michaelis–Menten smooth."""
+        out.fill(0.0)
+        tmp = self._tmp
+        if self._any_clamp:
+            np.multiply(c, self._rel, out=tmp)
+            np.copyto(out, self._rel, where=tmp < self._vmax)
+        if self._any_mm:
+            np.add(c, self._km, out=tmp)
+            np.multiply(tmp, tmp, out=tmp)
+            np.divide(self._km, tmp, out=tmp)
+            tmp *= self._vmax
+            np.copyto(out, tmp, where=self._mm)
+        return out
+
+    @staticmethod
+    def _pcg(levels, forcing: float, max_iter: int) -> int:
+        """Solve (-J) x = rhs on the fine level by CG with a multigrid V-cycle preconditioner."""
+        fine = levels[0]
+        x, r, z, p, ap = fine.x, fine.r, fine.z, fine.p, fine.ap
+        x.fill(0.0)
+        np.copyto(r, fine.rhs)
+        target = forcing * math.sqrt(float(np.vdot(r, r)))
+        _v_cycle(levels, 0, r, z)
+        np.copyto(p, z)
+        rz = float(np.vdot(r, z))
+        for iteration in range(1, max_iter + 1):
+            fine.apply(p, ap)
+            pap = float(np.vdot(p, ap))
+            if pap <= 0.0:
+                return iteration
+            alpha = rz / pap
+            np.multiply(p, alpha, out=fine.tmp)
+            x += fine.tmp
+            np.multiply(ap, alpha, out=fine.tmp)
+            r -= fine.tmp
+            if math.sqrt(float(np.vdot(r, r))) <= target:
+                return iteration
+            _v_cycle(levels, 0, r, z)
+            rz_next = float(np.vdot(r, z))
+            p *= rz_next / rz
+            p += z
+            rz = rz_next
+        return max_iter
+
+    # --- boundaries via ghost layers ---
+    def _ghost(self, axis: int, side: int):
+        index = [slice(1, -1)] * 3
+        index[axis] = 0 if side == 0 else -1
+        return self._padded[tuple(index)]
+
+    def _edge(self, axis: int, side: int):
+        index = [slice(1, -1)] * 3
+        index[axis] = 1 if side == 0 else -2
+        return self._padded[tuple(index)]
+
+    def _apply_static_boundaries(self):
+        for axis, name in enumerate(AXES):
+            for side, (kind, value) in enumerate(self.boundaries[name]):
+                if kind == BC_VALUE:
+                    self._ghost(axis, side)[...] = value
+
+    def _apply_dynamic_boundaries(self):
+        for axis, name in enumerate(AXES):
+            for side, (kind, value) in enumerate(self.boundaries[name]):
+                if kind == BC_DERIVATIVE:
+                    # Outward derivative: ghost = edge + value (value 0 -> zero flux)
+                    np.add(self._edge(axis, side), value, out=self._ghost(axis, side))
+                elif kind == BC_PERIODIC:
+                    np.copyto(self._ghost(axis, side), self._edge(axis, 1 - side))
+
+
+# ------------------------- MULTIGRID ---------------------------- #
+class _GridLevel:
+    """One level of the symmetric operator ``A v = diagonal*v - weight*(sum of neighbours)``.
+
+    Boundaries are homogeneous versions of the field's: value faces pin the ghost to 0,
+    flux faces mirror the edge, periodic faces wrap.
+    """
+
+    def __init__(self, shape, weight: float, boundaries: dict, dtype):
+        self.shape = tuple(shape)
+        self.weight = weight
+        self.boundaries = boundaries
+        self.dtype = dtype
+        self.coarse_shape = tuple((n + 1) // 2 for n in self.shape)
+        for name in ('x', 'rhs', 'work', 'tmp', 'reaction', 'diagonal', 'r', 'z', 'p', 'ap'):
+            setattr(self, name, np.zeros(self.shape, dtype=dtype))
+        self.padded = np.zeros(tuple(n + 2 for n in self.shape), dtype=dtype)
+        # Zero-padded to even extents so 2x2x2 blocks are a reshape away
+        self.even = np.zeros(tuple(2 * n for n in self.coarse_shape), dtype=dtype)
+
+    def apply(self, v, out):
+        p = self.padded
+        p[1:-1, 1:-1, 1:-1] = v
+        for axis, name in enumerate(AXES):
+            for side, (kind, _) in enumerate(self.boundaries[name]):
+                index = [slice(1, -1)] * 3
+                index[axis] = 0 if side == 0 else -1
+                ghost = p[tuple(index)]
+                if kind == BC_VALUE:
+                    ghost[...] = 0.0
+                    continue
+                if kind == BC_DERIVATIVE:
+                    index[axis] = 1 if side == 0 else -2
+                else:
+                    index[axis] = -2 if side == 0 else 1
+                np.copyto(ghost, p[tuple(index)])
+        OxygenSolver._neighbour_sum(p, out)
+        out *= -self.weight
+        np.multiply(v, self.diagonal, out=self.tmp)
+        out += self.tmp
+        return out
+
+    def _blocks(self):
+        cx, cy, cz = self.coarse_shape
+        return self.even.reshape(cx, 2, cy, 2, cz, 2)
+
+    def restrict(self, fine, coarse_out):
+        nx, ny, nz = self.shape
+        self.even[:nx, :ny, :nz] = fine
+        self._blocks().sum(axis=(1, 3, 5), out=coarse_out)
+
+    def prolong_add(self, coarse, fine_out):
+        nx, ny, nz = self.shape
+        self._blocks()[...] = coarse[:, None, :, None, :, None]
+        fine_out += self.even[:nx, :ny, :nz]
+        # Restore the zero padding that restrict() relies on
+        self.even[nx:] = 0.0
+        self.even[:, ny:] = 0.0
+        self.even[:, :, nz:] = 0.0
+
+    def smooth(self, b, x, sweeps: int):
+        """Damped Jacobi sweeps on ``A x = b``; symmetric, so the V-cycle stays SPD for CG."""
+        work = self.work
+        for _ in range(sweeps):
+            self.apply(x, work)
+            np.subtract(b, work, out=work)
+            np.divide(work, self.diagonal, out=work)
+            work *= JACOBI_DAMPING
+            x += work
+
+
+def _v_cycle(levels, index: int, b, x):
+    """x = M^-1 b for one symmetric V-cycle starting at ``levels[index]``."""
+    level = levels[index]
+    x.fill(0.0)
+    if index == len(levels) - 1:
+        level.smooth(b, x, MULTIGRID_COARSE_SWEEPS)
+        return x
+    coarse = levels[index + 1]
+    level.smooth(b, x, MULTIGRID_SMOOTHING)
+    level.apply(x, level.work)
+    np.subtract(b, level.work, out=level.work)
+    level.restrict(level.work, coarse.rhs)
+    _v_cycle(levels, index + 1, coarse.rhs, coarse.x)
+    level.prolong_add(coarse.x, x)
+    level.smooth(b, x, MULTIGRID_SMOOTHING)
+    return x
+
+
+# ------------------------- HELPERS ---------------------------- #
+def sphere_labels(shape, radius: float, inner_radius: float = 0.0, shell_type: int = 1,
+                  core_type: int = 2, center=None) -> np.ndarray:
+    """Label array with a sphere of ``shell_type`` around a core of ``core_type`` (for prototyping)."""
+    center = np.asarray(center if center is not None else [n / 2.0 for n in shape])
+    grid = np.ogrid[tuple(slice(0, n) for n in shape)]
+    r2 = sum((g - c) ** 2 for g, c in zip(grid, center))
+    labels = np.zeros(shape, dtype=np.int8)
+    labels[r2 <= radius * radius] = shell_type
+    labels[r2 <= inner_radius * inner_radius] = core_type
+    return labels
+
+def max_abs_difference(solver: OxygenSolver, reference) -> float:
+    """Largest pointwise deviation from a reference field (e.g. an exported CC3D Oxygen field)."""
+    return float(np.max(np.abs(solver.concentration - np.asarray(reference))))
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Time the NumPy oxygen solver on a synthetic spheroid')
+    parser.add_argument('--steps', type=int, default=50)
+    parser.add_argument('--radius', type=float, default=20.0)
+    parser.add_argument('--uptake-model', default=UPTAKE_FE, choices=(UPTAKE_FE, UPTAKE_MICHAELIS_MENTEN))
+    parser.add_argument('--steady', action='store_true', help='also time a quasi-steady solve and compare')
+    args = parser.parse_args()
+    solver = OxygenSolver.from_xml(uptake_model=args.uptake_model)
+    solver.set_cell_types(sphere_labels(solver.shape, args.radius, args.radius / 2))
+    start = time.perf_counter()
+    solver.step(args.steps)
+    elapsed = time.perf_counter() - start
+    c = solver.concentration
+    print(f"{args.steps} MCS x {solver.substeps} substeps on {solver.shape}: {elapsed:.2f}s "
+          f"({elapsed / args.steps * 1e3:.1f} ms/MCS); O2 min={c.min():.4f} mean={c.mean():.4f}")
+    if args.steady:
+        report = solver.solve_steady_state()
+        print(f"steady solve: {report.seconds:.2f}s (= {report.seconds / (elapsed / args.steps):.0f} explicit MCS), "
+              f"newton={report.newton_iterations} cg={report.krylov_iterations} "
+              f"residual={report.initial_residual:.2e}->{report.residual:.2e}; O2 min={c.min():.4f} mean={c.mean():.4f}")
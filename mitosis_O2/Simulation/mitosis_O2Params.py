@@ -0,0 +1,323 @@
+"""Layered, validated parameter store for the mitosis_O2 model.
+
+Values are resolved from three layers, later layers winning:
+
+1. ``<UserParameters>`` defaults in mitosis_O2.xml (streaming parse, cached by mtime, content hash
+   and parser/schema version),
+2. an overlay: the JSON file named by ``MITOSIS_O2_PARAMS`` plus single ``MITOSIS_O2_PARAM_<Name>``
+   environment variables,
+3. programmatic overrides set with ``PARAMETERS.override(...)``.
+
+The merged set is type- and range-checked once against ``SCHEMA``; steppables then take an
+immutable ``snapshot()`` and read plain dict entries. This module has no CompuCell3D
+dependency so sweep tooling can use it directly.
+"""
+import hashlib
+import json
+import logging
+import os
+import xml.etree.ElementTree as ET
+from collections.abc import Mapping
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_XML = 'mitosis_O2.xml'
+OVERLAY_ENV_VAR = 'MITOSIS_O2_PARAMS'
+PARAM_ENV_PREFIX = 'MITOSIS_O2_PARAM_'
+INF = float('inf')
+
+
+class ParamSpec(NamedTuple):
+    type: type
+    low: float = -INF
+    high: float = INF
+
+
+# Declared types and valid ranges; parameters missing here are accepted with the inferred type
+SCHEMA = {
+    'InitialCellRadius': ParamSpec(float, 0.5),
+    'InitMode': ParamSpec(str),
+    'InitCellCount': ParamSpec(int, 1),
+    'InitCellVolume': ParamSpec(float, 1.0),
+    'InitSeedJitter': ParamSpec(float, 0.0, 0.5),
+    'InitLabelFile': ParamSpec(str),
+    'FinalTargetVolume': ParamSpec(float, 1.0),
+    'GrowthRateNormoxic': ParamSpec(float),
+    'LambdaVolumeNormoxic': ParamSpec(float, 0.0),
+    'LambdaVolumeHypoxic': ParamSpec(float, 0.0),
+    'LambdaVolumeNecrotic': ParamSpec(float, 0.0),
+    'LambdaSurfaceNormoxic': ParamSpec(float, 0.0),
+    'LambdaSurfaceHypoxic': ParamSpec(float, 0.0),
+    'LambdaSurfaceNecrotic': ParamSpec(float, 0.0),
+    'O2_Thresh_NormoxicHypoxic': ParamSpec(float, 0.0),
+    'O2_Thresh_HypoxicNecrotic': ParamSpec(float, 0.0),
+    'FateBatchMode': ParamSpec(int, 0, 1),
+    'O2SampleMode': ParamSpec(int, 0, 3),
+    'O2SamplePercentile': ParamSpec(float, 0.0, 100.0),
+    'O2SampleMoveTolerance': ParamSpec(float, 0.0),
+    'DivProbNormoxic': ParamSpec(float, 0.0, 1.0),
+    'MitosisScheduled': ParamSpec(int, 0, 1),
+    'NecroticShrinkageRate': ParamSpec(float, 0.0, 1.0),
+    'NecroticLifetime': ParamSpec(int, 0),
+    'CenterPushStrength': ParamSpec(float),
+    'CompactionForceLaw': ParamSpec(int, 0, 2),
+    'CompactionForceCap': ParamSpec(float, 0.0),
+    'CompactionMoveTolerance': ParamSpec(float, 0.0),
+    'O2SteadyState': ParamSpec(int, 0, 1),
+    'O2ResolveFraction': ParamSpec(float, 0.0, 1.0),
+    'O2ResolveMaxInterval': ParamSpec(int, 0),
+    'O2SteadyStateTol': ParamSpec(float, 0.0),
+    'OutputFrequency': ParamSpec(int, 1),
+    'AnalysisPlots': ParamSpec(int, 0, 1),
+    'AnalysisOutput': ParamSpec(str),
+    'ProfileBinWidth': ParamSpec(float, 1e-3),
+    'ProfileOutput': ParamSpec(str),
+    'EventLog': ParamSpec(int, 0, 1),
+    'EventLogOutput': ParamSpec(str),
+    'ExportPeriod': ParamSpec(int, 0),
+    'ExportDir': ParamSpec(str),
+    'ExportFormat': ParamSpec(str),
+    'ExportFields': ParamSpec(str),
+    'ExportStride': ParamSpec(int, 1),
+    'ExportActiveBox': ParamSpec(int, 0, 1),
+    'ExportQueue': ParamSpec(int, 1),
+    'ExportCompression': ParamSpec(int, 0, 9),
+    'ActiveBoxMargin': ParamSpec(int, 0),
+    'DomainAutoGrow': ParamSpec(int, 0, 1),
+    'DomainGrowFactor': ParamSpec(float, 1.0),
+    'DomainMaxSize': ParamSpec(int, 1),
+    'AdaptiveCadence': ParamSpec(int, 0, 1),
+    'CadenceMinInterval': ParamSpec(int, 1),
+    'CadenceMaxInterval': ParamSpec(int, 1),
+    'CadenceChangeTarget': ParamSpec(float, 0.0, 1.0),
+    'Profiling': ParamSpec(int, 0, 1),
+    'ProfilingDir': ParamSpec(str),
+    'ProfilingBuffer': ParamSpec(int, 1),
+    'ProfilerStartMCS': ParamSpec(int, 0),
+    'ProfilerStopMCS': ParamSpec(int, 0),
+    'RandomSeed': ParamSpec(int, 0),
+    'RNGStreams': ParamSpec(int, 0, 1),
+    'CheckpointPeriod': ParamSpec(int, 0),
+    'CheckpointKeep': ParamSpec(int, 1),
+    'CheckpointDir': ParamSpec(str),
+    'CheckpointRestore': ParamSpec(str),
+    'CheckpointReseed': ParamSpec(int, 0, 1),
+    'RT_Enable': ParamSpec(int, 0, 1),
+    'RT_Alpha': ParamSpec(float, 0.0),
+    'RT_Beta': ParamSpec(float, 0.0),
+    'RT_DoseGy': ParamSpec(float, 0.0),
+    'RT_StartMCS': ParamSpec(int, 0),
+    'RT_PeriodMCS': ParamSpec(int, 0),
+    'RT_Fractions': ParamSpec(int, 0),
+    'RT_BatchMode': ParamSpec(int, 0, 1),
+    'RT_OERModel': ParamSpec(int, 0, 1),
+    'RT_OERMax': ParamSpec(float, 1.0),
+    'RT_OER_K': ParamSpec(float, 1e-9),
+    'RT_DoseMap': ParamSpec(str),
+}
+
+
+# ------------------------- XML DEFAULTS ---------------------------- #
+def parse_value(name: str, text: str):
+    """Infer int/float from the text exactly like the original XML loader did."""
+    spec = SCHEMA.get(name)
+    if spec is not None and spec.type is str:
+        return text
+    try:
+        return float(text) if ('.' in text or 'e' in text.lower()) else int(text)
+    except ValueError:
+        raise RuntimeError(f"Parameter {name} has non-numeric value '{text}'")
+
+def _parse_user_parameters(xml_path: str) -> dict:
+    # Streaming parse: stop as soon as </UserParameters> is seen
+    params = {}
+    found = False
+    for event, node in ET.iterparse(xml_path, events=('start', 'end')):
+        if node.tag == 'UserParameters':
+            found = True
+            if event == 'end':
+                break
+        elif found and event == 'start' and node.tag == 'Param':
+            name = node.get('Name')
+            if name:
+                params[name] = parse_value(name, node.get('Value', ''))
+    if not found:
+        raise RuntimeError('UserParameters block missing in XML')
+    return params
+
+_MEMORY_CACHE = {}
+# Bump when _parse_user_parameters or parse_value change what they return
+PARSER_VERSION = 1
+
+def _parser_key() -> str:
+    """Hash of the parser version and the schema, so on-disk parses made by other code are not reused."""
+    schema = sorted((name, spec.type.__name__, repr(spec.low), repr(spec.high)) for name, spec in SCHEMA.items())
+    return hashlib.sha256(json.dumps([PARSER_VERSION, schema]).encode()).hexdigest()
+
+def _cache_path(xml_path: str) -> str:
+    return os.path.join(os.path.dirname(xml_path), '__pycache__', os.path.basename(xml_path) + '.params.json')
+
+def load_user_parameters(xml_path: str) -> dict:
+    """Return the <UserParameters> of ``xml_path``, reusing the parse when the file is unchanged.
+
+    Unchanged mtime/size hits the in-process or on-disk cache without reading the file; a
+    touched-but-identical file is recognized by its SHA-256 and not reparsed either. The disk
+    cache is only used when it was written with the same ``PARSER_VERSION`` and ``SCHEMA``.
+    """
+    xml_path = os.path.abspath(xml_path)
+    stat = os.stat(xml_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _MEMORY_CACHE.get(xml_path)
+    if cached is not None and cached[0] == key:
+        return dict(cached[1])
+
+    cache_file = _cache_path(xml_path)
+    disk = None
+    try:
+        with open(cache_file) as fh:
+            disk = json.load(fh)
+    except (OSError, ValueError):
+        pass
+    parser = _parser_key()
+    if disk is not None and disk.get('parser') != parser:
+        disk = None
+    if disk is not None and (disk.get('mtime_ns'), disk.get('size')) == key:
+        params = disk['params']
+    else:
+        with open(xml_path, 'rb') as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+        params = disk['params'] if disk is not None and disk.get('sha256') == digest else None
+        if params is None:
+            params = _parse_user_parameters(xml_path)
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as fh:
+                json.dump({'mtime_ns': key[0], 'size': key[1], 'sha256': digest, 'parser': parser,
+                           'params': params}, fh)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass  # Read-only project directories just skip the disk cache
+    _MEMORY_CACHE[xml_path] = (key, params)
+    return dict(params)
+
+
+# ------------------------- VALIDATION ---------------------------- #
+def coerce(name: str, value):
+    """Convert ``value`` to the declared type of ``name`` and check its range."""
+    spec = SCHEMA.get(name)
+    if isinstance(value, str) and (spec is None or spec.type is not str):
+        value = parse_value(name, value)
+    if spec is None:
+        return value
+    if spec.type is str:
+        return str(value)
+    if spec.type is int:
+        if float(value) != int(float(value)):
+            raise ValueError(f"Parameter {name} must be an integer, got {value!r}")
+        value = int(float(value))
+    else:
+        value = float(value)
+    if not spec.low <= value <= spec.high:
+        raise ValueError(f"Parameter {name}={value} outside valid range [{spec.low}, {spec.high}]")
+    return value
+
+
+class ParameterSnapshot(Mapping):
+    """Immutable view of resolved parameters; lookups are plain dict reads."""
+
+    __slots__ = ('_values',)
+
+    def __init__(self, values: dict):
+        self._values = values
+
+    def __getitem__(self, name: str):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise KeyError(f"Missing required parameter '{name}' in XML <UserParameters>") from None
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# ------------------------- LAYERED STORE ---------------------------- #
+class ParameterStore:
+    """XML defaults, then file/env overlay, then programmatic overrides; resolved lazily."""
+
+    def __init__(self, xml_filename: str = DEFAULT_XML, environ=None):
+        self.xml_filename = xml_filename
+        self.environ = os.environ if environ is None else environ
+        self._overrides = {}
+        self._resolved = None
+
+    @property
+    def xml_path(self) -> str:
+        xml_path = self.xml_filename
+        if not os.path.exists(xml_path):
+            xml_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), self.xml_filename)
+        if not os.path.exists(xml_path):
+            raise FileNotFoundError(
+                f"Cannot find XML file '{self.xml_filename}' relative to simulation script or steppable directory"
+            )
+        return xml_path
+
+    def defaults(self) -> dict:
+        return load_user_parameters(self.xml_path)
+
+    def overlay(self) -> dict:
+        values = {}
+        overlay_path = self.environ.get(OVERLAY_ENV_VAR)
+        if overlay_path:
+            with open(overlay_path) as fh:
+                values.update(json.load(fh))
+        for key, text in self.environ.items():
+            if key.startswith(PARAM_ENV_PREFIX):
+                values[key[len(PARAM_ENV_PREFIX):]] = text
+        return values
+
+    def override(self, **values):
+        """Set programmatic overrides; they apply to snapshots taken afterwards."""
+        self._overrides.update(values)
+        self._resolved = None
+
+    def clear_overrides(self):
+        self._overrides = {}
+        self._resolved = None
+
+    def reload(self):
+        """Forget the resolved set so the next access re-reads XML and overlay."""
+        self._resolved = None
+
+    def resolve(self) -> dict:
+        if self._resolved is not None:
+            return self._resolved
+        merged = self.defaults()
+        known = set(merged) | set(SCHEMA)
+        for layer in (self.overlay(), self._overrides):
+            unknown = sorted(set(layer) - known)
+            if unknown:
+                raise KeyError(f"Unknown parameter(s) {', '.join(unknown)}: not in XML <UserParameters>")
+            merged.update(layer)
+        self._resolved = {name: coerce(name, value) for name, value in merged.items()}
+        logger.info(f"[PARAM] Resolved {len(self._resolved)} parameters from XML and overlays")
+        return self._resolved
+
+    def get(self, name: str):
+        values = self._resolved if self._resolved is not None else self.resolve()
+        if name not in values:
+            raise KeyError(f"Missing required parameter '{name}' in XML <UserParameters>")
+        return values[name]
+
+    def snapshot(self) -> ParameterSnapshot:
+        return ParameterSnapshot(self.resolve())
+
+
+PARAMETERS = ParameterStore()
+
+def P(name: str):
+    return PARAMETERS.get(name)
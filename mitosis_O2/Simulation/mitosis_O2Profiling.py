@@ -0,0 +1,218 @@
+"""Per-steppable wall-time instrumentation for mitosis_O2.
+
+``StepProfiler.instrument`` replaces a steppable's ``start``/``step`` with timed wrappers.
+Each call is recorded with its MCS, the cell count and the events counted during it
+(transitions, divisions, deletions, radiotherapy kills):
+
+- into a fixed-size ring buffer, which keeps the most recent calls;
+- into per-steppable latency histograms with log-spaced bins;
+- into a cost-versus-cell-count table with power-of-two buckets.
+
+The Potts and PDE engine time is recorded as the pseudo-steppable ``ENGINE``. It is the gap
+between the last steppable call of one MCS and the first call of the next.
+
+``WindowSampler`` profiles a window of MCS with pyinstrument if it is installed (a
+sampling profiler) and with cProfile otherwise. Nothing is wrapped unless profiling is
+enabled, so a disabled profiler costs nothing. No CompuCell3D dependency.
+"""
+import json
+import logging
+import math
+import os
+import time
+
+import numpy as np
+
+from mitosis_O2Output import ColumnarWriter
+
+logger = logging.getLogger(__name__)
+
+ENGINE = 'engine (Potts + PDE)'
+# Latency histogram: BINS_PER_DECADE log bins from 10**MIN_DECADE s to 10**MAX_DECADE s
+BINS_PER_DECADE = 10
+MIN_DECADE = -7
+MAX_DECADE = 2
+N_LATENCY_BINS = (MAX_DECADE - MIN_DECADE) * BINS_PER_DECADE
+# Cost table buckets: cell counts in [2**(k-1), 2**k)
+N_CELL_BUCKETS = 32
+EVENT_NAMES = ('transitions', 'divisions', 'deletions', 'kills')
+RECORD_DTYPE = np.dtype([('mcs', np.int64), ('steppable', np.int16), ('seconds', np.float64),
+                         ('cells', np.int32)] + [(name, np.int32) for name in EVENT_NAMES])
+
+
+class EventCounts:
+    """Running totals of cell events; steppables bump them where the events happen."""
+
+    __slots__ = EVENT_NAMES
+
+    def __init__(self):
+        for name in EVENT_NAMES:
+            setattr(self, name, 0)
+
+    def as_tuple(self) -> tuple:
+        return self.transitions, self.divisions, self.deletions, self.kills
+
+
+class StepProfiler:
+    """Timers, ring buffer, latency histograms and cost table for instrumented steppables."""
+
+    def __init__(self, events: EventCounts, count_cells, capacity: int = 4096, sampler=None):
+        self.events = events
+        self.count_cells = count_cells
+        self.names = [ENGINE]
+        self.sampler = sampler
+        self.capacity = max(1, int(capacity))
+        self.records = np.zeros(self.capacity, dtype=RECORD_DTYPE)
+        self.n_records = 0
+        self.histograms = np.zeros((1, N_LATENCY_BINS), dtype=np.int64)
+        self.cost_seconds = np.zeros((1, N_CELL_BUCKETS))
+        self.cost_calls = np.zeros((1, N_CELL_BUCKETS), dtype=np.int64)
+        self.start_seconds = [0.0]
+        self._mcs = None
+        self._cells = 0
+        self._last_end = None
+
+    def instrument(self, steppable, name: str | None = None):
+        """Wrap ``steppable.start`` and ``steppable.step`` with timers."""
+        index = len(self.names)
+        self.names.append(name or type(steppable).__name__)
+        self.start_seconds.append(0.0)
+        self.histograms = np.vstack((self.histograms, np.zeros(N_LATENCY_BINS, dtype=np.int64)))
+        self.cost_seconds = np.vstack((self.cost_seconds, np.zeros(N_CELL_BUCKETS)))
+        self.cost_calls = np.vstack((self.cost_calls, np.zeros(N_CELL_BUCKETS, dtype=np.int64)))
+        start, step = steppable.start, steppable.step
+
+        def timed_start():
+            t0 = time.perf_counter()
+            start()
+            self.start_seconds[index] += time.perf_counter() - t0
+
+        def timed_step(mcs):
+            if mcs != self._mcs:
+                self._begin_mcs(mcs)
+            before = self.events.as_tuple()
+            t0 = time.perf_counter()
+            step(mcs)
+            t1 = time.perf_counter()
+            after = self.events.as_tuple()
+            self._record(index, mcs, t1 - t0, [a - b for a, b in zip(after, before)])
+            self._last_end = t1
+
+        steppable.start = timed_start
+        steppable.step = timed_step
+
+    def _begin_mcs(self, mcs):
+        now = time.perf_counter()
+        self._cells = self.count_cells()
+        if self._last_end is not None:
+            self._record(0, mcs, now - self._last_end, (0, 0, 0, 0))
+        if self.sampler is not None:
+            self.sampler.at_mcs(mcs)
+        self._mcs = mcs
+
+    def _record(self, index: int, mcs: int, seconds: float, events):
+        self.records[self.n_records % self.capacity] = (mcs, index, seconds, self._cells, *events)
+        self.n_records += 1
+        latency_bin = int((math.log10(max(seconds, 1e-12)) - MIN_DECADE) * BINS_PER_DECADE)
+        self.histograms[index, min(max(latency_bin, 0), N_LATENCY_BINS - 1)] += 1
+        bucket = min(self._cells.bit_length(), N_CELL_BUCKETS - 1)
+        self.cost_seconds[index, bucket] += seconds
+        self.cost_calls[index, bucket] += 1
+
+    # --- export ---
+    def recent_records(self) -> np.ndarray:
+        """Ring buffer contents, oldest first."""
+        if self.n_records <= self.capacity:
+            return self.records[:self.n_records].copy()
+        split = self.n_records % self.capacity
+        return np.concatenate((self.records[split:], self.records[:split]))
+
+    def report(self) -> dict:
+        """Totals, latency percentiles and histograms, and the cost-vs-cell-count table."""
+        edges = 10.0 ** (MIN_DECADE + np.arange(N_LATENCY_BINS + 1) / BINS_PER_DECADE)
+        calls = self.histograms.sum(axis=1)
+        total = self.cost_seconds.sum(axis=1)
+        steppables = []
+        for index, name in enumerate(self.names):
+            cumulative = np.cumsum(self.histograms[index])
+            percentiles = {}
+            for q in (50, 90, 99):
+                if calls[index]:
+                    # Upper edge of the bin holding the q-th percentile
+                    percentiles[f'p{q}'] = float(edges[np.searchsorted(cumulative, q / 100.0 * calls[index]) + 1])
+            steppables.append({
+                'name': name, 'calls': int(calls[index]), 'seconds': float(total[index]),
+                'mean_seconds': float(total[index] / calls[index]) if calls[index] else 0.0,
+                'start_seconds': self.start_seconds[index], **percentiles,
+                'histogram': self.histograms[index].tolist(),
+            })
+        used = np.flatnonzero(self.cost_calls.sum(axis=0))
+        cost_table = []
+        for bucket in used.tolist():
+            low = 0 if bucket == 0 else 1 << (bucket - 1)
+            mean = np.divide(self.cost_seconds[:, bucket], self.cost_calls[:, bucket],
+                             out=np.zeros(len(self.names)), where=self.cost_calls[:, bucket] > 0)
+            cost_table.append({'cells_low': low, 'cells_high': 1 << bucket,
+                               'mean_seconds': dict(zip(self.names, mean.tolist()))})
+        return {'latency_bin_edges': edges.tolist(), 'steppables': steppables, 'cost_vs_cells': cost_table,
+                'records': self.n_records}
+
+    def write(self, directory: str) -> dict:
+        """Write ``profile_summary.json`` and the ring buffer as ``profile_steps.cols``; return the report."""
+        os.makedirs(directory, exist_ok=True)
+        report = self.report()
+        with open(os.path.join(directory, 'profile_summary.json'), 'w') as fh:
+            json.dump(report, fh, indent=1)
+        records = self.recent_records()
+        steps = ColumnarWriter(os.path.join(directory, 'profile_steps.cols'),
+                               {name: RECORD_DTYPE[name] for name in RECORD_DTYPE.names},
+                               chunk_rows=max(1, len(records)))
+        steps.extend(*(records[name] for name in RECORD_DTYPE.names))
+        steps.close()
+        if self.sampler is not None:
+            self.sampler.close()
+        return report
+
+
+class WindowSampler:
+    """Profile MCS [start_mcs, stop_mcs) and write the result to ``path_stem`` + .html or .prof."""
+
+    def __init__(self, start_mcs: int, stop_mcs: int, path_stem: str):
+        self.start_mcs = int(start_mcs)
+        self.stop_mcs = int(stop_mcs)
+        self.path_stem = path_stem
+        self._profiler = None
+        self.path = None
+
+    def at_mcs(self, mcs: int):
+        if mcs == self.start_mcs and self._profiler is None:
+            self._begin()
+        elif mcs >= self.stop_mcs and self._profiler is not None:
+            self.close()
+
+    def _begin(self):
+        try:
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+        except ImportError:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            return
+        self._profiler.start()
+
+    def close(self):
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return
+        os.makedirs(os.path.dirname(self.path_stem) or '.', exist_ok=True)
+        if hasattr(profiler, 'output_html'):
+            profiler.stop()
+            self.path = f"{self.path_stem}.html"
+            with open(self.path, 'w') as fh:
+                fh.write(profiler.output_html())
+        else:
+            profiler.disable()
+            self.path = f"{self.path_stem}.prof"
+            profiler.dump_stats(self.path)
+        logger.info(f"[PROFILING] MCS {self.start_mcs}-{self.stop_mcs} profile written to {self.path}")
@@ -0,0 +1,120 @@
+"""Named, reproducible random streams for the mitosis_O2 steppables.
+
+``RandomStreams`` holds one master ``SeedSequence`` (from RandomSeed, or fresh entropy)
+and hands out one ``RandomStream`` per name. Each stream is a NumPy PCG64 ``Generator``
+seeded by the child sequence ``SeedSequence(entropy, spawn_key=(crc32(name),))``.
+Streams are therefore statistically independent, and a steppable's draws do not depend
+on how many numbers other steppables consumed or on the order in which they were created.
+Runs seeded from distinct master seeds (sweep replicates) are independent as well.
+
+A stream serves single draws from a buffer refilled ``BUFFER_SIZE`` numbers at a time, and
+``random_batch(n)`` serves n draws in one call. Both read the same sequence, so n single
+draws equal one batch of n. ``state()`` and ``load_state()`` capture a stream exactly,
+including its partly used buffer, for checkpoints and run metadata. No CompuCell3D
+dependency.
+"""
+import random
+import zlib
+
+import numpy as np
+
+BUFFER_SIZE = 1024
+
+
+def stream_key(name: str) -> int:
+    """Stable spawn key of a stream name (``hash`` is salted per process)."""
+    return zlib.crc32(name.encode())
+
+
+class RandomStream:
+    """Buffered uniform [0, 1) draws from one NumPy generator."""
+
+    def __init__(self, seed_sequence, buffer_size: int = BUFFER_SIZE):
+        self.buffer_size = int(buffer_size)
+        self.seed(seed_sequence)
+
+    def seed(self, seed_sequence):
+        """Restart the stream from ``seed_sequence`` (in place, so holders keep a valid reference)."""
+        self.generator = np.random.Generator(np.random.PCG64(seed_sequence))
+        self._refill(0)
+
+    def _refill(self, size: int):
+        # The buffer is reproducible from the generator state it was drawn from
+        self._origin = self.generator.bit_generator.state
+        self._buffer = self.generator.random(size).tolist() if size else []
+        self._position = 0
+
+    def random(self) -> float:
+        if self._position >= len(self._buffer):
+            self._refill(self.buffer_size)
+        value = self._buffer[self._position]
+        self._position += 1
+        return value
+
+    def random_batch(self, n: int) -> np.ndarray:
+        """The next ``n`` draws as an array, the same values as ``n`` calls of ``random()``."""
+        n = int(n)
+        take = min(n, len(self._buffer) - self._position)
+        head = self._buffer[self._position:self._position + take]
+        self._position += take
+        if take == n:
+            return np.array(head, dtype=np.float64)
+        # Generator draws are sequential, so the rest comes straight after the buffer
+        tail = self.generator.random(n - take)
+        self._refill(0)
+        return np.concatenate((np.array(head, dtype=np.float64), tail))
+
+    def state(self) -> dict:
+        """JSON-friendly state: the buffer's origin state, its length and the read position."""
+        return {'origin': self._origin, 'size': len(self._buffer), 'position': self._position}
+
+    def load_state(self, state: dict):
+        self.generator.bit_generator.state = state['origin']
+        self._refill(int(state['size']))
+        self._position = int(state['position'])
+
+
+class RandomStreams:
+    """Registry of named streams spawned from one master seed."""
+
+    def __init__(self, seed: int | None = None):
+        self.streams = {}
+        self.reseed(seed)
+
+    def reseed(self, seed: int | None = None):
+        """Derive every stream from ``seed`` (None or 0: fresh OS entropy)."""
+        self.master = np.random.SeedSequence(seed or None)
+        for name, stream in self.streams.items():
+            stream.seed(self._child(name))
+
+    @property
+    def entropy(self) -> int:
+        return self.master.entropy
+
+    def _child(self, name: str):
+        return np.random.SeedSequence(self.master.entropy, spawn_key=(stream_key(name),))
+
+    def stream(self, name: str) -> RandomStream:
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = self.streams[name] = RandomStream(self._child(name))
+        return stream
+
+    def state(self) -> dict:
+        """Master entropy and the state of every stream, for run metadata and checkpoints."""
+        return {'entropy': self.entropy, 'streams': {name: s.state() for name, s in self.streams.items()}}
+
+    def load_state(self, state: dict):
+        self.master = np.random.SeedSequence(state['entropy'])
+        for name, stream_state in state['streams'].items():
+            self.stream(name).load_state(stream_state)
+
+
+class GlobalRandom:
+    """The ``RandomStream`` interface over the global ``random`` module (legacy draws)."""
+
+    def random(self) -> float:
+        return random.random()
+
+    def random_batch(self, n: int) -> np.ndarray:
+        return np.array([random.random() for _ in range(int(n))], dtype=np.float64)
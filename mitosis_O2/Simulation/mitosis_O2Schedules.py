@@ -0,0 +1,241 @@
+"""Radiotherapy schedule exploration forked from one shared pre-treatment checkpoint.
+
+Every fractionation scheme shares the untreated growth phase. Instead of simulating it
+again for each schedule, the spheroid is grown once with radiotherapy off up to
+``fork_mcs`` and checkpointed there. Every treatment branch then restores that checkpoint
+in its own worker process with its own RT_* values and seed (``CheckpointReseed``), and
+runs on to ``horizon``. The spec extends a mitosis_O2Sweep spec:
+
+    {
+        "mode": "grid",
+        "parameters": {"RT_Fractions": [1, 3, 5], "RT_DoseGy": [2.0, 4.0]},
+        "fixed": {"RT_PeriodMCS": 80},
+        "replicates": 8,
+        "seed": 1234,
+        "fork_mcs": 1000,                   # optional, default: earliest RT_StartMCS
+        "horizon": 3000,                    # absolute MCS at which branches stop
+        "prefix": {"GrowthRateNormoxic": 2}  # optional, applied to the growth run and branches
+    }
+
+Branches are ordinary sweep runs under ``out/runs/``, so the merged ``results.npz`` and
+resuming work as for sweeps. Per-branch tumour-control and regrowth metrics, computed
+from each branch's summary series (type counts, volume and the radiotherapy fraction and
+kill counters), are written to ``out/schedules.npz``; per-schedule tumour-control
+probability and regrowth delay are logged.
+
+Usage:
+    python mitosis_O2Schedules.py schedules.json --out schedules_out --workers 32
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+
+import numpy as np
+
+from mitosis_O2Checkpoint import CHECKPOINT_PATTERN
+from mitosis_O2Output import is_closed, read_columns
+from mitosis_O2Params import SCHEMA, coerce, load_user_parameters
+from mitosis_O2Sweep import (DEFAULT_COMMAND, MANIFEST_FILE, SIMULATION_DIR, SUMMARY_FILE, XML_NAME,
+                             collect_results, execute_run, run_dir, run_sweep)
+
+logger = logging.getLogger(__name__)
+
+PREFIX_DIR = 'prefix'
+SCHEDULES_FILE = 'schedules.npz'
+# Spawn key of the growth run's seed, apart from the keys expand_spec spawns for branches
+PREFIX_SPAWN_KEY = 2**31
+# Steppables that only run every few MCS; the fork must fall on their common cadence
+FATE_FREQUENCY = 5
+METRIC_NAMES = ('start_mcs', 'viable_before', 'volume_before', 'fractions', 'killed', 'nadir_viable',
+                'nadir_mcs', 'controlled', 'control_mcs', 'regrowth_mcs', 'regrowth_delay', 'final_viable',
+                'final_volume', 'volume_ratio')
+
+
+# ------------------------- SPEC ---------------------------- #
+def fork_point(spec: dict, defaults: dict) -> int:
+    """The fork MCS: ``fork_mcs`` if given, else the earliest RT_StartMCS, on the steppable cadence."""
+    prefix = {**defaults, **spec.get('prefix', {})}
+    cadence = math.lcm(FATE_FREQUENCY, int(prefix['OutputFrequency']))
+    # Branches take RT_StartMCS from the varied values, else from fixed, the prefix or the XML
+    starts = spec.get('parameters', {}).get('RT_StartMCS')
+    if starts is None:
+        earliest = int(spec.get('fixed', {}).get('RT_StartMCS', prefix['RT_StartMCS']))
+    else:
+        earliest = int(min(starts))
+    if 'fork_mcs' in spec:
+        fork = int(spec['fork_mcs'])
+        if fork % cadence:
+            raise ValueError(f"fork_mcs {fork} is not a multiple of {cadence} (fate and output cadence)")
+    else:
+        fork = earliest // cadence * cadence
+    if fork <= 0:
+        raise ValueError("The fork MCS must be positive; there is no growth phase to share")
+    if earliest < fork:
+        raise ValueError(f"RT_StartMCS values start at {earliest}, before the fork at MCS {fork}")
+    return fork
+
+def prefix_run(spec: dict, fork_mcs: int, out_dir: str) -> dict:
+    """The shared growth run: radiotherapy off, one checkpoint at the end of MCS ``fork_mcs - 1``."""
+    seed = np.random.SeedSequence(spec.get('seed'), spawn_key=(PREFIX_SPAWN_KEY,))
+    params = dict(spec.get('prefix', {}))
+    unknown = sorted(set(params) - set(SCHEMA))
+    if unknown:
+        raise KeyError(f"Unknown parameters in prefix: {', '.join(unknown)}")
+    params.update(RT_Enable=0, CheckpointPeriod=fork_mcs, CheckpointKeep=1,
+                  CheckpointDir=os.path.join(out_dir, PREFIX_DIR, 'checkpoints'))
+    for name, value in params.items():
+        coerce(name, value)
+    return {'run_id': 0, 'point': -1, 'replicate': 0,
+            'seed': int(seed.generate_state(1)[0] % (2**31 - 1)) + 1, 'params': params}
+
+def branch_spec(spec: dict, checkpoint: str, fork_mcs: int) -> dict:
+    """The sweep spec of the treatment branches: restore ``checkpoint`` and run to the horizon."""
+    horizon = int(spec['horizon'])
+    if horizon <= fork_mcs:
+        raise ValueError(f"horizon {horizon} must lie after the fork at MCS {fork_mcs}")
+    fixed = {'RT_Enable': 1, **spec.get('prefix', {}), **spec.get('fixed', {})}
+    fixed.update(CheckpointRestore=checkpoint, CheckpointReseed=1, CheckpointPeriod=0)
+    branches = {key: spec[key] for key in ('mode', 'parameters', 'samples', 'replicates', 'seed') if key in spec}
+    return dict(branches, fixed=fixed, steps=horizon - fork_mcs)
+
+
+# ------------------------- METRICS ---------------------------- #
+def schedule_metrics(series: dict, fork_mcs: int) -> dict:
+    """Tumour-control and regrowth metrics of one branch from its summary series.
+
+    Treatment starts at the first row counting a delivered fraction (or at the fork for an
+    untreated arm); the row before it is the pre-treatment baseline. Viable cells are
+    normoxic plus hypoxic. A branch is controlled when no viable cell is left, as necrotic
+    cells neither divide nor recover. Regrowth is the first MCS from the nadir on at which
+    the viable count is back at the baseline; its delay counts from the treatment start.
+    MCS metrics are -1 when the event does not happen.
+    """
+    mcs = series['mcs']
+    viable = series['normoxic'] + series['hypoxic']
+    volume = series['total_volume']
+    treated = np.flatnonzero(series['rt_fractions'] > 0)
+    if treated.size == 0:
+        treated = np.flatnonzero(mcs >= fork_mcs)
+        if treated.size == 0:
+            raise ValueError(f"Summary series ends before the fork at MCS {fork_mcs}")
+    first = int(treated[0])
+    base = max(first - 1, 0)
+    nadir = first + int(np.argmin(viable[first:]))
+    extinct = np.flatnonzero(viable[first:] == 0) + first
+    regrown = np.flatnonzero(viable[nadir:] >= max(1, viable[base])) + nadir
+    start_mcs = int(mcs[first])
+    regrowth_mcs = int(mcs[regrown[0]]) if regrown.size else -1
+    return {
+        'start_mcs': start_mcs,
+        'viable_before': int(viable[base]),
+        'volume_before': float(volume[base]),
+        'fractions': int(series['rt_fractions'][-1]),
+        'killed': int(series['rt_killed'][-1]),
+        'nadir_viable': int(viable[nadir]),
+        'nadir_mcs': int(mcs[nadir]),
+        'controlled': int(viable[-1] == 0),
+        'control_mcs': int(mcs[extinct[0]]) if extinct.size else -1,
+        'regrowth_mcs': regrowth_mcs,
+        'regrowth_delay': regrowth_mcs - start_mcs if regrowth_mcs >= 0 else -1,
+        'final_viable': int(viable[-1]),
+        'final_volume': float(volume[-1]),
+        'volume_ratio': float(volume[-1] / volume[base]) if volume[base] > 0 else math.nan,
+    }
+
+def collect_metrics(out_dir: str, fork_mcs: int, path: str | None = None) -> dict:
+    """Metrics of every completed branch as columns, saved to ``schedules.npz``."""
+    with open(os.path.join(out_dir, MANIFEST_FILE)) as fh:
+        manifest = json.load(fh)
+    runs = manifest['runs']
+    # The varied parameters identify a schedule
+    param_names = sorted(manifest['spec'].get('parameters', {}))
+    rows = []
+    for run in runs:
+        summary = os.path.join(run_dir(out_dir, run['run_id']), SUMMARY_FILE)
+        if not is_closed(summary):
+            continue
+        metrics = schedule_metrics(read_columns(summary), fork_mcs)
+        rows.append((run, metrics))
+    if not rows:
+        raise RuntimeError(f"No completed branches in {out_dir}")
+    columns = {name: np.array([run[name] for run, _ in rows], dtype=np.int64)
+               for name in ('run_id', 'point', 'replicate', 'seed')}
+    for name in param_names:
+        columns[f"param_{name}"] = np.array([run['params'].get(name, np.nan) for run, _ in rows], dtype=np.float64)
+    for name in METRIC_NAMES:
+        columns[name] = np.array([metrics[name] for _, metrics in rows])
+    path = path or os.path.join(out_dir, SCHEDULES_FILE)
+    np.savez_compressed(path, fork_mcs=np.int64(fork_mcs), **columns)
+    logger.info(f"[SCHEDULES] Metrics of {len(rows)}/{len(runs)} branches written to {path}")
+    return columns
+
+def summarize(columns: dict) -> list:
+    """Per schedule (sweep point): replicates, tumour-control probability and regrowth statistics."""
+    table = []
+    for point in np.unique(columns['point']).tolist():
+        rows = columns['point'] == point
+        delays = columns['regrowth_delay'][rows]
+        regrew = delays >= 0
+        table.append({
+            'point': point,
+            'params': {name[len('param_'):]: float(values[rows][0])
+                       for name, values in columns.items() if name.startswith('param_')},
+            'replicates': int(rows.sum()),
+            'tcp': float(columns['controlled'][rows].mean()),
+            'regrowth_fraction': float(regrew.mean()),
+            'mean_regrowth_delay': float(delays[regrew].mean()) if regrew.any() else math.nan,
+            'mean_nadir_viable': float(columns['nadir_viable'][rows].mean()),
+            'mean_killed': float(columns['killed'][rows].mean()),
+        })
+    return table
+
+
+# ------------------------- EXECUTION ---------------------------- #
+def run_schedules(spec: dict, out_dir: str, workers: int | None = None,
+                  command: tuple = DEFAULT_COMMAND, xml_path: str | None = None) -> tuple:
+    """Grow to the fork once (or reuse its checkpoint), then run every branch; returns (fork_mcs, failed ids)."""
+    xml_path = xml_path or os.path.join(SIMULATION_DIR, XML_NAME)
+    fork_mcs = fork_point(spec, load_user_parameters(xml_path))
+    out_dir = os.path.abspath(out_dir)
+    prefix_dir = os.path.join(out_dir, PREFIX_DIR)
+    prefix = prefix_run(spec, fork_mcs, out_dir)
+    checkpoint = os.path.join(prefix['params']['CheckpointDir'], CHECKPOINT_PATTERN.format(mcs=fork_mcs))
+    if not os.path.exists(checkpoint):
+        logger.info(f"[SCHEDULES] Growing the shared pre-treatment spheroid to MCS {fork_mcs}")
+        _, code = execute_run(prefix, prefix_dir, tuple(command), fork_mcs)
+        if code != 0 or not os.path.exists(checkpoint):
+            raise RuntimeError(f"Growth run failed (exit {code}), see {run_dir(prefix_dir, 0)}/run.log")
+    else:
+        logger.info(f"[SCHEDULES] Reusing the pre-treatment checkpoint {checkpoint}")
+    failed = run_sweep(branch_spec(spec, checkpoint, fork_mcs), out_dir, workers, command, xml_path)
+    return fork_mcs, failed
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('spec', help='JSON schedule specification')
+    parser.add_argument('--out', required=True, help='Output directory (reuse it to resume)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Parallel branches')
+    parser.add_argument('--command', default=None,
+                        help="Simulation command template, '{cc3d}' is replaced by the project file")
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as fh:
+        spec = json.load(fh)
+    command = tuple(args.command.split()) if args.command else DEFAULT_COMMAND
+    fork_mcs, failed = run_schedules(spec, args.out, args.workers, command)
+    collect_results(args.out)
+    for row in summarize(collect_metrics(args.out, fork_mcs)):
+        params = ' '.join(f"{name}={value:g}" for name, value in row['params'].items())
+        logger.info(f"[SCHEDULES] {params}: n={row['replicates']} TCP={row['tcp']:.2f} "
+                    f"regrown={row['regrowth_fraction']:.2f} delay={row['mean_regrowth_delay']:.0f} "
+                    f"nadir={row['mean_nadir_viable']:.0f} killed={row['mean_killed']:.0f}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
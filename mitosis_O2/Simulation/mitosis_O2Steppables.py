@@ -1,7 +1,7 @@
 from cc3d.core.PySteppables import *
-import random, os, math
-from xml.dom import minidom
+import random, os, math, heapq
 import logging
+import numpy as np
 
 # Global debug flag controlling logging verbosity
 DEBUG = False
@@ -27,104 +27,777 @@ def get_safe_coordinates(cell, max_x: int, max_y: int, max_z: int) -> tuple:
     z = min(max(int(round(cell.zCOM)), 0), max_z)
     return x, y, z
 
+def safe_voxel_indices(xcom, ycom, zcom, max_x: int, max_y: int, max_z: int) -> tuple:
+    """Vectorized get_safe_coordinates: round COM arrays and clamp them to field bounds."""
+    # np.rint rounds half to even exactly like Python's round(), so both paths pick the same voxel
+    xs = np.clip(np.rint(xcom), 0, max_x).astype(np.intp)
+    ys = np.clip(np.rint(ycom), 0, max_y).astype(np.intp)
+    zs = np.clip(np.rint(zcom), 0, max_z).astype(np.intp)
+    return xs, ys, zs
+
+def field_as_array(field):
+    """Return a 3D NumPy view of a CC3D field, or None if the field is not array-like."""
+    try:
+        arr = np.asarray(field)
+    except Exception:
+        return None
+    return arr if arr.ndim == 3 else None
+
+def write_field(field, values):
+    """Overwrite a whole CC3D field from a 3D array (in place when the field exposes NumPy)."""
+    arr = field_as_array(field)
+    if arr is not None and arr.flags.writeable:
+        arr[...] = values
+        return
+    nx, ny, nz = values.shape
+    for x in range(nx):
+        for y in range(ny):
+            for z in range(nz):
+                field[x, y, z] = float(values[x, y, z])
+
+def cell_voxel_indices(steppable, cells, shape) -> tuple:
+    """Flat C-order indices of each cell's voxels (PixelTracker), concatenated, plus per-cell counts."""
+    counts = np.zeros(len(cells), dtype=np.intp)
+    coords = []
+    for row, cell in enumerate(cells):
+        before = len(coords)
+        coords.extend((ptd.pixel.x, ptd.pixel.y, ptd.pixel.z) for ptd in steppable.get_cell_pixel_list(cell))
+        counts[row] = len(coords) - before
+    if not coords:
+        return np.empty(0, dtype=np.intp), counts
+    xyz = np.array(coords, dtype=np.intp)
+    return np.ravel_multi_index((xyz[:, 0], xyz[:, 1], xyz[:, 2]), shape), counts
+
+def sample_field(field, xs, ys, zs) -> np.ndarray:
+    """Gather field values at voxel index arrays with a single fancy-indexing read."""
+    arr = field_as_array(field)
+    if arr is not None:
+        return arr[xs, ys, zs].astype(np.float64, copy=False)
+    # Fallback for field wrappers without NumPy support: scalar reads
+    return np.fromiter(
+        (float(field[x, y, z]) for x, y, z in zip(xs.tolist(), ys.tolist(), zs.tolist())),
+        dtype=np.float64, count=len(xs)
+    )
+
+def classify_fate(types, o2, normoxic: int, hypoxic: int, necrotic: int,
+                  thresh_normoxic_hypoxic: float, thresh_hypoxic_necrotic: float) -> np.ndarray:
+    """Apply the two-threshold phenotype rules to arrays of types and local O2.
+
+    Mirrors the branch order of the per-cell path in O2DrivenFateSteppable; cells that are
+    neither normoxic nor hypoxic keep their type.
+    """
+    new_types = types.copy()
+    is_norm = types == normoxic
+    is_hyp = types == hypoxic
+    below_nec = o2 < thresh_hypoxic_necrotic
+    below_hyp = o2 < thresh_normoxic_hypoxic
+    new_types[is_norm & below_nec] = necrotic
+    new_types[is_norm & ~below_nec & below_hyp] = hypoxic
+    new_types[is_hyp & ~below_hyp] = normoxic
+    new_types[is_hyp & below_hyp & below_nec] = necrotic
+    return new_types
+
 # ------------------------- PARAMETER HANDLING ---------------------------- #
-def _load_user_parameters(xml_filename: str) -> dict:
-    """Parses <UserParameters><Param Name= Value= /></UserParameters> into a dict."""
-    xml_path = xml_filename
-    if not os.path.exists(xml_path):
-        xml_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), xml_filename)
-    if not os.path.exists(xml_path):
-        raise FileNotFoundError(f"Cannot find XML file '{xml_filename}' relative to simulation script or steppable directory")
-    doc = minidom.parse(xml_path)
-    user_nodes = doc.getElementsByTagName('UserParameters')
-    if not user_nodes:
-        raise RuntimeError('UserParameters block missing in XML')
-    params = {}
-    for node in user_nodes[0].getElementsByTagName('Param'):
-        name = node.getAttribute('Name')
-        val = node.getAttribute('Value')
-        if not name:
-            continue
-        try:
-            params[name] = float(val) if ('.' in val or 'e' in val.lower()) else int(val)
-        except ValueError:
-            raise RuntimeError(f"Parameter {name} has non-numeric value '{val}'")
-    return params
+# Parameters come from the layered store in mitosis_O2Params (XML defaults, overlay, overrides).
+# Steppables take an immutable snapshot in __init__; P() remains for ad-hoc lookups.
+from mitosis_O2Params import PARAMETERS, P
+from mitosis_O2Oxygen import OxygenSolver
+from mitosis_O2Output import ColumnarWriter
+from mitosis_O2Analysis import RadialBins, rim_radii
+from mitosis_O2Domain import ActiveBox, growth_plan
+from mitosis_O2Profiling import EventCounts, StepProfiler, WindowSampler
+from mitosis_O2Radiation import OERTable, lq_survival, load_dose_maps, shift_dose_maps
+from mitosis_O2Random import GlobalRandom, RandomStreams
+from mitosis_O2Events import EventLog, KIND_NAMES, CREATE, DIVISION, TRANSITION, KILL, REMOVAL
+from mitosis_O2Export import FieldExporter
+from mitosis_O2Sampling import SAMPLE_COM, VoxelCache, segment_reduce
+from mitosis_O2Cadence import Cadence, proportional_interval, threshold_crossing_mcs
+from mitosis_O2Init import (
+    label_voxels, lattice_seeds, load_labels, packed_spheres, single_sphere, sphere_radius, voronoi_ball
+)
+from mitosis_O2Checkpoint import (
+    CheckpointWriter, RestoreMap, read_checkpoint, voxel_runs, encode_random_state, decode_random_state
+)
+
+
+def project_path(path: str) -> str:
+    """Resolve a path parameter; relative paths live next to the simulation XML (per sweep run)."""
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(PARAMETERS.xml_path)), path)
+
+
+# ------------------------- SHARED CELL SNAPSHOT ---------------------------- #
+class CellSnapshot:
+    """Struct-of-arrays view of all non-Medium cells shared by every steppable.
+
+    The arrays are built with one pass over ``cell_list`` the first time they are requested
+    in an MCS. Steppables that create, delete, divide or retype cells keep them in sync through
+    ``refresh``/``drop_row``/``invalidate`` so later steppables in the same MCS can reuse them.
+    Rows follow ``cell_list`` order; ``cells[i]`` is the cell behind row ``i``. ``version``
+    changes whenever the arrays do, so derived state can be cached against it.
+    """
+
+    def __init__(self):
+        self.mcs = None
+        self.version = 0
+        self.cells = []
+        self.ids = np.empty(0, dtype=np.int64)
+        self.types = np.empty(0, dtype=np.int32)
+        self.com = np.empty((0, 3), dtype=np.float64)
+        self.volume = np.empty(0, dtype=np.float64)
+        self.target_volume = np.empty(0, dtype=np.float64)
+        self.target_surface = np.empty(0, dtype=np.float64)
+        self._stale = True
+        self._dead_rows = []
+        self._pending = {}
+        self._row_by_id = None
+        self._n_listed = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.cells)
+
+    def invalidate(self):
+        """Force a full rebuild on the next get()."""
+        self._stale = True
+
+    def get(self, steppable):
+        """Return the snapshot for the steppable's current MCS, rebuilding it if needed."""
+        if self._pending or self._dead_rows:
+            self._apply_edits()
+        if self._stale or steppable.mcs != self.mcs or self._n_listed != len(steppable.cell_list):
+            self.rebuild(steppable.cell_list, steppable.mcs)
+        return self
+
+    def rebuild(self, cell_list, mcs):
+        cells = list(cell_list)
+        rows = [self._read(cell) for cell in cells]
+        self._n_listed = len(cells)
+        keep = [i for i, row in enumerate(rows) if row[1] != 0]
+        if len(keep) != len(rows):
+            cells = [cells[i] for i in keep]
+            rows = [rows[i] for i in keep]
+        self._set_rows(cells, rows)
+        self.mcs = mcs
+        self.version += 1
+        self._stale = False
+        self._dead_rows = []
+        self._pending = {}
+
+    def row_of(self, cell_id: int):
+        """Row index of a cell id, or None if the cell is not (yet) in the arrays."""
+        if self._row_by_id is None:
+            self._row_by_id = {cid: i for i, cid in enumerate(self.ids.tolist())}
+        return self._row_by_id.get(cell_id)
+
+    def refresh(self, cells):
+        """Re-read cells whose attributes changed; unseen cells are appended on the next get()."""
+        self.version += 1
+        for cell in cells:
+            row = self.row_of(cell.id)
+            values = self._read(cell)
+            if row is None:
+                self._pending[cell.id] = (cell, values)
+                continue
+            self.cells[row] = cell
+            self.types[row] = values[1]
+            self.com[row] = values[2:5]
+            self.volume[row] = values[5]
+            self.target_volume[row] = values[6]
+            self.target_surface[row] = values[7]
+
+    def update_rows(self, rows, types=None, target_volume=None, target_surface=None):
+        """Write already-applied attribute changes of many rows at once, without re-reading cells."""
+        self.version += 1
+        if types is not None:
+            self.types[rows] = types
+        if target_volume is not None:
+            self.target_volume[rows] = target_volume
+        if target_surface is not None:
+            self.target_surface[rows] = target_surface
+
+    def drop_row(self, row: int):
+        """Mark a row whose cell was deleted; it is removed on the next get()."""
+        self._dead_rows.append(row)
+
+    def mark_deleted(self, cell):
+        row = self.row_of(cell.id)
+        if row is not None:
+            self.drop_row(row)
+        else:
+            self._pending.pop(cell.id, None)
+
+    @staticmethod
+    def _read(cell) -> tuple:
+        return (cell.id, cell.type, cell.xCOM, cell.yCOM, cell.zCOM,
+                cell.volume, cell.targetVolume, cell.targetSurface)
+
+    def _set_rows(self, cells, rows):
+        n = len(rows)
+        data = np.array(rows, dtype=np.float64).reshape(n, 8)
+        self.cells = cells
+        self.ids = data[:, 0].astype(np.int64)
+        self.types = data[:, 1].astype(np.int32)
+        self.com = np.ascontiguousarray(data[:, 2:5])
+        self.volume = data[:, 5].copy()
+        self.target_volume = data[:, 6].copy()
+        self.target_surface = data[:, 7].copy()
+        self._row_by_id = None
+
+    def _apply_edits(self):
+        # Deletions and appends are folded in with NumPy only; no cell attribute is re-read
+        n_dead = len(set(self._dead_rows))
+        if self._dead_rows:
+            keep = np.ones(self.size, dtype=bool)
+            keep[self._dead_rows] = False
+            rows = np.flatnonzero(keep)
+            self.cells = [self.cells[i] for i in rows.tolist()]
+            self.ids = self.ids[rows]
+            self.types = self.types[rows]
+            self.com = self.com[rows]
+            self.volume = self.volume[rows]
+            self.target_volume = self.target_volume[rows]
+            self.target_surface = self.target_surface[rows]
+        if self._pending:
+            new = list(self._pending.values())
+            data = np.array([values for _, values in new], dtype=np.float64).reshape(len(new), 8)
+            self.cells = self.cells + [cell for cell, _ in new]
+            self.ids = np.concatenate((self.ids, data[:, 0].astype(np.int64)))
+            self.types = np.concatenate((self.types, data[:, 1].astype(np.int32)))
+            self.com = np.concatenate((self.com, data[:, 2:5]))
+            self.volume = np.concatenate((self.volume, data[:, 5]))
+            self.target_volume = np.concatenate((self.target_volume, data[:, 6]))
+            self.target_surface = np.concatenate((self.target_surface, data[:, 7]))
+        self._n_listed += len(self._pending) - n_dead
+        self.version += 1
+        self._dead_rows = []
+        self._pending = {}
+        self._row_by_id = None
+
+
+# One snapshot per simulation process, shared by all steppables
+CELL_SNAPSHOT = CellSnapshot()
+
+
+# ------------------------- ACTIVE SUBDOMAIN ---------------------------- #
+# Padded bounding box of the cells; margin is set by ActiveBoxSteppable
+ACTIVE_BOX = ActiveBox()
+
+def active_box(steppable) -> ActiveBox:
+    """ACTIVE_BOX fitted to this MCS's snapshot; refitted only when the snapshot changed."""
+    snap = CELL_SNAPSHOT.get(steppable)
+    ACTIVE_BOX.update(snap.com, snap.volume, (steppable.dim.x, steppable.dim.y, steppable.dim.z),
+                      key=CELL_SNAPSHOT.version)
+    return ACTIVE_BOX
+
+def resize_lattice(steppable, new_shape, shift, steppables=()):
+    """Resize the lattice to ``new_shape``, moving its content by ``shift``, and notify steppables.
+
+    Voxels that did not exist before are set to the initial oxygen level. Steppables that cache
+    lattice-sized state implement ``lattice_resized(shift)``.
+    """
+    old_shape = np.array([steppable.dim.x, steppable.dim.y, steppable.dim.z])
+    shift = np.asarray(shift, dtype=np.int64)
+    steppable.resize_and_shift_lattice(new_size=tuple(int(n) for n in new_shape),
+                                       shift_vec=tuple(int(s) for s in shift))
+    lo = np.clip(shift, 0, new_shape)
+    hi = np.clip(shift + old_shape, 0, new_shape)
+    oxygen = steppable.field.Oxygen
+    # Six slabs around the shifted old lattice
+    for axis in range(3):
+        for a, b in ((0, lo[axis]), (hi[axis], new_shape[axis])):
+            if b > a:
+                index = [slice(int(l), int(h)) for l, h in zip(lo[:axis], hi[:axis])]
+                index += [slice(int(a), int(b))] + [slice(0, int(n)) for n in new_shape[axis + 1:]]
+                oxygen[tuple(index)] = 1.0
+    CELL_SNAPSHOT.invalidate()
+    VOXEL_CACHE.clear()
+    ACTIVE_BOX.shifted(new_shape, shift)
+    for other in steppables:
+        hook = getattr(other, 'lattice_resized', None)
+        if hook is not None:
+            hook(shift)
+    logger.info(f"[DOMAIN] Lattice resized {tuple(old_shape.tolist())} -> {tuple(int(n) for n in new_shape)}, "
+                f"content shifted by {tuple(shift.tolist())}")
+
+
+# ------------------------- EVENT SCHEDULERS ---------------------------- #
+class MCSEventHeap:
+    """Min-heap of (due MCS, cell id) with lazy invalidation.
+
+    Re-registering a cell supersedes its older heap entry and ``discard`` forgets it; stale
+    entries are skipped when they reach the top, so both operations are O(log n) at most.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._heap = []
+        self._due = {}
+        self._ids = None
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, cell_id) -> bool:
+        return cell_id in self._due
+
+    def register_at(self, cell_id: int, due_mcs: int):
+        due_mcs = int(due_mcs)
+        if cell_id not in self._due:
+            self._ids = None
+        self._due[cell_id] = due_mcs
+        heapq.heappush(self._heap, (due_mcs, cell_id))
 
-PARAMS = _load_user_parameters('mitosis_O2.xml')
-logger.info(f"[PARAM] Loaded {len(PARAMS)} parameters from XML")
+    def discard(self, cell_id: int):
+        if self._due.pop(cell_id, None) is not None:
+            self._ids = None
 
-def P(name: str):
-    if name not in PARAMS:
-        raise KeyError(f"Missing required parameter '{name}' in XML <UserParameters>")
-    return PARAMS[name]
+    def pop_due(self, mcs: int) -> list:
+        """Remove and return ids due at or before ``mcs``, ordered by (due MCS, id)."""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= mcs:
+            due_mcs, cell_id = heapq.heappop(heap)
+            if self._due.get(cell_id) == due_mcs:
+                del self._due[cell_id]
+                due.append(cell_id)
+        if due:
+            self._ids = None
+        return due
+
+    def next_due(self):
+        """Earliest live due MCS, or None if nothing is scheduled."""
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def registered_ids(self) -> np.ndarray:
+        if self._ids is None:
+            self._ids = np.fromiter(self._due, dtype=np.int64, count=len(self._due))
+        return self._ids
+
+    def state(self) -> tuple:
+        """Live (ids, due MCS) arrays, e.g. for checkpoints."""
+        ids = self.registered_ids().copy()
+        dues = np.fromiter((self._due[i] for i in ids.tolist()), dtype=np.int64, count=len(ids))
+        return ids, dues
+
+    def load_state(self, ids, dues):
+        self.clear()
+        for cell_id, due_mcs in zip(np.asarray(ids).tolist(), np.asarray(dues).tolist()):
+            self._due[cell_id] = due_mcs
+        self._heap = [(due_mcs, cell_id) for cell_id, due_mcs in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def sync(self, live_ids) -> np.ndarray:
+        """Drop ids not in ``live_ids``; return the ``live_ids`` that are not registered yet."""
+        known = self.registered_ids()
+        for cell_id in known[~np.isin(known, live_ids)].tolist():
+            self.discard(cell_id)
+        return live_ids[~np.isin(live_ids, known)]
+
+
+class NecroticScheduler(MCSEventHeap):
+    """Necrotic cells keyed on the MCS at which their lifetime expires.
+
+    Cells are registered when they turn necrotic; only cells whose expiry is due are popped,
+    so the per-call cost of clearance no longer scales with the size of the necrotic core.
+    Only the batched fate path pops it; the per-cell path resets it disabled, so registering
+    is a no-op and deleted cells never pile up in the heap.
+    """
+
+    def __init__(self, lifetime: int = 0, enabled: bool = True):
+        super().__init__()
+        self.lifetime = int(lifetime)
+        self.enabled = enabled
+
+    def reset(self, lifetime: int, enabled: bool = True):
+        self.lifetime = int(lifetime)
+        self.enabled = enabled
+        self.clear()
+
+    def register(self, cell_id: int, necrotic_mcs: int):
+        if self.enabled:
+            self.register_at(cell_id, int(necrotic_mcs) + self.lifetime)
+
+    def load_state(self, ids, dues):
+        # A batched run's checkpoint resumed per-cell starts empty, like any per-cell run
+        if self.enabled:
+            super().load_state(ids, dues)
+        else:
+            self.clear()
+
+
+class DivisionScheduler(MCSEventHeap):
+    """Normoxic cells keyed on the MCS at which deterministic growth reaches FinalTargetVolume.
+
+    Growth adds ``growth_rate`` to targetVolume on every fate call (every ``growth_period``
+    MCS), so the due MCS is known as soon as growth starts. Predictions are re-checked when a
+    cell is popped, so a late or early estimate only costs a reschedule.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.final_target_volume = float('inf')
+        self.growth_rate = 0.0
+        self.growth_period = 1
+
+    def reset(self, final_target_volume: float, growth_rate: float, growth_period: int):
+        self.final_target_volume = float(final_target_volume)
+        self.growth_rate = float(growth_rate)
+        self.growth_period = max(1, int(growth_period))
+        self.clear()
+
+    def predict_due(self, target_volume: float, mcs: int, growth_pending: bool = False) -> int:
+        """MCS of the growth call at which ``target_volume`` reaches the division threshold."""
+        if target_volume >= self.final_target_volume:
+            return mcs
+        period = self.growth_period
+        first_growth = mcs if growth_pending else (mcs // period + 1) * period
+        # Small tolerance so accumulated float error never pushes a division one call late
+        calls = max(1, math.ceil((self.final_target_volume - target_volume) / self.growth_rate - 1e-9))
+        return first_growth + (calls - 1) * period
+
+    def register(self, cell_id: int, target_volume: float, mcs: int, growth_pending: bool = False):
+        if self.growth_rate <= 0:
+            return
+        self.register_at(cell_id, self.predict_due(target_volume, mcs, growth_pending))
+
+
+NECROTIC_SCHEDULER = NecroticScheduler()
+DIVISION_SCHEDULER = DivisionScheduler()
+
+
+class RunClock:
+    """MCS offset of a resumed run: CC3D counts from 0 again, absolute MCS = mcs + offset."""
+
+    def __init__(self):
+        self.offset = 0
+
+    def absolute(self, mcs: int) -> int:
+        return mcs + self.offset
+
+
+RUN_CLOCK = RunClock()
+
+# Cell event totals; read by the profiler around each steppable call
+EVENT_COUNTS = EventCounts()
+
+# Named per-steppable random streams; OxygenInitSteppable seeds them from RandomSeed
+RANDOM_STREAMS = RandomStreams()
+LEGACY_RANDOM = GlobalRandom()
+
+# Typed cell event records (creation, division, transition, kill, removal); EventLogSteppable writes them out
+EVENT_LOG = EventLog()
+
+# Per-cell voxel indices for O2SampleMode > 0, shared by fate and radiotherapy
+VOXEL_CACHE = VoxelCache()
+
+def sample_cells(steppable, snap, rows, field, mode: int = SAMPLE_COM, percentile: float = 50.0) -> np.ndarray:
+    """Field values of snapshot ``rows``: at the rounded COM voxel, or reduced over each cell's voxels.
+
+    Voxel modes (mean, min, percentile) read the voxel indices from VOXEL_CACHE, which
+    refetches pixel lists only for changed cells; a cell without voxels falls back to its COM.
+    """
+    dim = steppable.dim
+    xs, ys, zs = safe_voxel_indices(snap.com[rows, 0], snap.com[rows, 1], snap.com[rows, 2],
+                                    dim.x - 1, dim.y - 1, dim.z - 1)
+    at_com = sample_field(field, xs, ys, zs)
+    if mode == SAMPLE_COM or rows.size == 0:
+        return at_com
+    shape = (dim.x, dim.y, dim.z)
+    cells = snap.cells
+    flat, offsets = VOXEL_CACHE.gather(
+        snap.ids[rows], snap.volume[rows], snap.com[rows],
+        lambda stale: cell_voxel_indices(steppable, [cells[i] for i in rows[stale].tolist()], shape))
+    values = sample_field(field, *np.unravel_index(flat, shape))
+    sampled = segment_reduce(values, offsets, mode, percentile)
+    return np.where(np.isnan(sampled), at_com, sampled)
+
+def random_stream(params, name: str):
+    """Stream ``name`` of RANDOM_STREAMS, or the global ``random`` module when RNGStreams=0."""
+    if int(params['RNGStreams']):
+        return RANDOM_STREAMS.stream(name)
+    return LEGACY_RANDOM
 
 
 # ------------------------- OXYGEN INITIALIZATION ---------------------------- #
 class OxygenInitSteppable(SteppableBasePy):
     def start(self):
+        # Runs first: seed Python-side randomness for reproducible runs (0 keeps entropy seeding)
+        seed = P('RandomSeed')
+        if seed:
+            random.seed(seed)
+        RANDOM_STREAMS.reseed(seed)
+        # Unseeded runs draw fresh entropy; logging it makes them replayable
+        logger.info(f"[RNG] Master seed entropy {RANDOM_STREAMS.entropy}")
         # Ensure entire oxygen field starts at 1.0
         self.field.Oxygen[:, :, :] = 1.0
         logger.debug("[OXYGEN] Initialized entire domain to concentration 1.0")
 
 
-# ------------------------- SINGLE CELL INITIALIZATION ---------------------------- #
-class SingleCellInitSteppable(SteppableBasePy):
+# ------------------------- QUASI-STEADY OXYGEN ---------------------------- #
+class QuasiSteadyOxygenSteppable(SteppableBasePy):
+    """Replace Oxygen by its steady state whenever the cell configuration has changed enough.
+
+    Oxygen relaxes far faster than cells grow, so between re-solves the field is left to
+    DiffusionSolverFE, whose fixed point the steady solution is. A re-solve is triggered when
+    the fraction of cells born, removed or retyped since the last solve exceeds
+    O2ResolveFraction, or after O2ResolveMaxInterval MCS (0 = never by time alone).
+    """
+
+    def __init__(self, frequency: int = 1):
+        super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
+        self.enabled = bool(int(self.params['O2SteadyState']))
+        self.resolve_fraction = self.params['O2ResolveFraction']
+        self.max_interval = int(self.params['O2ResolveMaxInterval'])
+        self.tolerance = self.params['O2SteadyStateTol']
+        self.solver = None
+        self.labels = None
+        self.last_solve_mcs = None
+        self.solved_ids = np.empty(0, dtype=np.int64)
+        self.solved_types = np.empty(0, dtype=np.int64)
+        # (mcs, cells, changed, newton, krylov, residual, seconds) per solve
+        self.solve_log = []
+
     def start(self):
-        # Create exactly one cell at center
-        cx, cy, cz = self.dim.x // 2, self.dim.y // 2, self.dim.z // 2
-        initial_radius = P('InitialCellRadius')
-        cell = self.new_cell(self.NORMOXIC)
-        
-        # Fill spherical region
-        radius_int = int(initial_radius) + 1
-        for x in range(cx - radius_int, cx + radius_int + 1):
-            for y in range(cy - radius_int, cy + radius_int + 1):
-                for z in range(cz - radius_int, cz + radius_int + 1):
-                    if 0 <= x < self.dim.x and 0 <= y < self.dim.y and 0 <= z < self.dim.z:
-                        if (x-cx)**2 + (y-cy)**2 + (z-cz)**2 <= initial_radius*initial_radius:
-                            self.cell_field[x, y, z] = cell
-
-        # Set per-type lambdas
-        cell.lambdaVolume = P('LambdaVolumeNormoxic')
-        cell.lambdaSurface = P('LambdaSurfaceNormoxic')
-
-        # Calculate initial volume from radius directly: V = (4/3)*pi*r^3
-        initial_volume = (4.0/3.0) * math.pi * (initial_radius ** 3)
-        cell.targetVolume = initial_volume
-        cell.targetSurface = surface_from_volume(initial_volume)
+        if not self.enabled:
+            return
+        self._build_solver()
+        self.last_solve_mcs = None
+        self.solve_log = []
+        logger.info(f"[O2SS] Quasi-steady oxygen on {self.solver.shape}: resolve after "
+                    f"{self.resolve_fraction:.0%} cell changes or {self.max_interval} MCS, tol={self.tolerance:g}")
+
+    def step(self, mcs):
+        if not self.enabled:
+            return
+        snap = CELL_SNAPSHOT.get(self)
+        changed = self._count_changes(snap)
+        due = (
+            self.last_solve_mcs is None
+            or changed > self.resolve_fraction * max(snap.size, 1)
+            or (self.max_interval and mcs - self.last_solve_mcs >= self.max_interval)
+        )
+        if due:
+            self._solve(snap, mcs, changed)
+
+    def _build_solver(self):
+        self.solver = OxygenSolver.from_xml(PARAMETERS.xml_path, shape=(self.dim.x, self.dim.y, self.dim.z))
+        self.labels = np.zeros(self.solver.shape, dtype=np.int8)
+
+    def lattice_resized(self, shift):
+        if not self.enabled:
+            return
+        self._build_solver()
+        # Re-solve on the next step: the new region has never been solved for
+        self.solved_ids = np.empty(0, dtype=np.int64)
+        self.solved_types = np.empty(0, dtype=np.int64)
+
+    def _count_changes(self, snap) -> int:
+        """Cells born, removed or retyped since the last solve."""
+        if not len(self.solved_ids):
+            return snap.size
+        order = np.argsort(self.solved_ids)
+        old_ids, old_types = self.solved_ids[order], self.solved_types[order]
+        pos = np.minimum(np.searchsorted(old_ids, snap.ids), len(old_ids) - 1)
+        present = old_ids[pos] == snap.ids
+        kept = int(np.count_nonzero(present))
+        retyped = int(np.count_nonzero(old_types[pos[present]] != snap.types[present]))
+        return (snap.size - kept) + (len(old_ids) - kept) + retyped
+
+    def _solve(self, snap, mcs, changed):
+        solver = self.solver
+        field = self.field.Oxygen
+        # Warm start from the live field, which DiffusionSolverFE has advanced since the last solve
+        current = field_as_array(field)
+        if current is not None:
+            solver.concentration[...] = current
+        solver.set_cell_types(self._rasterize(snap))
+        report = solver.solve_steady_state(tol=self.tolerance)
+        write_field(field, solver.concentration)
+        self.last_solve_mcs = mcs
+        self.solved_ids = snap.ids.copy()
+        self.solved_types = snap.types.copy()
+        self.solve_log.append((mcs, snap.size, changed, report.newton_iterations,
+                               report.krylov_iterations, report.residual, report.seconds))
+        if not report.converged:
+            logger.warning(f"[O2SS] MCS {mcs} steady solve stopped at residual {report.residual:.2e} "
+                           f"(tol {self.tolerance:.1e})")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[O2SS] MCS {mcs} solved for {snap.size} cells ({changed} changed): "
+                         f"newton={report.newton_iterations} cg={report.krylov_iterations} "
+                         f"residual={report.initial_residual:.2e}->{report.residual:.2e} in {report.seconds:.3f}s")
+
+    def _rasterize(self, snap) -> np.ndarray:
+        """Per-voxel cell type from the PixelTracker pixel lists (0 = Medium)."""
+        labels = self.labels
+        labels.fill(0)
+        flat, counts = cell_voxel_indices(self, snap.cells, labels.shape)
+        labels.reshape(-1)[flat] = np.repeat(snap.types, counts)
+        return labels
+
+    def checkpoint_state(self) -> dict:
+        return {'last_solve_mcs': self.last_solve_mcs, 'solved_ids': self.solved_ids.copy(),
+                'solved_types': self.solved_types.copy()}
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        last = state['last_solve_mcs']
+        self.last_solve_mcs = None if last is None else restore.mcs(last)
+        self.solved_ids = restore.ids(state['solved_ids'])
+        self.solved_types = state['solved_types'].astype(np.int64)
+
+    def finish(self):
+        if not self.solve_log:
+            return
+        log = np.array(self.solve_log, dtype=np.float64)
         logger.info(
-            f"[INIT] Created single cell {cell.id} vol={cell.volume:.1f} target={cell.targetVolume:.1f}"
+            f"[O2SS] {len(log)} steady solves: {log[:, 6].sum():.2f}s total, {log[:, 6].mean():.3f}s mean, "
+            f"{log[:, 3].mean():.1f} Newton / {log[:, 4].mean():.1f} CG iterations per solve, "
+            f"max residual {log[:, 5].max():.2e}"
         )
 
-        # Ensure only one cell
+
+# ------------------------- INITIAL CONFIGURATION ---------------------------- #
+INIT_MODES = ('single', 'spheres', 'voronoi', 'labels')
+
+class SingleCellInitSteppable(SteppableBasePy):
+    """Create the initial cells selected by InitMode and remove any others.
+
+    ``single`` (default) is one seed cell of InitialCellRadius at the lattice centre.
+    ``spheres`` and ``voronoi`` build a pre-formed spheroid of InitCellCount cells of about
+    InitCellVolume voxels: separate balls, or one solid ball partitioned between the seeds.
+    ``labels`` loads InitLabelFile. The configuration is built as a NumPy label volume
+    (mitosis_O2Init) and written to the cell field one z-run slice at a time. Targets and
+    lambdas are set from the per-type parameters in the same pass.
+    """
+
+    def __init__(self, frequency: int = 1):
+        super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
+        self.mode = self.params['InitMode']
+        if self.mode not in INIT_MODES:
+            raise ValueError(f"Unknown InitMode '{self.mode}' (expected one of {', '.join(INIT_MODES)})")
+
+    def start(self):
+        shape = (self.dim.x, self.dim.y, self.dim.z)
+        center = (self.dim.x // 2, self.dim.y // 2, self.dim.z // 2)
+        types = None
+        if self.mode == 'single':
+            labels = single_sphere(shape, center, self.params['InitialCellRadius'])
+        elif self.mode == 'labels':
+            labels, types = load_labels(project_path(self.params['InitLabelFile']), shape)
+        else:
+            n_cells = int(self.params['InitCellCount'])
+            cell_volume = self.params['InitCellVolume']
+            seeds = lattice_seeds(n_cells, cell_volume, center, self.params['InitSeedJitter'],
+                                  random_stream(self.params, 'init'))
+            if self.mode == 'spheres':
+                labels = packed_spheres(shape, seeds, cell_volume)
+            else:
+                labels = voronoi_ball(shape, seeds, center, float(sphere_radius(n_cells * cell_volume)), cell_volume,
+                                      self.params['InitSeedJitter'])
+        flat, counts = label_voxels(labels)
+        if types is None:
+            types = np.full(counts.size, self.NORMOXIC, dtype=np.int64)
+        if self.mode == 'single':
+            # Calculate initial volume from radius directly: V = (4/3)*pi*r^3
+            target_volume = np.full(counts.size, (4.0 / 3.0) * math.pi * self.params['InitialCellRadius'] ** 3)
+        else:
+            target_volume = counts.astype(np.float64)
+        cells = self._create_cells(flat, counts, types, target_volume, shape)
+
+        # Ensure only the new cells remain
+        created = {cell.id for cell in cells}
         for other_cell in list(self.cell_list):
-            if other_cell.id != cell.id:
+            if other_cell.id not in created:
                 try:
                     self.delete_cell(other_cell)
                     logger.debug(f"[INIT] Removed extra cell {other_cell.id}")
                 except Exception:
                     pass
+        CELL_SNAPSHOT.invalidate()
+        if self.mode == 'single' and cells:
+            cell = cells[0]
+            logger.info(
+                f"[INIT] Created single cell {cell.id} vol={cell.volume:.1f} target={cell.targetVolume:.1f}"
+            )
+        else:
+            logger.info(f"[INIT] Created {len(cells)} cells ({self.mode}), {int(counts.sum())} voxels, "
+                        f"mean volume {counts[counts > 0].mean() if counts.any() else 0.0:.1f}")
         logger.info(f"[INIT] Final cell count: {len(self.cell_list)}")
 
+    def _create_cells(self, flat, counts, types, target_volume, shape) -> list:
+        """One cell per non-empty label: voxels as z-run slices, then per-type lambdas and targets."""
+        lambdas = {
+            self.NORMOXIC: (self.params['LambdaVolumeNormoxic'], self.params['LambdaSurfaceNormoxic']),
+            self.HYPOXIC: (self.params['LambdaVolumeHypoxic'], self.params['LambdaSurfaceHypoxic']),
+            self.NECROTIC: (self.params['LambdaVolumeNecrotic'], self.params['LambdaSurfaceNecrotic']),
+        }
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        cells = []
+        for row in np.flatnonzero(counts).tolist():
+            cell_type = int(types[row])
+            cell = self.new_cell(cell_type)
+            starts, lengths = voxel_runs(flat[offsets[row]:offsets[row + 1]], shape[2])
+            xs, ys, zs = np.unravel_index(starts, shape)
+            for x, y, z, n in zip(xs.tolist(), ys.tolist(), zs.tolist(), lengths.tolist()):
+                self.cell_field[x, y, z:z + n] = cell
+            cell.lambdaVolume, cell.lambdaSurface = lambdas.get(cell_type, (0.0, 0.0))
+            cell.targetVolume = float(target_volume[row])
+            cell.targetSurface = surface_from_volume(cell.targetVolume)
+            if cell_type == self.NECROTIC:
+                cell.dict['necrotic_mcs'] = self.mcs
+            cells.append(cell)
+        if cells:
+            rows = np.flatnonzero(counts)
+            EVENT_LOG.extend(RUN_CLOCK.absolute(self.mcs), CREATE, [cell.id for cell in cells],
+                             to_types=types[rows], volumes=counts[rows])
+        return cells
+
 
 # ------------------------- OXYGEN-DRIVEN FATE & GROWTH ---------------------------- #
 class O2DrivenFateSteppable(SteppableBasePy):
     def __init__(self, frequency: int = 5):
         super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
         # Cache frequently used parameters to avoid repeated lookups
-        self.o2_thresh_hypoxic_necrotic = P('O2_Thresh_HypoxicNecrotic')
-        self.o2_thresh_normoxic_hypoxic = P('O2_Thresh_NormoxicHypoxic')
-        self.lambda_volume_normoxic = P('LambdaVolumeNormoxic')
-        self.lambda_surface_normoxic = P('LambdaSurfaceNormoxic')
-        self.lambda_volume_hypoxic = P('LambdaVolumeHypoxic')
-        self.lambda_surface_hypoxic = P('LambdaSurfaceHypoxic')
-        self.lambda_volume_necrotic = P('LambdaVolumeNecrotic')
-        self.lambda_surface_necrotic = P('LambdaSurfaceNecrotic')
-        self.growth_rate_normoxic = P('GrowthRateNormoxic')
-        self.necrotic_shrinkage_rate = P('NecroticShrinkageRate')
-        self.necrotic_lifetime = int(P('NecroticLifetime'))
-        self.output_frequency = int(P('OutputFrequency'))
+        self.o2_thresh_hypoxic_necrotic = self.params['O2_Thresh_HypoxicNecrotic']
+        self.o2_thresh_normoxic_hypoxic = self.params['O2_Thresh_NormoxicHypoxic']
+        self.lambda_volume_normoxic = self.params['LambdaVolumeNormoxic']
+        self.lambda_surface_normoxic = self.params['LambdaSurfaceNormoxic']
+        self.lambda_volume_hypoxic = self.params['LambdaVolumeHypoxic']
+        self.lambda_surface_hypoxic = self.params['LambdaSurfaceHypoxic']
+        self.lambda_volume_necrotic = self.params['LambdaVolumeNecrotic']
+        self.lambda_surface_necrotic = self.params['LambdaSurfaceNecrotic']
+        self.growth_rate_normoxic = self.params['GrowthRateNormoxic']
+        self.final_target_volume = self.params['FinalTargetVolume']
+        self.necrotic_shrinkage_rate = self.params['NecroticShrinkageRate']
+        self.necrotic_lifetime = int(self.params['NecroticLifetime'])
+        self.output_frequency = int(self.params['OutputFrequency'])
+        # Batched mode classifies all cells with NumPy masks instead of walking them one by one
+        self.batch_mode = bool(int(self.params['FateBatchMode']))
+        self.rng = random_stream(self.params, 'fate')
+        # Oxygen at the COM voxel (0) or the mean (1), minimum (2) or percentile (3) over the cell's voxels
+        self.sample_mode = int(self.params['O2SampleMode'])
+        self.sample_percentile = self.params['O2SamplePercentile']
+        VOXEL_CACHE.move_tolerance = self.params['O2SampleMoveTolerance']
+        # Growth and shrinkage are per `period` MCS; adaptive cadence scales them by the MCS since the last call
+        self.period = max(1, int(frequency))
+        self.adaptive = bool(int(self.params['AdaptiveCadence']))
+        self.change_target = self.params['CadenceChangeTarget']
+        # Predicted divisions are only popped (and so meaningful as due times) by the scheduled mitosis
+        self.division_due = bool(int(self.params['MitosisScheduled']))
+        self.call_scale = 1.0
+        self.last_step_mcs = None
+        # O2 of living cells at the last call, indexed by cell id (NaN = not seen)
+        self.last_o2 = np.full(0, np.nan)
+        self.crossing_mcs = math.inf
         # Pre-calculate field bounds for optimization
         self.max_x = None
         self.max_y = None
@@ -140,8 +813,77 @@ class O2DrivenFateSteppable(SteppableBasePy):
         self.TYPE_NORMOXIC = self.NORMOXIC
         self.TYPE_HYPOXIC = self.HYPOXIC
         self.TYPE_NECROTIC = self.NECROTIC
+        NECROTIC_SCHEDULER.reset(self.necrotic_lifetime, enabled=self.batch_mode)
+        # Growth happens once per fate call, so division times are predicted on this cadence
+        DIVISION_SCHEDULER.reset(self.final_target_volume, self.growth_rate_normoxic, self.period)
+        self.call_scale = 1.0
+        self.last_step_mcs = None
+        self.last_o2 = np.full(0, np.nan)
+        self.crossing_mcs = math.inf
+
+    def checkpoint_state(self) -> dict:
+        ids = np.flatnonzero(~np.isnan(self.last_o2))
+        return {'last_step_mcs': self.last_step_mcs, 'o2_ids': ids, 'o2': self.last_o2[ids]}
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        last = state['last_step_mcs']
+        self.last_step_mcs = None if last is None else restore.mcs(last)
+        ids = restore.ids(state['o2_ids'])
+        live = ids >= 0
+        self.last_o2 = np.full(int(ids.max(initial=-1)) + 1, np.nan)
+        self.last_o2[ids[live]] = state['o2'][live]
+
+    # --- adaptive cadence (CadenceSteppable) ---
+    def cadence_interval(self, elapsed: int) -> float:
+        """The MCS until CadenceChangeTarget of the living cells' O2 reach a fate threshold."""
+        return self.crossing_mcs
+
+    def cadence_due(self):
+        """Next predicted division (its growth must be applied by then) or necrotic expiry (batched path)."""
+        due = [scheduler.next_due() for scheduler, used in
+               ((DIVISION_SCHEDULER, self.division_due), (NECROTIC_SCHEDULER, self.batch_mode)) if used]
+        due = [mcs for mcs in due if mcs is not None]
+        return min(due) if due else None
+
+    def _track_o2(self, ids, o2):
+        """Remember living cells' O2 and predict when CadenceChangeTarget of them cross a threshold."""
+        if ids.size == 0:
+            self.crossing_mcs = math.inf
+            return
+        max_id = int(ids.max())
+        if max_id >= len(self.last_o2):
+            grown = np.full(max(max_id + 1, 2 * len(self.last_o2)), np.nan)
+            grown[:len(self.last_o2)] = self.last_o2
+            self.last_o2 = grown
+        self.crossing_mcs = threshold_crossing_mcs(
+            o2, self.last_o2[ids], self.call_scale * self.period,
+            (self.o2_thresh_normoxic_hypoxic, self.o2_thresh_hypoxic_necrotic), self.change_target)
+        self.last_o2[ids] = o2
+
+    def lattice_resized(self, shift):
+        self.max_x = self.dim.x - 1
+        self.max_y = self.dim.y - 1
+        self.max_z = self.dim.z - 1
+
     def step(self, mcs):
+        if self.adaptive:
+            self.call_scale = 1.0 if self.last_step_mcs is None else (mcs - self.last_step_mcs) / self.period
+            self.last_step_mcs = mcs
+        if self.batch_mode:
+            self._step_batch(mcs)
+        else:
+            self._step_per_cell(mcs)
+            CELL_SNAPSHOT.invalidate()
+
+    def _step_per_cell(self, mcs):
         oxy = self.field.Oxygen
+        voxel_o2 = None
+        if self.sample_mode != SAMPLE_COM:
+            snap = CELL_SNAPSHOT.get(self)
+            rows = np.flatnonzero((snap.types == self.TYPE_NORMOXIC) | (snap.types == self.TYPE_HYPOXIC))
+            voxel_o2 = dict(zip(snap.ids[rows].tolist(),
+                                sample_cells(self, snap, rows, oxy, self.sample_mode, self.sample_percentile).tolist()))
+        seen = [] if self.adaptive else None
         for cell in self.cell_list:
             if cell.type == self.TYPE_MEDIUM:  # Medium
                 continue
@@ -149,33 +891,119 @@ class O2DrivenFateSteppable(SteppableBasePy):
                 self._process_necrotic(cell)
                 continue
 
-            # Sample oxygen at COM safely using helper function
-            x, y, z = get_safe_coordinates(cell, self.max_x, self.max_y, self.max_z)
-            o2 = float(oxy[x, y, z])
+            if voxel_o2 is not None:
+                o2 = voxel_o2[cell.id]
+            else:
+                # Sample oxygen at COM safely using helper function
+                x, y, z = get_safe_coordinates(cell, self.max_x, self.max_y, self.max_z)
+                o2 = float(oxy[x, y, z])
+            if seen is not None:
+                seen.append((cell.id, o2))
 
             # FIELD-DRIVEN PHENOTYPE CHANGES - Two-Threshold System
             if cell.type == self.TYPE_NORMOXIC:
                 if o2 < self.o2_thresh_hypoxic_necrotic:
-                    self._to_necrotic(cell); continue
+                    self._to_necrotic(cell, o2); continue
                 elif o2 < self.o2_thresh_normoxic_hypoxic:
-                    self._to_hypoxic(cell)
+                    self._to_hypoxic(cell, o2)
                     if mcs % self.output_frequency == 0:
                         logger.debug(f"[FATE] Cell {cell.id} NORMOXIC->HYPOXIC at O2={o2:.3f}")
             elif cell.type == self.TYPE_HYPOXIC:
                 if o2 >= self.o2_thresh_normoxic_hypoxic:
-                    self._to_normoxic(cell)
+                    self._to_normoxic(cell, o2)
                     if mcs % self.output_frequency == 0:
                         logger.debug(f"[FATE] Cell {cell.id} HYPOXIC->NORMOXIC at O2={o2:.3f}")
                 elif o2 < self.o2_thresh_hypoxic_necrotic:
-                    self._to_necrotic(cell); continue
+                    self._to_necrotic(cell, o2); continue
 
             self._grow(cell)
+        if seen is not None:
+            seen = np.array(seen, dtype=np.float64).reshape(-1, 2)
+            self._track_o2(seen[:, 0].astype(np.int64), seen[:, 1])
+
+    def _step_batch(self, mcs):
+        """Vectorized equivalent of _step_per_cell: same transitions, fewer attribute round-trips."""
+        snap = CELL_SNAPSHOT.get(self)
+        if snap.size == 0:
+            return
+        cells = snap.cells
+        types = snap.types.copy()
+        target_volume = snap.target_volume
+        target_surface = snap.target_surface
+
+        necrotic_rows = np.flatnonzero(types == self.TYPE_NECROTIC)
+        if necrotic_rows.size:
+            self._process_necrotic_batch(snap, necrotic_rows, mcs)
+
+        living = np.flatnonzero((types == self.TYPE_NORMOXIC) | (types == self.TYPE_HYPOXIC))
+        if living.size == 0:
+            return
+        o2 = sample_cells(self, snap, living, self.field.Oxygen, self.sample_mode, self.sample_percentile)
+        if self.adaptive:
+            self._track_o2(snap.ids[living], o2)
+        old_types = types[living]
+        new_types = classify_fate(
+            old_types, o2, self.TYPE_NORMOXIC, self.TYPE_HYPOXIC, self.TYPE_NECROTIC,
+            self.o2_thresh_normoxic_hypoxic, self.o2_thresh_hypoxic_necrotic
+        )
+
+        # Write back only the cells whose type actually changed
+        log_transitions = mcs % self.output_frequency == 0 and logger.isEnabledFor(logging.DEBUG)
+        changed = np.flatnonzero(new_types != old_types)
+        snap.types[living[changed]] = new_types[changed]
+        for j in changed.tolist():
+            i = int(living[j])
+            cell = cells[i]
+            new_type = new_types[j]
+            cell_o2 = float(o2[j])
+            if new_type == self.TYPE_NECROTIC:
+                self._to_necrotic(cell, cell_o2)
+                target_volume[i] = snap.volume[i]
+                target_surface[i] = cell.targetSurface
+            elif new_type == self.TYPE_HYPOXIC:
+                self._to_hypoxic(cell, cell_o2)
+                target_surface[i] = cell.targetSurface
+                if log_transitions:
+                    logger.debug(f"[FATE] Cell {cell.id} NORMOXIC->HYPOXIC at O2={o2[j]:.3f}")
+            else:
+                self._to_normoxic(cell, cell_o2)
+                # _to_normoxic resets the surface target; growth below must start from it
+                target_surface[i] = cell.targetSurface
+                if log_transitions:
+                    logger.debug(f"[FATE] Cell {cell.id} HYPOXIC->NORMOXIC at O2={o2[j]:.3f}")
+
+        growing = living[new_types == self.TYPE_NORMOXIC]
+        if growing.size:
+            new_tv, new_ts = self._grow_batch([cells[i] for i in growing.tolist()],
+                                              target_volume[growing], target_surface[growing])
+            target_volume[growing] = new_tv
+            target_surface[growing] = new_ts
+
+    def _grow_batch(self, cells, target_volume, target_surface):
+        """Apply _grow to a batch of normoxic cells and return their new (targetVolume, targetSurface)."""
+        growth_rate = self.growth_rate_normoxic * self.call_scale
+        if growth_rate <= 0:
+            new_tv = target_volume
+            new_ts = SPHERE_SURF_COEFF * np.power(target_volume, TWO_THIRDS)
+        else:
+            new_tv = target_volume + growth_rate
+            # Same operation order as _grow so both paths produce identical floats
+            new_ts = target_surface + TWO_THIRDS * (target_surface / target_volume) * growth_rate
+        for cell, tv, ts in zip(cells, new_tv.tolist(), new_ts.tolist()):
+            cell.targetVolume = tv
+            cell.targetSurface = ts
+        if self.mcs % self.output_frequency == 0 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"[GROW] MCS {self.mcs} grew {len(cells)} normoxic cells by {growth_rate:g}"
+            )
+        return new_tv, new_ts
 
-    def _to_normoxic(self, cell):
+    def _to_normoxic(self, cell, o2: float = math.nan):
         # Preserve/restore per-cell targets on type switch to avoid XML target resets
         prev_tv = getattr(cell, 'targetVolume', cell.volume)
         old_type = cell.type
         cell.type = self.TYPE_NORMOXIC
+        EVENT_COUNTS.transitions += 1
         # Assign per-type lambdas under Python control
         cell.lambdaVolume = self.lambda_volume_normoxic
         cell.lambdaSurface = self.lambda_surface_normoxic
@@ -183,11 +1011,17 @@ class O2DrivenFateSteppable(SteppableBasePy):
         cell.targetVolume = prev_tv
         # Keep surface coherent with target volume
         cell.targetSurface = surface_from_volume(cell.targetVolume)
+        # Growth (re)starts in this fate call
+        DIVISION_SCHEDULER.register(cell.id, prev_tv, self.mcs, growth_pending=True)
+        EVENT_LOG.record(RUN_CLOCK.absolute(self.mcs), TRANSITION, cell.id, from_type=old_type,
+                         to_type=self.TYPE_NORMOXIC, volume=cell.volume, o2=o2)
 
-    def _to_hypoxic(self, cell):
+    def _to_hypoxic(self, cell, o2: float = math.nan):
         prev_tv = getattr(cell, 'targetVolume', cell.volume)
         old_type = cell.type
         cell.type = self.TYPE_HYPOXIC
+        EVENT_COUNTS.transitions += 1
+        DIVISION_SCHEDULER.discard(cell.id)
         cell.lambdaVolume = self.lambda_volume_hypoxic
         cell.lambdaSurface = self.lambda_surface_hypoxic
         # Keep previous target volume (do not reset to current volume)
@@ -197,10 +1031,14 @@ class O2DrivenFateSteppable(SteppableBasePy):
             cell.targetSurface = cell.surface
         except Exception:
             pass  # Keep whatever surface value was there
+        EVENT_LOG.record(RUN_CLOCK.absolute(self.mcs), TRANSITION, cell.id, from_type=old_type,
+                         to_type=self.TYPE_HYPOXIC, volume=cell.volume, o2=o2)
 
-    def _to_necrotic(self, cell):
+    def _to_necrotic(self, cell, o2: float = math.nan):
         old_type = cell.type
         cell.type = self.TYPE_NECROTIC
+        EVENT_COUNTS.transitions += 1
+        DIVISION_SCHEDULER.discard(cell.id)
         # Assign per-type lambdas under Python control
         cell.lambdaVolume = self.lambda_volume_necrotic
         cell.lambdaSurface = self.lambda_surface_necrotic
@@ -212,14 +1050,16 @@ class O2DrivenFateSteppable(SteppableBasePy):
         except Exception:
             pass  # Don't calculate surface for necrotic cells
         cell.dict['necrotic_mcs'] = self.mcs
-        logger.info(
-            f"[FATE] Cell {cell.id} -> Necrotic at MCS {self.mcs} volume={cell.volume:.1f}"
-        )
+        NECROTIC_SCHEDULER.register(cell.id, self.mcs)
+        EVENT_LOG.record(RUN_CLOCK.absolute(self.mcs), TRANSITION, cell.id, from_type=old_type,
+                         to_type=self.TYPE_NECROTIC, volume=cell.volume, o2=o2)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[FATE] Cell {cell.id} -> Necrotic at MCS {self.mcs} volume={cell.volume:.1f}")
 
     def _grow(self, cell):
         # Growth only for normoxic cells - use mathematical surface formula only for growing cells
         if cell.type == self.TYPE_NORMOXIC:
-            growth_rate = self.growth_rate_normoxic
+            growth_rate = self.growth_rate_normoxic * self.call_scale
 
             if growth_rate <= 0:
                 # Keep previous targets unchanged to maintain a stable volume constraint
@@ -246,24 +1086,74 @@ class O2DrivenFateSteppable(SteppableBasePy):
             # No mathematical surface calculations for hypoxic cells
             pass
 
-    def _process_necrotic(self, cell):
+    def _process_necrotic(self, cell) -> bool:
+        """Age, shrink or remove a necrotic cell; returns True if the cell was deleted."""
         if 'necrotic_mcs' not in cell.dict:
             cell.dict['necrotic_mcs'] = self.mcs
         age = self.mcs - cell.dict['necrotic_mcs']
         lifetime_limit = self.necrotic_lifetime
 
         if age >= lifetime_limit:
-            if random.random() < 0.75:
+            if self.rng.random() < 0.75:
+                EVENT_LOG.record(RUN_CLOCK.absolute(self.mcs), REMOVAL, cell.id, from_type=cell.type,
+                                 to_type=cell.type, volume=cell.volume)
                 self.delete_cell(cell)
-                return
+                EVENT_COUNTS.deletions += 1
+                return True
             else:
                 cell.dict['necrotic_mcs'] = self.mcs
-                return
+                return False
 
         reduction_ratio = self.necrotic_shrinkage_rate
         if reduction_ratio > 0:
             cell.lambdaVolume = self.lambda_volume_necrotic
-            cell.targetVolume = max(1, int(cell.volume * (1.0 - reduction_ratio)))
+            cell.targetVolume = max(1, int(cell.volume * (1.0 - reduction_ratio) ** self.call_scale))
+        return False
+
+    def _process_necrotic_batch(self, snap, necrotic_rows, mcs):
+        """Scheduler-driven _process_necrotic for all necrotic rows of the snapshot.
+
+        Only cells whose lifetime expired are visited individually (removed with probability
+        0.75, otherwise re-armed); every other necrotic cell gets the shrinkage update in one pass.
+        """
+        necrotic_ids = snap.ids[necrotic_rows]
+        # Adopt necrotic cells that were not registered through _to_necrotic/_kill_cell
+        for cell_id in NECROTIC_SCHEDULER.sync(necrotic_ids).tolist():
+            cell = snap.cells[snap.row_of(cell_id)]
+            if 'necrotic_mcs' not in cell.dict:
+                cell.dict['necrotic_mcs'] = mcs
+            cell.lambdaVolume = self.lambda_volume_necrotic
+            NECROTIC_SCHEDULER.register(cell_id, cell.dict['necrotic_mcs'])
+
+        due_rows = []
+        due_ids = NECROTIC_SCHEDULER.pop_due(mcs)
+        removed = (self.rng.random_batch(len(due_ids)) < 0.75).tolist()
+        for cell_id, remove in zip(due_ids, removed):
+            row = snap.row_of(cell_id)
+            cell = snap.cells[row]
+            due_rows.append(row)
+            if remove:
+                EVENT_LOG.record(RUN_CLOCK.absolute(mcs), REMOVAL, cell_id, from_type=self.TYPE_NECROTIC,
+                                 to_type=self.TYPE_NECROTIC, volume=snap.volume[row])
+                self.delete_cell(cell)
+                EVENT_COUNTS.deletions += 1
+                snap.drop_row(row)
+            else:
+                cell.dict['necrotic_mcs'] = mcs
+                NECROTIC_SCHEDULER.register(cell_id, mcs)
+
+        reduction_ratio = self.necrotic_shrinkage_rate
+        if reduction_ratio <= 0:
+            return
+        rows = necrotic_rows
+        if due_rows:
+            rows = rows[~np.isin(rows, due_rows)]
+        new_tv = np.maximum(1.0, np.floor(snap.volume[rows] * (1.0 - reduction_ratio) ** self.call_scale))
+        changed = new_tv != snap.target_volume[rows]
+        rows = rows[changed]
+        snap.target_volume[rows] = new_tv[changed]
+        for i, tv in zip(rows.tolist(), new_tv[changed].tolist()):
+            snap.cells[i].targetVolume = tv
 
 
 # ------------------------- MITOSIS ---------------------------- #
@@ -272,33 +1162,102 @@ class O2MitosisSteppable(MitosisSteppableBase):
         """Allow main script to specify evaluation cadence."""
         super().__init__(frequency)
         self.set_parent_child_position_flag(0)
+        self.params = PARAMETERS.snapshot()
         # Cache parameters used during division checks
-        self.final_target_volume = P('FinalTargetVolume')
-        self.growth_rate_normoxic = P('GrowthRateNormoxic')
-        self.div_prob_normoxic = P('DivProbNormoxic')
+        self.final_target_volume = self.params['FinalTargetVolume']
+        self.growth_rate_normoxic = self.params['GrowthRateNormoxic']
+        self.div_prob_normoxic = self.params['DivProbNormoxic']
+        # Scheduled mode only visits cells whose predicted division MCS is due
+        self.scheduled = bool(int(self.params['MitosisScheduled']))
+        self.rng = random_stream(self.params, 'mitosis')
+        self._needs_seed = True
+
+    def start(self):
+        self._needs_seed = True
+
+    def checkpoint_state(self) -> dict:
+        return {'needs_seed': self._needs_seed}
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        self._needs_seed = state['needs_seed']
+
+    # --- adaptive cadence (CadenceSteppable) ---
+    def cadence_interval(self, elapsed: int) -> float:
+        """Scheduled mode waits for the next due division (``cadence_due``); the full scan keeps every MCS."""
+        return math.inf if self.scheduled else 1
+
+    def cadence_due(self):
+        return DIVISION_SCHEDULER.next_due() if self.scheduled else None
 
     def step(self, mcs):
+        # Only normoxic cells divide (hypoxic growth rate is 0)
+        if self.growth_rate_normoxic <= 0:
+            return
+        if self.scheduled:
+            self._step_scheduled(mcs)
+        else:
+            self._step_scan(mcs)
+
+    def _step_scan(self, mcs):
         # Division when target volume reaches final target volume
         cells_to_divide = []
-        
-        for cell in self.cell_list:
-            if cell.type in (0, self.NECROTIC):
+        snap = CELL_SNAPSHOT.get(self)
+        ready = np.flatnonzero(
+            (snap.types == self.NORMOXIC) & (snap.target_volume >= self.final_target_volume)
+        )
+        accepted = ready[self.rng.random_batch(ready.size) < self.div_prob_normoxic]
+        for i in accepted.tolist():
+            cells_to_divide.append(snap.cells[i])
+
+        self._divide_batch(cells_to_divide, mcs)
+
+    def _step_scheduled(self, mcs):
+        if self._needs_seed:
+            # Cells that never went through a growth start (e.g. the seed cell) are predicted once
+            snap = CELL_SNAPSHOT.get(self)
+            normoxic = np.flatnonzero(snap.types == self.NORMOXIC)
+            for i in normoxic[~np.isin(snap.ids[normoxic], DIVISION_SCHEDULER.registered_ids())].tolist():
+                DIVISION_SCHEDULER.register(int(snap.ids[i]), snap.target_volume[i], mcs)
+            self._needs_seed = False
+
+        due_ids = DIVISION_SCHEDULER.pop_due(mcs)
+        if not due_ids:
+            return
+        snap = CELL_SNAPSHOT.get(self)
+        # Deterministic order: ascending cell id, like the full scan over cell_list
+        ready = []
+        for cell_id in sorted(due_ids):
+            row = snap.row_of(cell_id)
+            if row is None or snap.types[row] != self.NORMOXIC:
                 continue
-            # Only normoxic cells divide (hypoxic growth rate is 0)
-            if cell.type == self.NORMOXIC and self.growth_rate_normoxic > 0:
-                # Divide when target volume reaches final target volume
-                if cell.targetVolume >= self.final_target_volume:
-                    if random.random() < self.div_prob_normoxic:
-                        cells_to_divide.append(cell)
+            target_volume = snap.target_volume[row]
+            if target_volume < self.final_target_volume:
+                # Prediction was early (e.g. growth was interrupted); re-predict from now
+                DIVISION_SCHEDULER.register(cell_id, target_volume, mcs)
+            else:
+                ready.append((cell_id, row))
+        accepted = (self.rng.random_batch(len(ready)) < self.div_prob_normoxic).tolist()
+        cells_to_divide = []
+        for (cell_id, row), accept in zip(ready, accepted):
+            if accept:
+                cells_to_divide.append(snap.cells[row])
+            else:
+                # Rejected cells retry on the next MCS, as with the full scan
+                DIVISION_SCHEDULER.register_at(cell_id, mcs + 1)
+        self._divide_batch(cells_to_divide, mcs)
 
+    def _divide_batch(self, cells_to_divide, mcs):
+        log_triggers = logger.isEnabledFor(logging.DEBUG)
         for cell in cells_to_divide:
-            logger.info(
-                f"[MITOSIS-TRIGGER] MCS {mcs} cell {cell.id} vol={cell.volume:.1f} "
-                f"target={cell.targetVolume:.1f}"
-            )
+            if log_triggers:
+                logger.debug(
+                    f"[MITOSIS-TRIGGER] MCS {mcs} cell {cell.id} vol={cell.volume:.1f} "
+                    f"target={cell.targetVolume:.1f}"
+                )
             self.divide_cell_random_orientation(cell)
 
     def update_attributes(self):
+        EVENT_COUNTS.divisions += 1
         # Post-mitosis: split target volumes properly for both parent and child
         original_target_volume = self.parent_cell.targetVolume
         split_target_volume = original_target_volume / 2.0
@@ -312,18 +1271,41 @@ class O2MitosisSteppable(MitosisSteppableBase):
         # Recompute target surfaces using spherical estimate (cheap)
         for c in (self.parent_cell, self.child_cell):
             c.targetSurface = surface_from_volume(c.targetVolume)
+        CELL_SNAPSHOT.refresh((self.parent_cell, self.child_cell))
+        if self.parent_cell.type == self.NORMOXIC:
+            for c in (self.parent_cell, self.child_cell):
+                DIVISION_SCHEDULER.register(c.id, c.targetVolume, self.mcs)
 
-        logger.info(
-            f"[MITOSIS] Parent {self.parent_cell.id} child {self.child_cell.id} "
-            f"parentTV={self.parent_cell.targetVolume:.1f} childTV={self.child_cell.targetVolume:.1f}"
-        )
+        EVENT_LOG.record(RUN_CLOCK.absolute(self.mcs), DIVISION, self.child_cell.id, self.parent_cell.id,
+                         self.parent_cell.type, self.child_cell.type, self.child_cell.volume)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"[MITOSIS] Parent {self.parent_cell.id} child {self.child_cell.id} "
+                f"parentTV={self.parent_cell.targetVolume:.1f} childTV={self.child_cell.targetVolume:.1f}"
+            )
 
 # ------------------------- RADIOTHERAPY (LQ MODEL) ---------------------------- #
+RT_OER_BY_TYPE = 0
+RT_OER_OXYGEN = 1
+
 class RadiotherapySteppable(SteppableBasePy):
-    """Deliver external beam fractions using the classic LQ survival model."""
+    """Deliver external beam fractions using the classic LQ survival model.
+
+    With RT_BatchMode=1 (default) a fraction is one vectorized pass over the snapshot:
+    - oxygen (and the dose map, if any) is gathered at every target COM;
+    - OER comes from the per-type values or, with RT_OERModel=1, from an Alper-Howard-Flanders
+      lookup table of local oxygen;
+    - survival is evaluated for all targets and every kill is drawn with one RNG call.
+    RT_BatchMode=0 keeps the per-cell loop with per-type OER.
+
+    ``dose_maps`` is a (n, *lattice) stack of relative dose maps, one per fraction; the last
+    map repeats. It is loaded from RT_DoseMap at start and can be replaced afterwards.
+    """
 
     def __init__(self, frequency: int = 1):
         super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
+        self.rng = random_stream(self.params, 'radiotherapy')
         # OER and type label mappings must be initialized in start()
         # because cell type constants (self.NORMOXIC / self.HYPOXIC)
         # are provided by the steppable base and may not be available
@@ -337,18 +1319,36 @@ class RadiotherapySteppable(SteppableBasePy):
         self.total_killed = 0
         self.total_exposed_by_type = {}
         self.total_killed_by_type = {}
+        self.dose_maps = None
 
     def _load_rt_parameters(self):
-        self.enabled = bool(int(P('RT_Enable')))
-        self.total_fractions = max(0, int(P('RT_Fractions')))
-        self.start_mcs = int(P('RT_StartMCS'))
-        self.period = max(1, int(P('RT_PeriodMCS')))
-        self.dose = float(P('RT_DoseGy'))
-        self.alpha = float(P('RT_Alpha'))
-        self.beta = float(P('RT_Beta'))
-        self.lambda_volume_necrotic = P('LambdaVolumeNecrotic')
-        self.lambda_surface_necrotic = P('LambdaSurfaceNecrotic')
+        self.enabled = bool(int(self.params['RT_Enable']))
+        self.total_fractions = max(0, int(self.params['RT_Fractions']))
+        self.start_mcs = int(self.params['RT_StartMCS'])
+        self.period = max(1, int(self.params['RT_PeriodMCS']))
+        self.dose = float(self.params['RT_DoseGy'])
+        self.alpha = float(self.params['RT_Alpha'])
+        self.beta = float(self.params['RT_Beta'])
+        self.lambda_volume_necrotic = self.params['LambdaVolumeNecrotic']
+        self.lambda_surface_necrotic = self.params['LambdaSurfaceNecrotic']
         self.dose_squared = self.dose * self.dose
+        self.batch_mode = bool(int(self.params['RT_BatchMode']))
+        self.oer_model = int(self.params['RT_OERModel'])
+        if self.oer_model not in (RT_OER_BY_TYPE, RT_OER_OXYGEN):
+            raise ValueError(f"Unknown RT_OERModel {self.oer_model}")
+        # The legacy per-cell loop only knows per-type OER and the uniform prescribed dose
+        if not self.batch_mode and self.oer_model == RT_OER_OXYGEN:
+            raise ValueError("RT_OERModel=1 (oxygen-dependent OER) needs RT_BatchMode=1")
+        if not self.batch_mode and self.params['RT_DoseMap']:
+            raise ValueError("RT_DoseMap needs RT_BatchMode=1")
+        self.oer_table = OERTable(self.params['RT_OERMax'], self.params['RT_OER_K'])
+        # Same oxygen sampling as the fate decisions (COM voxel or per-cell voxel reduction)
+        self.sample_mode = int(self.params['O2SampleMode'])
+        self.sample_percentile = self.params['O2SamplePercentile']
+        # Per-type OER indexed by type id; NaN marks types that are not irradiated targets
+        self.oer_of_type = np.full(max(self.oer_by_type) + 1, np.nan)
+        for cell_type, oer in self.oer_by_type.items():
+            self.oer_of_type[cell_type] = oer
         self.expected_survival = {}
         for cell_type, oer in self.oer_by_type.items():
             survival = math.exp(
@@ -366,6 +1366,9 @@ class RadiotherapySteppable(SteppableBasePy):
 
         # Load runtime RT parameters and precompute expected survival per type
         self._load_rt_parameters()
+        if self.params['RT_DoseMap']:
+            self.dose_maps = load_dose_maps(project_path(self.params['RT_DoseMap']),
+                                            (self.dim.x, self.dim.y, self.dim.z))
         # Reset counters
         self.fractions_delivered = 0
         self.last_fraction_mcs = -1
@@ -374,6 +1377,31 @@ class RadiotherapySteppable(SteppableBasePy):
         self.total_exposed_by_type = {ct: 0 for ct in self.oer_by_type}
         self.total_killed_by_type = {ct: 0 for ct in self.oer_by_type}
 
+    def lattice_resized(self, shift):
+        # Dose maps move with the cells; grown faces extend the map's edge values
+        if self.dose_maps is not None:
+            self.dose_maps = shift_dose_maps(self.dose_maps, (self.dim.x, self.dim.y, self.dim.z), shift)
+
+    def checkpoint_state(self) -> dict:
+        return {
+            'fractions_delivered': self.fractions_delivered,
+            'last_fraction_mcs': self.last_fraction_mcs,
+            'total_exposed': self.total_exposed,
+            'total_killed': self.total_killed,
+            'total_exposed_by_type': {str(ct): n for ct, n in self.total_exposed_by_type.items()},
+            'total_killed_by_type': {str(ct): n for ct, n in self.total_killed_by_type.items()},
+        }
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        self.fractions_delivered = state['fractions_delivered']
+        self.last_fraction_mcs = restore.mcs(state['last_fraction_mcs'])
+        # The fraction schedule is absolute, so it moves with the restarted MCS counter
+        self.start_mcs = restore.mcs(self.start_mcs)
+        self.total_exposed = state['total_exposed']
+        self.total_killed = state['total_killed']
+        self.total_exposed_by_type = {int(ct): n for ct, n in state['total_exposed_by_type'].items()}
+        self.total_killed_by_type = {int(ct): n for ct, n in state['total_killed_by_type'].items()}
+
     def step(self, mcs):
         if not self.enabled or self.total_fractions <= 0:
             return
@@ -388,21 +1416,71 @@ class RadiotherapySteppable(SteppableBasePy):
         self._deliver_fraction(mcs)
 
     def _deliver_fraction(self, mcs):
-        target_cells = list(self.cell_list_by_type(self.NORMOXIC, self.HYPOXIC))
-        n_before = len(target_cells)
-        if n_before == 0:
+        snap = CELL_SNAPSHOT.get(self)
+        target_rows = np.flatnonzero((snap.types == self.NORMOXIC) | (snap.types == self.HYPOXIC))
+        if target_rows.size == 0:
             self.fractions_delivered += 1
             self.last_fraction_mcs = mcs
             logger.info(
                 f"[RT] MCS {mcs} fraction {self.fractions_delivered} -- no normoxic/hypoxic targets"
             )
             return
+        if self.batch_mode:
+            stats = self._deliver_batch(snap, target_rows, mcs)
+        else:
+            stats = self._deliver_per_cell(snap, target_rows, mcs)
+        self._finish_fraction(mcs, int(target_rows.size), stats)
+
+    def _deliver_batch(self, snap, target_rows, mcs) -> dict:
+        """One vectorized pass: OER and dose at every target, survival, kills from a single draw."""
+        types = snap.types[target_rows]
+        com = snap.com[target_rows]
+        xs, ys, zs = safe_voxel_indices(com[:, 0], com[:, 1], com[:, 2],
+                                        self.dim.x - 1, self.dim.y - 1, self.dim.z - 1)
+        o2 = sample_cells(self, snap, target_rows, self.field.Oxygen, self.sample_mode, self.sample_percentile)
+        if self.oer_model == RT_OER_OXYGEN:
+            oer = self.oer_table(o2)
+        else:
+            oer = self.oer_of_type[types]
+        dose = self.dose
+        if self.dose_maps is not None:
+            dose_map = self.dose_maps[min(self.fractions_delivered, len(self.dose_maps) - 1)]
+            dose = self.dose * dose_map[xs, ys, zs].astype(np.float64)
+        survival = lq_survival(dose, oer, self.alpha, self.beta)
+        killed = self.rng.random_batch(target_rows.size) < 1.0 - survival
+        self._kill_rows(snap, target_rows[killed], mcs, o2[killed])
+
+        n_types = len(self.oer_of_type)
+        exposed = np.bincount(types, minlength=n_types)
+        stats = {}
+        for cell_type in self.oer_by_type:
+            n = int(exposed[cell_type])
+            if n == 0:
+                continue
+            in_type = types == cell_type
+            stats[cell_type] = (n, int(np.count_nonzero(killed & in_type)),
+                                float(oer[in_type].mean()), float(survival[in_type].mean()))
+        return stats
+
+    def _kill_rows(self, snap, rows, mcs, o2):
+        """Convert the cells of snapshot ``rows`` to necrotic and update the snapshot in bulk."""
+        if rows.size == 0:
+            return
+        EVENT_LOG.extend(RUN_CLOCK.absolute(mcs), KILL, snap.ids[rows], from_types=snap.types[rows],
+                         to_types=self.NECROTIC, volumes=snap.volume[rows], o2=o2)
+        surfaces = np.empty(rows.size)
+        for i, row in enumerate(rows.tolist()):
+            cell = snap.cells[row]
+            self._kill_cell(cell, mcs)
+            surfaces[i] = cell.targetSurface
+        snap.update_rows(rows, types=self.NECROTIC, target_volume=snap.volume[rows], target_surface=surfaces)
 
+    def _deliver_per_cell(self, snap, target_rows, mcs) -> dict:
+        target_cells = [snap.cells[i] for i in target_rows.tolist()]
+        target_types = snap.types[target_rows].tolist()
         exposed_by_type = {ct: 0 for ct in self.oer_by_type}
         killed_by_type = {ct: 0 for ct in self.oer_by_type}
-        killed = 0
-        for cell in target_cells:
-            cell_type = cell.type
+        for cell, cell_type in zip(target_cells, target_types):
             oer = self.oer_by_type.get(cell_type)
             if oer is None:
                 continue
@@ -413,18 +1491,27 @@ class RadiotherapySteppable(SteppableBasePy):
             survival_prob = max(0.0, min(1.0, survival_prob))
             kill_prob = 1.0 - survival_prob
             exposed_by_type[cell_type] += 1
-            if random.random() < kill_prob:
+            if self.rng.random() < kill_prob:
+                if EVENT_LOG.enabled:
+                    x, y, z = get_safe_coordinates(cell, self.dim.x - 1, self.dim.y - 1, self.dim.z - 1)
+                    EVENT_LOG.record(RUN_CLOCK.absolute(mcs), KILL, cell.id, from_type=cell_type,
+                                     to_type=self.NECROTIC, volume=cell.volume, o2=float(self.field.Oxygen[x, y, z]))
                 self._kill_cell(cell, mcs)
-                killed += 1
+                CELL_SNAPSHOT.refresh((cell,))
                 killed_by_type[cell_type] += 1
+        return {ct: (exposed_by_type[ct], killed_by_type[ct], self.oer_by_type[ct], self.expected_survival[ct])
+                for ct in self.oer_by_type if exposed_by_type[ct]}
 
+    def _finish_fraction(self, mcs, n_before: int, stats: dict):
+        """Update the running totals and log the fraction; ``stats`` maps type -> (exposed, killed, OER, SR)."""
+        killed = sum(k for _, k, _, _ in stats.values())
         survived = n_before - killed
         observed_sr = survived / n_before if n_before > 0 else 1.0
-        self.total_exposed += sum(exposed_by_type.values())
-        self.total_killed += sum(killed_by_type.values())
-        for cell_type in exposed_by_type:
-            self.total_exposed_by_type[cell_type] += exposed_by_type[cell_type]
-            self.total_killed_by_type[cell_type] += killed_by_type[cell_type]
+        self.total_exposed += sum(n for n, _, _, _ in stats.values())
+        self.total_killed += killed
+        for cell_type, (exposed, killed_count, _, _) in stats.items():
+            self.total_exposed_by_type[cell_type] += exposed
+            self.total_killed_by_type[cell_type] += killed_count
         cumulative_sr = (
             (self.total_exposed - self.total_killed) / self.total_exposed
             if self.total_exposed > 0 else 1.0
@@ -432,16 +1519,10 @@ class RadiotherapySteppable(SteppableBasePy):
         self.fractions_delivered += 1
         self.last_fraction_mcs = mcs
 
-        type_stats = []
-        for cell_type in self.oer_by_type:
-            exposed = exposed_by_type[cell_type]
-            if exposed == 0:
-                continue
-            killed_count = killed_by_type[cell_type]
-            type_stats.append(
-                f"{self.type_labels[cell_type]}(OER={self.oer_by_type[cell_type]:.1f} "
-                f"expSR={self.expected_survival[cell_type]:.3f} killed={killed_count}/{exposed})"
-            )
+        type_stats = [
+            f"{self.type_labels[cell_type]}(OER={oer:.1f} expSR={sr:.3f} killed={killed_count}/{exposed})"
+            for cell_type, (exposed, killed_count, oer, sr) in stats.items()
+        ]
         type_suffix = f" {' '.join(type_stats)}" if type_stats else ""
 
         logger.info(
@@ -452,6 +1533,8 @@ class RadiotherapySteppable(SteppableBasePy):
 
     def _kill_cell(self, cell, mcs):
         cell.type = self.NECROTIC
+        EVENT_COUNTS.kills += 1
+        DIVISION_SCHEDULER.discard(cell.id)
         cell.lambdaVolume = self.lambda_volume_necrotic
         cell.lambdaSurface = self.lambda_surface_necrotic
         cell.targetVolume = cell.volume
@@ -460,76 +1543,164 @@ class RadiotherapySteppable(SteppableBasePy):
         except Exception:
             cell.targetSurface = surface_from_volume(cell.targetVolume)
         cell.dict['necrotic_mcs'] = mcs
+        NECROTIC_SCHEDULER.register(cell.id, mcs)
 
 
 # ------------------------- CENTRAL COMPACTION ---------------------------- #
+# Force laws selectable through the CompactionForceLaw parameter
+COMPACTION_LAW_QUADRATIC = 0
+COMPACTION_LAW_LINEAR = 1
+COMPACTION_LAW_CAPPED = 2
+COMPACTION_FORCE_SCALE = 0.1  # Scale factor to prevent excessive force
+
+def radial_forces(com, center, strength: float, law: int = COMPACTION_LAW_QUADRATIC,
+                  cap: float = 0.0) -> tuple:
+    """Return (forces, r) for COM rows: forces point to center, scaled by the chosen law."""
+    delta = center - com
+    r = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+    if law == COMPACTION_LAW_LINEAR:
+        magnitude = strength * r * COMPACTION_FORCE_SCALE
+    else:
+        # Quadratic scaling: farther cells get stronger inward force to overcome contact energies
+        magnitude = strength * r * r * COMPACTION_FORCE_SCALE
+        if law == COMPACTION_LAW_CAPPED:
+            magnitude = np.clip(magnitude, -abs(cap), abs(cap))
+    # Cells exactly at the center get no force (avoids division by zero)
+    at_center = r < 1e-6
+    unit = np.divide(delta, r[:, None], out=np.zeros_like(delta), where=~at_center[:, None])
+    return magnitude[:, None] * unit, r
+
+
 class CenterCompactionSteppable(SteppableBasePy):
-    """Applies a polar radial force to ALL cell types for spherical compaction toward center."""
+    """Applies a polar radial force to ALL cell types for spherical compaction toward center.
+
+    Forces are computed for all cells in one NumPy pass, and ``lambdaVec*`` is only rewritten
+    for cells whose COM moved more than ``CompactionMoveTolerance`` since their last write.
+    """
+
+    def __init__(self, frequency: int = 1):
+        super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
+        self.strength = self.params['CenterPushStrength']
+        self.force_law = int(self.params['CompactionForceLaw'])
+        self.force_cap = self.params['CompactionForceCap']
+        self.move_tolerance = self.params['CompactionMoveTolerance']
+        self.change_target = self.params['CadenceChangeTarget']
+        # Fraction of cells whose force was (re)written in the last call
+        self.moved_fraction = 0.0
+        if self.force_law not in (COMPACTION_LAW_QUADRATIC, COMPACTION_LAW_LINEAR, COMPACTION_LAW_CAPPED):
+            raise ValueError(f"Unknown CompactionForceLaw {self.force_law}")
+        # COM at the last lambdaVec write, indexed by cell id (NaN = never written)
+        self.last_written_com = np.full((0, 3), np.nan)
+        self.last_center = None
+
+    def start(self):
+        self.last_written_com = np.full((0, 3), np.nan)
+        self.last_center = None
+        self.moved_fraction = 0.0
+
+    def checkpoint_state(self) -> dict:
+        ids = np.flatnonzero(~np.isnan(self.last_written_com[:, 0]))
+        return {'ids': ids, 'com': self.last_written_com[ids],
+                'center': None if self.last_center is None else self.last_center.tolist()}
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        ids = restore.ids(state['ids'])
+        live = ids >= 0
+        self.last_written_com = np.full((int(ids.max(initial=-1)) + 1, 3), np.nan)
+        self.last_written_com[ids[live]] = state['com'][live]
+        self.last_center = None if state['center'] is None else np.array(state['center'])
+
+    # --- adaptive cadence (CadenceSteppable) ---
+    def cadence_interval(self, elapsed: int) -> float:
+        """The interval at which CadenceChangeTarget of the cells drift past CompactionMoveTolerance."""
+        return proportional_interval(self.moved_fraction, self.change_target, elapsed)
 
     def step(self, mcs):
-        cx, cy, cz = self.dim.x / 2.0, self.dim.y / 2.0, self.dim.z / 2.0
-        strength = P('CenterPushStrength')
-        
-        for cell in self.cell_list:
-            # Skip Medium cells (type 0) but compact all living and necrotic cells
-            if cell.type == 0:  # Medium
-                continue
-                
-            # Calculate radial distance vector from cell to center
-            dx = cx - cell.xCOM
-            dy = cy - cell.yCOM
-            dz = cz - cell.zCOM
-            
-            # Calculate radial distance
-            r = math.sqrt(dx*dx + dy*dy + dz*dz)
-            
-            # Avoid division by zero for cells exactly at center
-            if r < 1e-6:
-                cell.lambdaVecX = 0.0
-                cell.lambdaVecY = 0.0
-                cell.lambdaVecZ = 0.0
-                continue
-            
-            # Make force stronger and distance-dependent to overcome contact energies
-            # Use quadratic scaling: farther cells get stronger inward force
-            force_magnitude = strength * r * r * 0.1  # Scale factor to prevent excessive force
-            
-            # Normalize direction vector and apply radial force
-            cell.lambdaVecX = force_magnitude * (dx / r)
-            cell.lambdaVecY = force_magnitude * (dy / r)
-            cell.lambdaVecZ = force_magnitude * (dz / r)
-            
-            # Debug output every 50 MCS for a few cells
-            if mcs % 50 == 0 and cell.id <= 3:
-                logger.debug(
-                    f"[COMPACT] MCS={mcs} Cell={cell.id} r={r:.1f} force_mag={force_magnitude:.2f} "
-                    f"lambdaVec=({cell.lambdaVecX:.2f},{cell.lambdaVecY:.2f},{cell.lambdaVecZ:.2f})"
-                )
+        center = np.array([self.dim.x / 2.0, self.dim.y / 2.0, self.dim.z / 2.0])
+        snap = CELL_SNAPSHOT.get(self)
+        if snap.size == 0:
+            self.moved_fraction = 0.0
+            return
+        if self.last_center is None or not np.array_equal(center, self.last_center):
+            # Domain changed: every stored force is stale
+            self.last_written_com = np.full((0, 3), np.nan)
+            self.last_center = center
 
+        ids = snap.ids
+        max_id = int(ids.max())
+        if max_id >= len(self.last_written_com):
+            grown = np.full((max(max_id + 1, 2 * len(self.last_written_com)), 3), np.nan)
+            grown[:len(self.last_written_com)] = self.last_written_com
+            self.last_written_com = grown
 
+        # Moved beyond tolerance, or never written (NaN compares False, hence the negation)
+        drift = snap.com - self.last_written_com[ids]
+        within = np.einsum('ij,ij->i', drift, drift) <= self.move_tolerance * self.move_tolerance
+        rows = np.flatnonzero(~within)
+        self.moved_fraction = rows.size / snap.size
+        if rows.size == 0:
+            return
+
+        forces, r = radial_forces(snap.com[rows], center, self.strength, self.force_law, self.force_cap)
+        self.last_written_com[ids[rows]] = snap.com[rows]
+        for i, (fx, fy, fz) in zip(rows.tolist(), forces.tolist()):
+            cell = snap.cells[i]
+            cell.lambdaVecX = fx
+            cell.lambdaVecY = fy
+            cell.lambdaVecZ = fz
+
+        # Debug output every 50 MCS for a few cells
+        if mcs % 50 == 0 and logger.isEnabledFor(logging.DEBUG):
+            for j in np.flatnonzero(ids[rows] <= 3).tolist():
+                fx, fy, fz = forces[j]
+                logger.debug(
+                    f"[COMPACT] MCS={mcs} Cell={ids[rows[j]]} r={r[j]:.1f} "
+                    f"force_mag={math.sqrt(fx*fx + fy*fy + fz*fz):.2f} "
+                    f"lambdaVec=({fx:.2f},{fy:.2f},{fz:.2f})"
+                )
 
 
 # ------------------------- LIGHT ANALYSIS / PLOTTING ---------------------------- #
+# Environment variable naming the columnar file that receives the per-run summary time series
+SUMMARY_ENV_VAR = 'MITOSIS_O2_SUMMARY'
+SUMMARY_COLUMNS = {
+    'mcs': np.int64, 'normoxic': np.int64, 'hypoxic': np.int64, 'necrotic': np.int64,
+    'total_volume': np.float64, 'o2_min': np.float64, 'o2_mean': np.float64, 'o2_max': np.float64,
+    'rt_fractions': np.int64, 'rt_killed': np.int64,
+}
+
 class LightAnalysisSteppable(SteppableBasePy):
     VALIDATION_PERIOD = 50
     
-    def __init__(self, frequency: int | None = None):
+    def __init__(self, frequency: int | None = None, radiotherapy=None):
+        params = PARAMETERS.snapshot()
         if frequency is None:
-            frequency = int(P('OutputFrequency'))
+            frequency = int(params['OutputFrequency'])
         super().__init__(frequency=frequency)
-        # Cache thresholds to avoid repeated P() calls in validation
-        self.o2_thresh_normoxic_hypoxic = P('O2_Thresh_NormoxicHypoxic')
-        self.o2_thresh_hypoxic_necrotic = P('O2_Thresh_HypoxicNecrotic')
+        self.params = params
+        # Cache thresholds to avoid repeated parameter lookups in validation
+        self.o2_thresh_normoxic_hypoxic = self.params['O2_Thresh_NormoxicHypoxic']
+        self.o2_thresh_hypoxic_necrotic = self.params['O2_Thresh_HypoxicNecrotic']
         # Pre-calculate field bounds
         self.max_x = None
         self.max_y = None
         self.max_z = None
+        # Headless runs stream the summary series to a columnar file; plots are optional
+        self.summary_path = os.environ.get(SUMMARY_ENV_VAR) or self.params['AnalysisOutput'] or None
+        self.plots_enabled = bool(int(self.params['AnalysisPlots']))
+        self.radiotherapy = radiotherapy
+        self.summary = None
 
     def start(self):
         # Cache dimension bounds once at start
         self.max_x = self.dim.x - 1
         self.max_y = self.dim.y - 1
         self.max_z = self.dim.z - 1
+        if self.summary_path:
+            self.summary = ColumnarWriter(self.summary_path, SUMMARY_COLUMNS)
+        if not self.plots_enabled:
+            return
         self.plot_total = self.add_new_plot_window(title='Total Volume', x_axis_title='MCS', y_axis_title='Volume',
                                                    x_scale_type='linear', y_scale_type='linear', grid=True)
         self.plot_total.add_plot("Volume", style='Lines', color='blue', size=2)
@@ -538,36 +1709,48 @@ class LightAnalysisSteppable(SteppableBasePy):
         for name, color in (('Normoxic', 'green'), ('Hypoxic', 'orange'), ('Necrotic', 'red')):
             self.plot_counts.add_plot(name, style='Lines', color=color, size=2)
 
+    def lattice_resized(self, shift):
+        self.max_x = self.dim.x - 1
+        self.max_y = self.dim.y - 1
+        self.max_z = self.dim.z - 1
+
     def step(self, mcs):
-        # Calculate fresh counts and volume every time to avoid sync issues
-        counts = {'Normoxic': 0, 'Hypoxic': 0, 'Necrotic': 0}
-        total_vol = 0.0
-        o2_samples = []
-        
-        for cell in self.cell_list:
-            total_vol += cell.volume
-            if cell.type == self.NORMOXIC:
-                counts['Normoxic'] += 1
-            elif cell.type == self.HYPOXIC:
-                counts['Hypoxic'] += 1
-            elif cell.type == self.NECROTIC:
-                counts['Necrotic'] += 1
-            
-            # Sample oxygen at cell location for monitoring
-            if cell.type != 0:  # Not medium
-                x, y, z = get_safe_coordinates(cell, self.max_x, self.max_y, self.max_z)
-                o2 = float(self.field.Oxygen[x, y, z])
-                o2_samples.append(o2)
+        # Calculate fresh counts and volume every time from this MCS's snapshot
+        snap = CELL_SNAPSHOT.get(self)
+        type_counts = np.bincount(snap.types, minlength=4)
+        counts = {
+            'Normoxic': int(type_counts[self.NORMOXIC]),
+            'Hypoxic': int(type_counts[self.HYPOXIC]),
+            'Necrotic': int(type_counts[self.NECROTIC]),
+        }
+        total_vol = float(snap.volume.sum())
         
         # Plot fresh calculated values
-        self.plot_total.add_data_point('Volume', mcs, total_vol)
-        for k in counts:
-            self.plot_counts.add_data_point(k, mcs, counts[k])
+        if self.plots_enabled:
+            self.plot_total.add_data_point('Volume', mcs, total_vol)
+            for k in counts:
+                self.plot_counts.add_data_point(k, mcs, counts[k])
 
         # Oxygen and debug info
-        if mcs % self.VALIDATION_PERIOD == 0:
-            if o2_samples:
-                o2_min, o2_max, o2_avg = min(o2_samples), max(o2_samples), sum(o2_samples) / len(o2_samples)
+        validate = mcs % self.VALIDATION_PERIOD == 0
+        o2_min = o2_max = o2_avg = float('nan')
+        if (validate or self.summary is not None) and snap.size:
+            # Sample oxygen at every cell location with a single gather
+            xs, ys, zs = safe_voxel_indices(
+                snap.com[:, 0], snap.com[:, 1], snap.com[:, 2], self.max_x, self.max_y, self.max_z
+            )
+            o2_samples = sample_field(self.field.Oxygen, xs, ys, zs)
+            o2_min, o2_max, o2_avg = o2_samples.min(), o2_samples.max(), o2_samples.mean()
+        if self.summary is not None:
+            rt = self.radiotherapy
+            self.summary.append(
+                RUN_CLOCK.absolute(mcs), counts['Normoxic'], counts['Hypoxic'], counts['Necrotic'],
+                total_vol, o2_min, o2_avg, o2_max,
+                rt.fractions_delivered if rt is not None else 0, rt.total_killed if rt is not None else 0
+            )
+
+        if validate:
+            if snap.size:
                 logger.debug(
                     f"[O2-MONITOR] MCS {mcs} O2: min={o2_min:.3f} avg={o2_avg:.3f} max={o2_max:.3f} | "
                     f"Thresholds: N/H={self.o2_thresh_normoxic_hypoxic:.3f} H/Nec={self.o2_thresh_hypoxic_necrotic:.3f}")
@@ -577,4 +1760,531 @@ class LightAnalysisSteppable(SteppableBasePy):
                 f"N={counts['Normoxic']} H={counts['Hypoxic']} Nec={counts['Necrotic']}"
             )
 
+    def checkpoint_state(self) -> dict:
+        # Rows up to the checkpoint end on a block boundary, so a resume can cut the file there
+        return {'summary': self.summary.checkpoint() if self.summary is not None else None}
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        if self.summary is not None:
+            self.summary.restore(state['summary'])
+
+    def finish(self):
+        if self.summary is not None:
+            self.summary.close()
+            logger.info(f"[SUMMARY] Wrote {self.summary.rows_written} rows to {self.summary_path}")
+
+
+# ------------------------- RADIAL PROFILES ---------------------------- #
+PROFILE_COLUMNS = {
+    'mcs': np.int64, 'radius': np.float64, 'voxels': np.int64, 'o2_mean': np.float64,
+    'normoxic': np.float64, 'hypoxic': np.float64, 'necrotic': np.float64,
+}
+RIM_COLUMNS = {
+    'mcs': np.int64, 'outer_radius': np.float64, 'hypoxic_radius': np.float64,
+    'necrotic_radius': np.float64, 'viable_rim': np.float64,
+}
+
+class RadialProfileSteppable(SteppableBasePy):
+    """Radial O2 and phenotype profiles plus rim radii around the lattice centre.
+
+    Shell indices are precomputed once (mitosis_O2Analysis.RadialBins), so each profile is a
+    bincount over the Oxygen field inside the active box and over the cell snapshot. Profiles go to ProfileOutput
+    (one row per shell) and its ``_rims`` sibling (one row per call); with no output the
+    steppable only computes when DEBUG logging is on.
+    """
+
+    def __init__(self, frequency: int | None = None):
+        params = PARAMETERS.snapshot()
+        if frequency is None:
+            frequency = int(params['OutputFrequency'])
+        super().__init__(frequency=frequency)
+        self.bin_width = float(params['ProfileBinWidth'])
+        self.output_path = params['ProfileOutput'] or None
+        self.bins = None
+        self.profiles = None
+        self.rims = None
+
+    def start(self):
+        self.lattice_resized(None)
+        if self.output_path:
+            root, ext = os.path.splitext(self.output_path)
+            self.profiles = ColumnarWriter(self.output_path, PROFILE_COLUMNS)
+            self.rims = ColumnarWriter(f"{root}_rims{ext}", RIM_COLUMNS)
+
+    def lattice_resized(self, shift):
+        self.bins = RadialBins((self.dim.x, self.dim.y, self.dim.z), self.bin_width)
+
+    def step(self, mcs):
+        if self.profiles is None and not logger.isEnabledFor(logging.DEBUG):
+            return
+        bins = self.bins
+        oxygen = field_as_array(self.field.Oxygen)
+        if oxygen is not None:
+            box = active_box(self)
+            o2_mean = bins.field_mean(box.view(oxygen), region=box.slices)
+        else:
+            o2_mean = np.full(bins.n_bins, np.nan)
+        snap = CELL_SNAPSHOT.get(self)
+        n_types = max(self.NORMOXIC, self.HYPOXIC, self.NECROTIC) + 1
+        fractions = bins.cell_fractions(snap.com, snap.volume, snap.types, n_types)
+        radii = rim_radii(bins, fractions, self.HYPOXIC, self.NECROTIC)
+        abs_mcs = RUN_CLOCK.absolute(mcs)
+        if self.profiles is not None:
+            self.profiles.extend(abs_mcs, bins.radius, bins.voxels, o2_mean, fractions[:, self.NORMOXIC],
+                                 fractions[:, self.HYPOXIC], fractions[:, self.NECROTIC])
+            self.rims.append(abs_mcs, radii['outer_radius'], radii['hypoxic_radius'],
+                             radii['necrotic_radius'], radii['viable_rim'])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"[PROFILE] MCS {mcs} R={radii['outer_radius']:.1f} R_hyp={radii['hypoxic_radius']:.1f} "
+                f"R_nec={radii['necrotic_radius']:.1f} rim={radii['viable_rim']:.1f} "
+                f"O2(centre)={o2_mean[0]:.3f}")
+
+    def checkpoint_state(self) -> dict:
+        if self.profiles is None:
+            return {'profiles': None, 'rims': None}
+        return {'profiles': self.profiles.checkpoint(), 'rims': self.rims.checkpoint()}
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        if self.profiles is not None:
+            self.profiles.restore(state['profiles'])
+            self.rims.restore(state['rims'])
+
+    def finish(self):
+        if self.profiles is not None:
+            self.profiles.close()
+            self.rims.close()
+            logger.info(f"[PROFILE] Wrote {self.rims.rows_written} profiles to {self.output_path}")
+
+
+# ------------------------- EVENT LOG ---------------------------- #
+class EventLogSteppable(SteppableBasePy):
+    """Stream EVENT_LOG to EventLogOutput every OutputFrequency MCS; EventLog=0 stops recording.
+
+    The steppables append one typed record per creation, division, transition, kill and
+    removal, so the hot paths do no string formatting; mitosis_O2Events reads the file back
+    and answers lineage, clone-size and time-to-necrosis queries. With no output the records
+    stay in memory only.
+    """
+
+    def __init__(self, frequency: int | None = None):
+        params = PARAMETERS.snapshot()
+        if frequency is None:
+            frequency = int(params['OutputFrequency'])
+        super().__init__(frequency=frequency)
+        EVENT_LOG.reset(enabled=bool(int(params['EventLog'])))
+        self.output_path = params['EventLogOutput'] or None
+
+    def start(self):
+        if self.output_path and EVENT_LOG.enabled:
+            EVENT_LOG.open(self.output_path)
+
+    def step(self, mcs):
+        EVENT_LOG.flush()
+
+    def checkpoint_state(self) -> dict:
+        return EVENT_LOG.state()
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        EVENT_LOG.load_state(state, restore.old_ids, restore.new_ids, -restore.mcs_shift)
+
+    def finish(self):
+        EVENT_LOG.close()
+        if EVENT_LOG.enabled:
+            counts = np.bincount(EVENT_LOG.events['kind'], minlength=len(KIND_NAMES))
+            summary = ' '.join(f"{name}={n}" for name, n in zip(KIND_NAMES, counts.tolist()))
+            logger.info(f"[EVENTS] {EVENT_LOG.size} events ({EVENT_LOG.records.nbytes / 2**20:.1f} MiB) {summary}")
+
+
+# ------------------------- FIELD EXPORT ---------------------------- #
+# Exportable volumes and their stored dtypes (Oxygen is single precision in CompuCell3D)
+EXPORT_FIELDS = {'cell_type': np.uint8, 'cell_id': np.int32, 'oxygen': np.float32}
+
+class FieldExportSteppable(SteppableBasePy):
+    """Every ExportPeriod MCS, copy the ExportFields volumes into a pooled buffer for a background writer.
+
+    Volumes cover the whole lattice, or only ACTIVE_BOX with ExportActiveBox=1, sampled every
+    ExportStride voxels. Compression and file I/O run on the mitosis_O2Export worker thread;
+    when ExportQueue snapshots are already waiting, the step blocks until one is written.
+    ExportPeriod=0 exports nothing.
+    """
+
+    def __init__(self, frequency: int | None = None):
+        params = PARAMETERS.snapshot()
+        self.period = int(params['ExportPeriod'])
+        if frequency is None:
+            frequency = max(1, self.period)
+        super().__init__(frequency=frequency)
+        self.params = params
+        self.fields = [name.strip() for name in params['ExportFields'].split(',') if name.strip()]
+        unknown = sorted(set(self.fields) - set(EXPORT_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown ExportFields {', '.join(unknown)} (expected {', '.join(EXPORT_FIELDS)})")
+        self.stride = int(params['ExportStride'])
+        self.active_only = bool(int(params['ExportActiveBox']))
+        self.exporter = None
+
+    def start(self):
+        if self.period > 0 and self.fields:
+            self.exporter = FieldExporter(project_path(self.params['ExportDir']), self.params['ExportFormat'],
+                                          int(self.params['ExportQueue']), int(self.params['ExportCompression']))
+
+    def step(self, mcs):
+        if self.exporter is None:
+            return
+        shape = (self.dim.x, self.dim.y, self.dim.z)
+        if self.active_only:
+            box = active_box(self)
+            lo, hi = box.lo.copy(), box.hi.copy()
+        else:
+            lo, hi = np.zeros(3, dtype=np.int64), np.array(shape, dtype=np.int64)
+        region = tuple(slice(int(a), int(b), self.stride) for a, b in zip(lo, hi))
+        out_shape = tuple(len(range(*s.indices(n))) for s, n in zip(region, shape))
+        if min(out_shape) == 0:
+            return
+        buffers = self.exporter.acquire({name: (out_shape, EXPORT_FIELDS[name]) for name in self.fields})
+        if 'oxygen' in buffers:
+            oxygen = field_as_array(self.field.Oxygen)
+            if oxygen is not None:
+                np.copyto(buffers['oxygen'], oxygen[region], casting='unsafe')
+            else:
+                grid = np.meshgrid(*(np.arange(*s.indices(n)) for s, n in zip(region, shape)), indexing='ij')
+                buffers['oxygen'][...] = sample_field(self.field.Oxygen, *(g.ravel() for g in grid)).reshape(out_shape)
+        if 'cell_type' in buffers or 'cell_id' in buffers:
+            self._fill_labels(buffers, shape, lo, hi)
+        self.exporter.submit(RUN_CLOCK.absolute(mcs), buffers, origin=lo.tolist(), spacing=(self.stride,) * 3)
+
+    def _fill_labels(self, buffers, shape, lo, hi):
+        """Scatter every cell's voxels (inside the region, on the stride) into the label buffers."""
+        snap = CELL_SNAPSHOT.get(self)
+        flat, counts = cell_voxel_indices(self, snap.cells, shape)
+        rel = np.stack(np.unravel_index(flat, shape)) - lo[:, None]
+        keep = ((rel >= 0) & (rel < (hi - lo)[:, None]) & (rel % self.stride == 0)).all(axis=0)
+        index = tuple(rel[:, keep] // self.stride)
+        for name, values in (('cell_type', snap.types), ('cell_id', snap.ids)):
+            if name in buffers:
+                buffers[name].fill(0)
+                buffers[name][index] = np.repeat(values, counts)[keep]
+
+    def finish(self):
+        if self.exporter is None:
+            return
+        self.exporter.close()
+        logger.info(f"[EXPORT] Wrote {self.exporter.written} snapshots ({self.exporter.bytes_written / 1e6:.1f} MB) "
+                    f"to {self.exporter.directory}; waited {self.exporter.wait_seconds:.2f}s for free buffers")
+
+
+# ------------------------- LATTICE GROWTH ---------------------------- #
+class ActiveBoxSteppable(SteppableBasePy):
+    """Keep ACTIVE_BOX fitted to the cells each MCS and, with DomainAutoGrow=1, grow the lattice.
+
+    When the cells come within ActiveBoxMargin voxels of a face, the crowded axes grow by
+    DomainGrowFactor (at most DomainMaxSize voxels) and the content is re-centred. Register it
+    after the steppables that move, divide or delete cells, and pass them in so they can
+    rebuild lattice-sized state.
+    """
+
+    def __init__(self, frequency: int = 1, steppables=()):
+        super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
+        ACTIVE_BOX.margin = int(self.params['ActiveBoxMargin'])
+        self.auto_grow = bool(int(self.params['DomainAutoGrow']))
+        self.grow_factor = self.params['DomainGrowFactor']
+        self.max_size = int(self.params['DomainMaxSize'])
+        self.steppables = list(steppables)
+        self.resizes = 0
+        self.at_limit = False
+
+    def step(self, mcs):
+        box = active_box(self)
+        if not self.auto_grow or not box.near_boundary().any():
+            return
+        plan = growth_plan(box, self.grow_factor, self.max_size)
+        if plan is None:
+            if not self.at_limit:
+                logger.warning(f"[DOMAIN] MCS {mcs} cells reach the lattice edge at DomainMaxSize={self.max_size}")
+                self.at_limit = True
+            return
+        resize_lattice(self, plan[0], plan[1], self.steppables)
+        self.resizes += 1
+        active_box(self)
+
+    def checkpoint_state(self) -> dict:
+        # The box only refits when cells leave it or it turns loose, so its bounds depend on history
+        return {'lo': ACTIVE_BOX.lo.copy(), 'hi': ACTIVE_BOX.hi.copy()}
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        ACTIVE_BOX.shape = np.array([self.dim.x, self.dim.y, self.dim.z], dtype=np.int64)
+        ACTIVE_BOX.lo = np.asarray(state['lo'], dtype=np.int64)
+        ACTIVE_BOX.hi = np.asarray(state['hi'], dtype=np.int64)
+        ACTIVE_BOX.key = None
+
+    def finish(self):
+        box = ACTIVE_BOX
+        logger.info(f"[DOMAIN] Active box {box.size} = {box.voxels / max(1, int(np.prod(box.shape))):.1%} "
+                    f"of the lattice; {self.resizes} lattice resizes")
+
+
+# ------------------------- ADAPTIVE CADENCE ---------------------------- #
+class CadenceSteppable(SteppableBasePy):
+    """With AdaptiveCadence=1, call fate, mitosis and compaction only when their state calls for it.
+
+    Every steppable passed in that implements ``cadence_interval(elapsed)`` gets a Cadence
+    between CadenceMinInterval and CadenceMaxInterval MCS, starting from its registered
+    frequency, and CompuCell3D then offers it every MCS. A gated call runs once the interval
+    has elapsed or when ``cadence_due()`` (if implemented) reports an event due; afterwards
+    the steppable suggests its next interval from what changed. With AdaptiveCadence=0
+    nothing is wrapped and every steppable keeps its fixed frequency.
+
+    The gates are installed in ``start()``, after the profiler's wrappers, so skipped MCS are
+    not timed. Register it before CheckpointSteppable and pass it in there: the cadences are
+    checkpointed and must exist before a restore.
+    """
+
+    def __init__(self, frequency: int = 1, steppables=()):
+        super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
+        self.enabled = bool(int(self.params['AdaptiveCadence']))
+        self.min_interval = int(self.params['CadenceMinInterval'])
+        self.max_interval = int(self.params['CadenceMaxInterval'])
+        self.steppables = [s for s in steppables if hasattr(s, 'cadence_interval')] if self.enabled else []
+        self.cadences = {}
+
+    def start(self):
+        for steppable in self.steppables:
+            key = type(steppable).__name__
+            if key in self.cadences:
+                self.cadences[key].reset()
+                continue
+            cadence = self.cadences[key] = Cadence(steppable.frequency, self.min_interval, self.max_interval)
+            self._gate(steppable, cadence)
+            steppable.frequency = 1
+
+    @staticmethod
+    def _gate(steppable, cadence: Cadence):
+        step = steppable.step
+        next_event = getattr(steppable, 'cadence_due', None)
+
+        def gated_step(mcs):
+            if not cadence.due(mcs, next_event):
+                cadence.skipped += 1
+                return
+            elapsed = cadence.elapsed(mcs)
+            step(mcs)
+            cadence.called(mcs, steppable.cadence_interval(elapsed))
+
+        steppable.step = gated_step
+
+    def checkpoint_state(self) -> dict:
+        names = sorted(self.cadences)
+        values = np.array([self.cadences[name].state() for name in names], dtype=np.float64).reshape(len(names), 3)
+        return {'names': names, 'cadence': values}
+
+    def restore_checkpoint(self, state: dict, restore: RestoreMap):
+        for name, (interval, last_call, next_call) in zip(state['names'], state['cadence'].tolist()):
+            cadence = self.cadences.get(name)
+            if cadence is not None:
+                cadence.load_state(interval, restore.mcs(last_call), restore.mcs(next_call))
+
+    def finish(self):
+        for name, cadence in self.cadences.items():
+            logger.info(f"[CADENCE] {name}: {cadence.calls} calls, {cadence.skipped} MCS skipped, "
+                        f"final interval {cadence.interval}")
+
+
+# ------------------------- PROFILING ---------------------------- #
+class ProfilingSteppable(SteppableBasePy):
+    """With Profiling=1, time ``start``/``step`` of every steppable passed in, plus the engine.
+
+    Per-call durations, cell counts and event counts (EVENT_COUNTS) go to a ring buffer of
+    ProfilingBuffer records. At finish, latency histograms and a cost-versus-cell-count
+    table are written to ProfilingDir and logged. ProfilerStartMCS..ProfilerStopMCS
+    (empty when equal) is additionally run under a profiler. With Profiling=0 nothing is
+    wrapped. Register it last.
+    """
+
+    def __init__(self, frequency: int = 1, steppables=()):
+        super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
+        self.enabled = bool(int(self.params['Profiling']))
+        self.directory = project_path(self.params['ProfilingDir'])
+        self.profiler = None
+        if not self.enabled:
+            return
+        sampler = None
+        start, stop = int(self.params['ProfilerStartMCS']), int(self.params['ProfilerStopMCS'])
+        if stop > start:
+            sampler = WindowSampler(start, stop, os.path.join(self.directory, f"profile_mcs{start}-{stop}"))
+        self.profiler = StepProfiler(EVENT_COUNTS, lambda: len(self.cell_list),
+                                     int(self.params['ProfilingBuffer']), sampler)
+        for steppable in steppables:
+            self.profiler.instrument(steppable)
+
+    def finish(self):
+        if self.profiler is None:
+            return
+        report = self.profiler.write(self.directory)
+        wall = sum(entry['seconds'] for entry in report['steppables']) or 1.0
+        for entry in sorted(report['steppables'], key=lambda e: -e['seconds']):
+            logger.info(
+                f"[PROFILING] {entry['name']:<28} {entry['seconds']:8.2f}s {entry['seconds'] / wall:6.1%} "
+                f"calls={entry['calls']} mean={entry['mean_seconds'] * 1e3:.3f}ms "
+                f"p99<={entry.get('p99', 0.0) * 1e3:.3f}ms")
+        logger.info(f"[PROFILING] Report written to {self.directory}")
+
+
+# ------------------------- CHECKPOINT / RESTART ---------------------------- #
+CELL_ATTRIBUTES = ('targetVolume', 'targetSurface', 'lambdaVolume', 'lambdaSurface',
+                   'lambdaVecX', 'lambdaVecY', 'lambdaVecZ')
+
+class CheckpointSteppable(SteppableBasePy):
+    """Checkpoint the full simulation state every CheckpointPeriod MCS; restore CheckpointRestore at start.
+
+    A checkpoint holds the cell field (per-cell voxel flat indices), the Oxygen field, per-cell
+    targets, lambdas and ``necrotic_mcs``, the Python RNG and random stream states, both event
+    schedulers and the ``checkpoint_state()`` of every steppable passed in. Register it last, so it snapshots
+    completed MCS and restores after every other ``start()`` has run. The Potts lattice RNG is
+    internal to CompuCell3D and is not captured.
+    """
+
+    def __init__(self, frequency: int = 1, steppables=()):
+        super().__init__(frequency)
+        self.params = PARAMETERS.snapshot()
+        self.period = int(self.params['CheckpointPeriod'])
+        self.keep = int(self.params['CheckpointKeep'])
+        self.directory = self.params['CheckpointDir']
+        self.restore_path = self.params['CheckpointRestore']
+        self.reseed = bool(int(self.params['CheckpointReseed']))
+        self.steppables = list(steppables)
+        self.writer = None
+
+    def start(self):
+        RUN_CLOCK.offset = 0
+        if self.period > 0:
+            self.writer = CheckpointWriter(project_path(self.directory), self.keep)
+        if self.restore_path:
+            self.restore(project_path(self.restore_path))
+
+    def step(self, mcs):
+        # Checkpoint at the end of MCS k so that the resumed run starts exactly at k + 1
+        if self.period > 0 and (RUN_CLOCK.absolute(mcs) + 1) % self.period == 0:
+            self.save(mcs)
+
+    def finish(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    # --- capture ---
+    def save(self, mcs):
+        shape = (self.dim.x, self.dim.y, self.dim.z)
+        snap = CELL_SNAPSHOT.get(self)
+        flat, counts = cell_voxel_indices(self, snap.cells, shape)
+        # Sort each cell's voxels so runs along z are contiguous (and compress well)
+        owner = np.repeat(np.arange(snap.size), counts)
+        flat = flat[np.lexsort((flat, owner))]
+
+        attributes = np.array([[getattr(cell, name) for name in CELL_ATTRIBUTES] for cell in snap.cells],
+                              dtype=np.float64).reshape(snap.size, len(CELL_ATTRIBUTES))
+        necrotic_mcs = np.array([cell.dict.get('necrotic_mcs', np.nan) for cell in snap.cells], dtype=np.float64)
+        oxygen = field_as_array(self.field.Oxygen)
+        if oxygen is None:
+            grid = np.indices(shape).reshape(3, -1)
+            oxygen = sample_field(self.field.Oxygen, *grid).reshape(shape)
+        arrays = {
+            'cell/id': snap.ids.copy(),
+            'cell/type': snap.types.astype(np.int8),
+            'cell/attributes': attributes,
+            'cell/necrotic_mcs': necrotic_mcs,
+            'cell/voxel_count': counts.astype(np.int32),
+            'cell/voxel_index': flat.astype(np.int32 if flat.size == 0 or flat.max() < 2**31 else np.int64),
+            'field/oxygen': np.array(oxygen),
+        }
+        for name, scheduler in (('necrotic', NECROTIC_SCHEDULER), ('division', DIVISION_SCHEDULER)):
+            arrays[f'scheduler/{name}_id'], arrays[f'scheduler/{name}_due'] = scheduler.state()
+
+        states = {}
+        for steppable in self.steppables:
+            if hasattr(steppable, 'checkpoint_state'):
+                key = type(steppable).__name__
+                states[key] = {}
+                for name, value in steppable.checkpoint_state().items():
+                    if isinstance(value, np.ndarray):
+                        arrays[f'state/{key}/{name}'] = value
+                    else:
+                        states[key][name] = value
+        resume_mcs = RUN_CLOCK.absolute(mcs) + 1
+        meta = {
+            'resume_mcs': resume_mcs,
+            'dims': list(shape),
+            'cell_attributes': list(CELL_ATTRIBUTES),
+            'random_state': encode_random_state(random.getstate()),
+            'random_streams': RANDOM_STREAMS.state(),
+            'parameters': dict(self.params),
+            'steppable_states': states,
+        }
+        path = self.writer.submit(resume_mcs, meta, arrays)
+        logger.info(f"[CHECKPOINT] MCS {mcs}: queued {snap.size} cells for {path}")
+
+    # --- restore ---
+    def restore(self, path: str):
+        meta, arrays = read_checkpoint(path)
+        shape = tuple(int(n) for n in meta['dims'])
+        if shape != (self.dim.x, self.dim.y, self.dim.z):
+            # Saved after the lattice had grown (DomainAutoGrow); grow this one to match
+            resize_lattice(self, shape, (0, 0, 0), self.steppables)
+        resume_mcs = int(meta['resume_mcs'])
+        for steppable in self.steppables:
+            if resume_mcs % max(1, steppable.frequency):
+                logger.warning(f"[CHECKPOINT] Resume MCS {resume_mcs} is off the {type(steppable).__name__} "
+                               f"cadence ({steppable.frequency}); its calls shift phase")
+
+        for cell in list(self.cell_list):
+            self.delete_cell(cell)
+        old_ids = arrays['cell/id']
+        types = arrays['cell/type']
+        attributes = arrays['cell/attributes']
+        necrotic_mcs = arrays['cell/necrotic_mcs']
+        flat = arrays['cell/voxel_index'].astype(np.int64)
+        offsets = np.concatenate(([0], np.cumsum(arrays['cell/voxel_count'], dtype=np.int64)))
+        names = meta['cell_attributes']
+        new_ids = np.empty_like(old_ids)
+        # CC3D counts from MCS 0 again; every stored MCS moves by -resume_mcs
+        shift = -resume_mcs
+        # Recreate in ascending old id so new ids keep the same relative order
+        for row in np.argsort(old_ids).tolist():
+            cell = self.new_cell(int(types[row]))
+            new_ids[row] = cell.id
+            starts, lengths = voxel_runs(flat[offsets[row]:offsets[row + 1]], shape[2])
+            xs, ys, zs = np.unravel_index(starts, shape)
+            for x, y, z, n in zip(xs.tolist(), ys.tolist(), zs.tolist(), lengths.tolist()):
+                self.cell_field[x, y, z:z + n] = cell
+            for name, value in zip(names, attributes[row].tolist()):
+                setattr(cell, name, value)
+            if not np.isnan(necrotic_mcs[row]):
+                cell.dict['necrotic_mcs'] = int(necrotic_mcs[row]) + shift
+        write_field(self.field.Oxygen, arrays['field/oxygen'])
+        random.setstate(decode_random_state(meta['random_state']))
+        if 'random_streams' in meta:
+            RANDOM_STREAMS.load_state(meta['random_streams'])
+        if self.reseed and self.params['RandomSeed']:
+            # Branches forked from one checkpoint share its RNG state; their own seed makes them diverge
+            random.seed(self.params['RandomSeed'])
+            RANDOM_STREAMS.reseed(self.params['RandomSeed'])
 
+        restore = RestoreMap(old_ids, new_ids, shift)
+        for name, scheduler in (('necrotic', NECROTIC_SCHEDULER), ('division', DIVISION_SCHEDULER)):
+            ids = restore.ids(arrays[f'scheduler/{name}_id'])
+            live = ids >= 0
+            scheduler.load_state(ids[live], restore.mcs(arrays[f'scheduler/{name}_due'][live]))
+        states = meta['steppable_states']
+        for steppable in self.steppables:
+            key = type(steppable).__name__
+            if key in states and hasattr(steppable, 'restore_checkpoint'):
+                state = dict(states[key])
+                prefix = f'state/{key}/'
+                state.update({name[len(prefix):]: value for name, value in arrays.items() if name.startswith(prefix)})
+                steppable.restore_checkpoint(state, restore)
+        RUN_CLOCK.offset = resume_mcs
+        CELL_SNAPSHOT.invalidate()
+        VOXEL_CACHE.clear()
+        logger.info(f"[CHECKPOINT] Restored {len(old_ids)} cells from {path}; MCS 0 continues absolute MCS {resume_mcs}")
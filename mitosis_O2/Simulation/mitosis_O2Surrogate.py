@@ -0,0 +1,578 @@
+"""Radially symmetric continuum surrogate of the spheroid model, vectorized over parameter sets.
+
+A full CPM run takes minutes to hours; screens over O2 thresholds, growth, uptake or the
+RT schedule mostly need radius, viable rim and counts over time. The surrogate replaces
+cells by per-shell amounts on concentric shells of ``shell_width`` voxels around the
+centre, for n parameter sets at once (every state array is (n_sets, n_shells)):
+
+- Oxygen: 1D radial reaction-diffusion with the XML's DiffusionSolverFE constants and
+  per-type uptake (mitosis_O2Oxygen.read_diffusion_config), weighted by the cell volume
+  of each type in the shell. Explicit finite volumes with a ConstantValue boundary at
+  the lattice's half-width, uptake before diffusion in every substep, as the 3D solver.
+- Fate, every FATE_FREQUENCY MCS: the two-threshold rule moves volume and cell count
+  between normoxic, hypoxic and necrotic. O2 is taken as linear across each shell, so the
+  viable cells of a shell split by the fraction of its width on each side of the
+  thresholds (the loss stays smooth for calibration). Normoxic volume then grows by
+  GrowthRateNormoxic per cell, and the normoxic count follows at the balanced-growth rate
+  of cells dividing at FinalTargetVolume (DivProbNormoxic adds the mean wait once ready).
+  Necrotic volume shrinks by NecroticShrinkageRate per call and is cleared at the mean
+  rate of the CPM's lifetime rule (removed with probability 0.75 after NecroticLifetime).
+- Packing: after every fate call the cell material is repacked from the centre out at
+  the packing density, keeping its radial order (compaction closes the gaps left by
+  shrinking cores).
+- Radiotherapy: RT_* fractions kill the LQ fraction of normoxic and hypoxic cells in each
+  shell, with per-type OER (RT_OERModel=0) or the Alper-Howard-Flanders OER of the
+  shell's O2 (1).
+
+Runs report the LightAnalysisSteppable summary columns (counts are expected values,
+hence fractional) plus the rim radii of mitosis_O2Analysis.rim_radii. Not modelled: dose
+maps, per-cell O2 sampling modes, division timing noise and cell shape.
+
+Three free constants stand in for what the continuum cannot resolve. They are set like
+UserParameters (in a spec's ``parameters``/``fixed`` or a constants file) and can be fitted
+to CPM output with ``calibrate``: a batched Nelder-Mead that simulates every candidate for
+every CPM run in one vectorized batch and minimises the squared log error of the counts
+and total volume at the CPM's summary rows.
+
+``run`` takes a mitosis_O2Sweep spec (``replicates`` are ignored, the surrogate is
+deterministic):
+
+    {
+        "mode": "lhs",
+        "parameters": {"O2_Thresh_NormoxicHypoxic": [0.10, 0.20],
+                       "SurrogateUptakeScale": [0.5, 2.0]},
+        "samples": 4096,
+        "seed": 1234,
+        "fixed": {"RT_Enable": 1},
+        "steps": 3000
+    }
+
+Usage:
+    python mitosis_O2Surrogate.py run spec.json --out surrogate.npz --constants fit.json
+    python mitosis_O2Surrogate.py calibrate sweep_out --out fit.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from mitosis_O2Analysis import OCCUPIED_FRACTION
+from mitosis_O2Output import is_closed, read_columns
+from mitosis_O2Oxygen import BC_VALUE, read_diffusion_config
+from mitosis_O2Params import load_user_parameters
+from mitosis_O2Radiation import alper_howard_flanders_oer, lq_survival
+from mitosis_O2Schedules import FATE_FREQUENCY
+from mitosis_O2Sweep import MANIFEST_FILE, OVERLAY_FILE, SIMULATION_DIR, SUMMARY_FILE, XML_NAME, expand_spec, run_dir
+
+logger = logging.getLogger(__name__)
+
+# Free constants: name -> (default, low, high)
+FREE_CONSTANTS = {
+    'SurrogatePacking': (0.9, 0.5, 1.0),         # cell volume per voxel inside the spheroid
+    'SurrogateUptakeScale': (1.0, 0.05, 20.0),   # multiplies every type's MaxUptake and RelativeUptakeRate
+    'SurrogateClearanceScale': (1.0, 0.05, 20.0),  # multiplies the necrotic clearance rate
+}
+# Must match the summary and rim columns of mitosis_O2Steppables; literal so this module never imports cc3d
+SUMMARY_NAMES = ('mcs', 'normoxic', 'hypoxic', 'necrotic', 'total_volume', 'o2_min', 'o2_mean', 'o2_max',
+                 'rt_fractions', 'rt_killed')
+RIM_NAMES = ('outer_radius', 'hypoxic_radius', 'necrotic_radius', 'viable_rim')
+FIT_COLUMNS = ('normoxic', 'hypoxic', 'necrotic', 'total_volume')
+TYPE_NAMES = ('Normoxic', 'Hypoxic', 'Necrotic')
+NORMOXIC, HYPOXIC, NECROTIC = range(3)
+# RadiotherapySteppable's per-type OER (RT_OERModel=0)
+OER_BY_TYPE = (1.0, 3.0)
+# Necrotic cells past their lifetime are removed with this probability per check
+NECROTIC_REMOVAL_PROBABILITY = 0.75
+# Explicit diffusion substeps keep this margin below the stability limit
+STABILITY_MARGIN = 0.9
+SHELL_WIDTH = 1.0
+
+
+def _column(param_sets: list, name: str, dtype=np.float64) -> np.ndarray:
+    return np.array([params[name] for params in param_sets], dtype=dtype)
+
+
+# ------------------------- MODEL ---------------------------- #
+class RadialSurrogate:
+    """The continuum model for a list of parameter sets, all on one shell grid.
+
+    Every parameter set is a UserParameters mapping, optionally carrying FREE_CONSTANTS
+    (``constants`` supplies those it does not). Call ``run`` once per instance.
+    """
+
+    def __init__(self, param_sets: list, config: dict, constants: dict | None = None,
+                 shell_width: float = SHELL_WIDTH):
+        constants = {name: spec[0] for name, spec in FREE_CONSTANTS.items()} | dict(constants or {})
+        param_sets = [constants | dict(params) for params in param_sets]
+        self.n_sets = len(param_sets)
+        if not self.n_sets:
+            raise ValueError("No parameter sets to simulate")
+        modes = {params['InitMode'] for params in param_sets}
+        if len(modes) != 1 or not modes <= {'single', 'spheres', 'voronoi'}:
+            raise ValueError(f"The surrogate needs one InitMode of single, spheres or voronoi, got {sorted(modes)}")
+
+        # Shells out to the nearest ConstantValue face of the lattice
+        values = [value for sides in config['boundaries'].values() for kind, value in sides if kind == BC_VALUE]
+        if not values:
+            raise ValueError("The surrogate needs ConstantValue oxygen boundaries")
+        self.boundary = float(np.mean(values))
+        self.shell_width = float(shell_width)
+        self.n_shells = max(1, int(min(config['shape']) / 2.0 / self.shell_width))
+        edges = np.arange(self.n_shells + 1) * self.shell_width
+        self.edges = edges
+        self.shell_volume = 4.0 / 3.0 * math.pi * np.diff(edges ** 3)
+        self.cumulative_volume = 4.0 / 3.0 * math.pi * edges ** 3
+        # Conductance of each shell face; the last one reaches the boundary half a shell out
+        conductance = config['diffusion'] * 4.0 * math.pi * edges ** 2 / self.shell_width
+        conductance[-1] *= 2.0
+        self.conductance = conductance
+        rate = (conductance[:-1] + conductance[1:]) / self.shell_volume + config['decay']
+        self.substeps = max(1, math.ceil(rate.max() / STABILITY_MARGIN))
+        self.dt = 1.0 / self.substeps
+        self.decay = config['decay']
+        self.initial_o2 = config['initial']
+
+        s = _column(param_sets, 'SurrogateUptakeScale')[:, None]
+        self.uptake = []
+        for index, name in enumerate(TYPE_NAMES):
+            vmax, rel, km = config['uptake'].get(config['type_ids'][name], (0.0, 0.0, None))
+            if vmax > 0:
+                self.uptake.append((index, vmax * s, rel * s, km))
+
+        self.thresh_nh = _column(param_sets, 'O2_Thresh_NormoxicHypoxic')[:, None]
+        self.thresh_hn = _column(param_sets, 'O2_Thresh_HypoxicNecrotic')[:, None]
+        self.growth = np.maximum(_column(param_sets, 'GrowthRateNormoxic'), 0.0)[:, None]
+        # Balanced growth: a cell gains FinalTargetVolume / 2 between divisions, then waits 1/p - 1 MCS on average
+        div_prob = _column(param_sets, 'DivProbNormoxic')
+        cycle = np.divide(0.5 * _column(param_sets, 'FinalTargetVolume') * FATE_FREQUENCY, self.growth[:, 0],
+                          out=np.full(self.n_sets, np.inf), where=self.growth[:, 0] > 0)
+        cycle += np.divide(1.0 - div_prob, div_prob, out=np.full(self.n_sets, np.inf), where=div_prob > 0)
+        self.division_factor = np.exp2(FATE_FREQUENCY / cycle)[:, None]
+        self.shrink_factor = 1.0 - _column(param_sets, 'NecroticShrinkageRate')[:, None]
+        lifetime = np.maximum(_column(param_sets, 'NecroticLifetime'), 1.0)
+        clearance = _column(param_sets, 'SurrogateClearanceScale') * NECROTIC_REMOVAL_PROBABILITY / lifetime
+        self.clear_factor = np.exp(-clearance * FATE_FREQUENCY)[:, None]
+        self.packing = np.clip(_column(param_sets, 'SurrogatePacking'), *FREE_CONSTANTS['SurrogatePacking'][1:])
+
+        self.rt_enabled = _column(param_sets, 'RT_Enable', np.int64).astype(bool)
+        self.rt_fractions = _column(param_sets, 'RT_Fractions', np.int64)
+        self.rt_start = _column(param_sets, 'RT_StartMCS', np.int64)
+        self.rt_period = np.maximum(_column(param_sets, 'RT_PeriodMCS', np.int64), 1)
+        self.rt_dose = _column(param_sets, 'RT_DoseGy')
+        self.rt_alpha = _column(param_sets, 'RT_Alpha')
+        self.rt_beta = _column(param_sets, 'RT_Beta')
+        self.rt_oxygen_oer = _column(param_sets, 'RT_OERModel', np.int64) == 1
+        self.rt_oer_max = _column(param_sets, 'RT_OERMax')
+        self.rt_oer_k = _column(param_sets, 'RT_OER_K')
+        self.fractions_delivered = np.zeros(self.n_sets, dtype=np.int64)
+        self.killed = np.zeros(self.n_sets)
+
+        # Cell volume (rows 0-2) and cell count (rows 3-5) of each type in each shell
+        self.amounts = np.zeros((6, self.n_sets, self.n_shells))
+        if modes == {'single'}:
+            radius = _column(param_sets, 'InitialCellRadius')
+            self.amounts[NORMOXIC, :, 0] = 4.0 / 3.0 * math.pi * radius ** 3
+            self.amounts[3 + NORMOXIC, :, 0] = 1.0
+        else:
+            count = _column(param_sets, 'InitCellCount')
+            self.amounts[NORMOXIC, :, 0] = count * _column(param_sets, 'InitCellVolume')
+            self.amounts[3 + NORMOXIC, :, 0] = count
+        self._pack()
+        self.o2 = np.full((self.n_sets, self.n_shells), float(self.initial_o2))
+        self._grad = np.zeros((self.n_sets, self.n_shells + 1))
+        self._faces = np.empty((self.n_sets, self.n_shells + 1))
+        self._tmp = np.empty((self.n_sets, self.n_shells))
+
+    # --- oxygen ---
+    def _step_oxygen(self):
+        c, grad, tmp = self.o2, self._grad, self._tmp
+        density = self.amounts[:3] / self.shell_volume
+        dt_volume = self.dt / self.shell_volume
+        for _ in range(self.substeps):
+            for index, vmax, rel, km in self.uptake:
+                if km is None:
+                    np.multiply(c, rel, out=tmp)
+                    np.minimum(tmp, vmax, out=tmp)
+                else:
+                    np.divide(c, c + km, out=tmp)
+                    tmp *= vmax
+                tmp *= density[index]
+                tmp *= self.dt
+                c -= tmp
+            # Uptake never drives the concentration negative
+            np.maximum(c, 0.0, out=c)
+            np.subtract(c[:, 1:], c[:, :-1], out=grad[:, 1:-1])
+            np.subtract(self.boundary, c[:, -1], out=grad[:, -1])
+            grad *= self.conductance
+            np.subtract(grad[:, 1:], grad[:, :-1], out=tmp)
+            tmp *= dt_volume
+            if self.decay:
+                tmp -= self.dt * self.decay * c
+            c += tmp
+
+    # --- cells ---
+    def _below(self, threshold) -> np.ndarray:
+        """Fraction of each shell's width where O2, linear between the shell's faces, is below ``threshold``."""
+        faces = self._faces
+        lower = np.minimum(faces[:, :-1], faces[:, 1:])
+        spread = np.abs(faces[:, 1:] - faces[:, :-1])
+        below = np.divide(threshold - lower, spread, out=(lower < threshold).astype(np.float64), where=spread > 0)
+        return np.clip(below, 0.0, 1.0)
+
+    def _step_fate(self):
+        volume, count = self.amounts[:3], self.amounts[3:]
+        # Necrotic cells from earlier calls shrink and are cleared first, as in _process_necrotic_batch
+        volume[NECROTIC] *= self.shrink_factor * self.clear_factor
+        count[NECROTIC] *= self.clear_factor
+        # Cells within a shell sit at different O2, so a shell's cells change type by fractions
+        faces = self._faces
+        faces[:, 0] = self.o2[:, 0]
+        np.add(self.o2[:, 1:], self.o2[:, :-1], out=faces[:, 1:-1])
+        faces[:, 1:-1] *= 0.5
+        faces[:, -1] = self.boundary
+        necrotic = self._below(self.thresh_hn)
+        normoxic = 1.0 - np.maximum(self._below(self.thresh_nh), necrotic)
+        hypoxic = 1.0 - normoxic - necrotic
+        for amount in (volume, count):
+            viable = amount[NORMOXIC] + amount[HYPOXIC]
+            amount[NECROTIC] += necrotic * viable
+            amount[NORMOXIC] = normoxic * viable
+            amount[HYPOXIC] = hypoxic * viable
+        volume[NORMOXIC] += self.growth * count[NORMOXIC]
+        count[NORMOXIC] *= self.division_factor
+        self._pack()
+
+    def _pack(self):
+        """Refill the shells from the centre out at the packing density, keeping the radial order."""
+        amounts = self.amounts
+        n_sets, n = self.n_sets, self.n_shells
+        total = amounts[:3].sum(axis=0)
+        filled = np.zeros((n_sets, n + 1))
+        np.cumsum(total, axis=1, out=filled[:, 1:])
+        capacity = self.packing[:, None] * self.cumulative_volume
+        # One searchsorted for every set: offset each row past the previous one
+        offset = (filled[:, -1].max() + capacity[:, -1].max() + 1.0) * np.arange(n_sets)[:, None]
+        shell = np.searchsorted((filled + offset).ravel(), (capacity + offset).ravel(), side='right')
+        shell = np.clip(shell.reshape(n_sets, n + 1) - 1 - (n + 1) * np.arange(n_sets)[:, None], 0, n - 1)
+        # Fraction of the source shell's material below each new edge; shells are well mixed
+        source = np.take_along_axis(total, shell, axis=1)
+        part = np.divide(capacity - np.take_along_axis(filled, shell, axis=1), source,
+                         out=np.zeros_like(capacity), where=source > 0)
+        np.clip(part, 0.0, 1.0, out=part)
+        cumulative = np.zeros(amounts.shape[:2] + (n + 1,))
+        np.cumsum(amounts, axis=2, out=cumulative[..., 1:])
+        index = np.broadcast_to(shell, amounts.shape[:2] + (n + 1,))
+        packed = np.take_along_axis(cumulative, index, axis=2)
+        packed += part * np.take_along_axis(amounts, index, axis=2)
+        # Material beyond the last edge's capacity is dropped: cells cannot grow past the lattice
+        self.amounts = np.diff(packed, axis=2)
+
+    # --- radiotherapy ---
+    def _step_radiotherapy(self, mcs: int):
+        due = (self.rt_enabled & (self.fractions_delivered < self.rt_fractions) & (mcs >= self.rt_start)
+               & ((mcs - self.rt_start) % self.rt_period == 0))
+        rows = np.flatnonzero(due)
+        if rows.size == 0:
+            return
+        o2 = self.o2[rows]
+        oxygen_oer = alper_howard_flanders_oer(o2, self.rt_oer_max[rows, None], self.rt_oer_k[rows, None])
+        dose, alpha, beta = self.rt_dose[rows, None], self.rt_alpha[rows, None], self.rt_beta[rows, None]
+        model = self.rt_oxygen_oer[rows, None]
+        for cell_type in (NORMOXIC, HYPOXIC):
+            oer = np.where(model, oxygen_oer, OER_BY_TYPE[cell_type])
+            killed = 1.0 - lq_survival(dose, oer, alpha, beta)
+            for offset in (0, 3):
+                moved = self.amounts[offset + cell_type, rows] * killed
+                self.amounts[offset + cell_type, rows] -= moved
+                self.amounts[offset + NECROTIC, rows] += moved
+                if offset == 3:
+                    self.killed[rows] += moved.sum(axis=1)
+        self.fractions_delivered[rows] += 1
+
+    # --- output ---
+    def summary(self, mcs: int) -> dict:
+        """Summary and rim columns of every set at the current state."""
+        volume, count = self.amounts[:3], self.amounts[3:]
+        cells = count.sum(axis=0)
+        occupied = cells > 0
+        n_cells = cells.sum(axis=1)
+        any_cells = n_cells > 0
+        o2 = self.o2
+        row = {
+            'mcs': np.full(self.n_sets, mcs, dtype=np.int64),
+            'normoxic': count[NORMOXIC].sum(axis=1),
+            'hypoxic': count[HYPOXIC].sum(axis=1),
+            'necrotic': count[NECROTIC].sum(axis=1),
+            'total_volume': volume.sum(axis=(0, 2)),
+            'o2_min': np.where(any_cells, np.where(occupied, o2, np.inf).min(axis=1), np.nan),
+            'o2_mean': np.divide((o2 * cells).sum(axis=1), n_cells, out=np.full(self.n_sets, np.nan),
+                                 where=any_cells),
+            'o2_max': np.where(any_cells, np.where(occupied, o2, -np.inf).max(axis=1), np.nan),
+            'rt_fractions': self.fractions_delivered.copy(),
+            'rt_killed': self.killed.copy(),
+        }
+        row.update(self.rim_radii(volume))
+        return row
+
+    def rim_radii(self, volume) -> dict:
+        """mitosis_O2Analysis.rim_radii for every set, from the per-type volume fractions of the shells."""
+        fractions = volume / self.shell_volume
+        occupied = fractions.sum(axis=0)
+        inside = occupied >= OCCUPIED_FRACTION
+        has_outer = inside.any(axis=1)
+        outer = self.n_shells - 1 - np.argmax(inside[:, ::-1], axis=1)
+        within = np.arange(self.n_shells) <= outer[:, None]
+        half = 0.5 * occupied
+        radii = {'outer_radius': np.where(has_outer, self.edges[outer + 1], 0.0)}
+        for name, columns in (('hypoxic_radius', [HYPOXIC, NECROTIC]), ('necrotic_radius', [NECROTIC])):
+            majority = (fractions[columns].sum(axis=0) > half) & (half > 0) & within & has_outer[:, None]
+            last = self.n_shells - 1 - np.argmax(majority[:, ::-1], axis=1)
+            radii[name] = np.where(majority.any(axis=1), self.edges[last + 1], 0.0)
+        radii['viable_rim'] = radii['outer_radius'] - radii['necrotic_radius']
+        return radii
+
+    def run(self, steps: int, every: int) -> dict:
+        """Simulate MCS 0..steps-1 and return the columns recorded every ``every`` MCS, each (n_sets, rows)."""
+        every = max(1, int(every))
+        rows = []
+        for mcs in range(int(steps)):
+            self._step_oxygen()
+            if mcs % FATE_FREQUENCY == 0:
+                self._step_fate()
+            self._step_radiotherapy(mcs)
+            if mcs % every == 0:
+                rows.append(self.summary(mcs))
+        names = SUMMARY_NAMES + RIM_NAMES
+        if not rows:
+            return {name: np.empty((self.n_sets, 0)) for name in names}
+        return {name: np.stack([row[name] for row in rows], axis=1) for name in names}
+
+
+# ------------------------- BATCH RUNS ---------------------------- #
+def xml_steps(xml_path: str) -> int:
+    """The Potts <Steps> of the XML."""
+    return int(ET.parse(xml_path).getroot().findtext('Potts/Steps'))
+
+def simulate(param_sets: list, steps: int, every: int, xml_path: str | None = None,
+             constants: dict | None = None) -> dict:
+    """Columns (n_sets, rows) of the surrogate for every parameter set, using the XML's oxygen setup.
+
+    Sets with different ``InitMode`` start from different geometries, so each mode runs as
+    its own batch.
+    """
+    config = read_diffusion_config(xml_path or os.path.join(SIMULATION_DIR, XML_NAME))
+    modes = [params['InitMode'] for params in param_sets]
+    if len(set(modes)) <= 1:
+        return RadialSurrogate(param_sets, config, constants).run(steps, every)
+    columns = {}
+    for mode in sorted(set(modes)):
+        rows = [i for i, m in enumerate(modes) if m == mode]
+        batch = RadialSurrogate([param_sets[i] for i in rows], config, constants).run(steps, every)
+        for name, values in batch.items():
+            columns.setdefault(name, np.empty((len(param_sets),) + values.shape[1:], dtype=values.dtype))[rows] = values
+    return columns
+
+def run_spec(spec: dict, xml_path: str | None = None, constants: dict | None = None,
+             steps: int | None = None) -> dict:
+    """Simulate every point of a sweep spec; returns results.npz-style columns, one row per set and MCS."""
+    xml_path = xml_path or os.path.join(SIMULATION_DIR, XML_NAME)
+    defaults = load_user_parameters(xml_path)
+    constants = {name: value[0] for name, value in FREE_CONSTANTS.items()} | dict(constants or {})
+    # Free constants may be varied like any parameter; the surrogate is deterministic, so one run per point
+    runs = [run for run in expand_spec(spec, defaults | constants) if run['replicate'] == 0]
+    param_sets = [defaults | constants | run['params'] for run in runs]
+    steps = steps or spec.get('steps') or xml_steps(xml_path)
+    series = simulate(param_sets, steps, int(defaults['OutputFrequency']), xml_path)
+    n_rows = series['mcs'].shape[1]
+    columns = {'run_id': np.repeat([run['run_id'] for run in runs], n_rows).astype(np.int64),
+               'point': np.repeat([run['point'] for run in runs], n_rows).astype(np.int64)}
+    param_names = sorted({name for run in runs for name in run['params']} | set(FREE_CONSTANTS))
+    for name in param_names:
+        value = [params[name] for params in param_sets]
+        if not any(isinstance(v, str) for v in value):
+            columns[f"param_{name}"] = np.repeat(np.asarray(value, dtype=np.float64), n_rows)
+    for name, values in series.items():
+        columns[name] = values.ravel()
+    return columns
+
+
+# ------------------------- CALIBRATION ---------------------------- #
+def load_targets(paths: list, xml_path: str | None = None) -> list:
+    """(parameters, summary series) of CPM runs: sweep output directories or single summary files.
+
+    A summary file takes its parameters from the ``params.json`` overlay next to it, if any.
+    """
+    defaults = load_user_parameters(xml_path or os.path.join(SIMULATION_DIR, XML_NAME))
+    targets = []
+    for path in paths:
+        if os.path.isdir(path):
+            with open(os.path.join(path, MANIFEST_FILE)) as fh:
+                runs = json.load(fh)['runs']
+            for run in runs:
+                summary = os.path.join(run_dir(path, run['run_id']), SUMMARY_FILE)
+                if is_closed(summary):
+                    targets.append((defaults | run['params'], read_columns(summary)))
+        else:
+            overlay = os.path.join(os.path.dirname(path), OVERLAY_FILE)
+            params = dict(defaults)
+            if os.path.exists(overlay):
+                with open(overlay) as fh:
+                    params.update(json.load(fh))
+            targets.append((params, read_columns(path)))
+    targets = [(params, series) for params, series in targets if len(series['mcs'])]
+    if not targets:
+        raise RuntimeError(f"No completed CPM summaries in {', '.join(paths)}")
+    return targets
+
+def calibration_loss(targets: list, names: list, candidates, xml_path: str | None = None) -> np.ndarray:
+    """Mean squared log error of FIT_COLUMNS for each candidate row of constants, over every target.
+
+    All candidates and targets are simulated in one batch.
+    """
+    candidates = np.atleast_2d(np.asarray(candidates, dtype=np.float64))
+    steps = max(int(series['mcs'].max()) for _, series in targets) + 1
+    every = math.gcd(*(int(params['OutputFrequency']) for params, _ in targets))
+    param_sets = [params | dict(zip(names, candidate.tolist())) for candidate in candidates for params, _ in targets]
+    result = simulate(param_sets, steps, every, xml_path)
+    errors = np.empty((len(candidates), len(targets)))
+    for j, (_, series) in enumerate(targets):
+        mcs = np.asarray(series['mcs'], dtype=np.int64)
+        matched = np.flatnonzero(mcs % every == 0)
+        rows = mcs[matched] // every
+        squared = 0.0
+        for name in FIT_COLUMNS:
+            observed = np.log1p(np.asarray(series[name], dtype=np.float64)[matched])
+            predicted = np.log1p(result[name][j::len(targets)][:, rows])
+            squared = squared + ((predicted - observed) ** 2).mean(axis=1)
+        errors[:, j] = squared / len(FIT_COLUMNS)
+    return errors.mean(axis=1)
+
+def nelder_mead(loss, x0, step: float = 0.2, iterations: int = 200, tol: float = 1e-6,
+                x_tol: float = 1e-4) -> tuple:
+    """Minimise ``loss`` (a (k, d) batch of points -> k values) with Nelder-Mead; returns (x, f, iterations).
+
+    Every iteration evaluates the reflection, expansion and both contractions in one batch,
+    and a shrink evaluates the new vertices in one batch. It stops once both the values and
+    the vertices agree to ``tol`` and ``x_tol``, so a simplex on a plateau keeps searching.
+    """
+    x0 = np.asarray(x0, dtype=np.float64)
+    d = x0.size
+    simplex = np.vstack([x0, x0 + step * np.eye(d)])
+    values = loss(simplex)
+    for iteration in range(1, int(iterations) + 1):
+        order = np.argsort(values)
+        simplex, values = simplex[order], values[order]
+        if values[-1] - values[0] <= tol and np.abs(simplex[1:] - simplex[0]).max() <= x_tol:
+            break
+        centroid = simplex[:-1].mean(axis=0)
+        worst = simplex[-1]
+        reflected = centroid + (centroid - worst)
+        trial = np.vstack([reflected, centroid + 2.0 * (centroid - worst),
+                           centroid + 0.5 * (centroid - worst), centroid - 0.5 * (centroid - worst)])
+        f_reflect, f_expand, f_outside, f_inside = loss(trial)
+        if values[0] <= f_reflect < values[-2]:
+            simplex[-1], values[-1] = reflected, f_reflect
+        elif f_reflect < values[0]:
+            best = 1 if f_expand < f_reflect else 0
+            simplex[-1], values[-1] = trial[best], (f_expand, f_reflect)[best]
+        elif f_reflect < values[-1] and f_outside <= f_reflect:
+            simplex[-1], values[-1] = trial[2], f_outside
+        elif f_reflect >= values[-1] and f_inside < values[-1]:
+            simplex[-1], values[-1] = trial[3], f_inside
+        else:
+            simplex[1:] = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+            values[1:] = loss(simplex[1:])
+    best = int(np.argmin(values))
+    return simplex[best], float(values[best]), iteration
+
+def calibrate(paths: list, names: list | None = None, iterations: int = 200, xml_path: str | None = None,
+              initial: dict | None = None, restarts: int = 3) -> dict:
+    """Fit free constants to CPM summaries; returns the constants (fitted and fixed) and the losses.
+
+    The search runs over the logit of each constant's position between its bounds on a
+    log scale, so every point of the search space is a valid set of constants.
+    """
+    names = list(names or FREE_CONSTANTS)
+    unknown = sorted(set(names) - set(FREE_CONSTANTS))
+    if unknown:
+        raise KeyError(f"Unknown surrogate constants: {', '.join(unknown)}")
+    constants = {name: spec[0] for name, spec in FREE_CONSTANTS.items()} | dict(initial or {})
+    targets = load_targets(paths, xml_path)
+    fixed = {name: value for name, value in constants.items() if name not in names}
+    targets = [(params | fixed, series) for params, series in targets]
+    low = np.log([FREE_CONSTANTS[name][1] for name in names])
+    span = np.log([FREE_CONSTANTS[name][2] for name in names]) - low
+
+    def to_constants(points):
+        return np.exp(low + span / (1.0 + np.exp(-np.asarray(points))))
+
+    def loss(points):
+        return calibration_loss(targets, names, to_constants(points), xml_path)
+
+    start = np.clip((np.log([constants[name] for name in names]) - low) / span, 0.01, 0.99)
+    x0 = np.log(start / (1.0 - start))
+    initial_loss = float(loss(x0[None])[0])
+    logger.info(f"[SURROGATE] Calibrating {', '.join(names)} against {len(targets)} CPM runs, "
+                f"initial loss {initial_loss:.4g}")
+    x, value, used = nelder_mead(loss, x0, step=0.5, iterations=iterations)
+    # A fresh simplex around the result escapes the flat steps the last one collapsed on
+    for _ in range(restarts):
+        if used >= iterations:
+            break
+        x_new, value_new, more = nelder_mead(loss, x, step=0.5, iterations=iterations - used)
+        used += more
+        if value_new >= value:
+            break
+        x, value = x_new, value_new
+    constants.update(zip(names, to_constants(x).tolist()))
+    logger.info(f"[SURROGATE] Loss {initial_loss:.4g} -> {value:.4g} after {used} iterations: "
+                + ' '.join(f"{name}={constants[name]:.4g}" for name in names))
+    return {'constants': constants, 'fitted': names, 'loss': value, 'initial_loss': initial_loss,
+            'iterations': used, 'runs': len(targets)}
+
+
+def _load_constants(path: str | None) -> dict:
+    if not path:
+        return {}
+    with open(path) as fh:
+        return json.load(fh)['constants']
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='Simulate every point of a sweep spec')
+    run.add_argument('spec', help='JSON sweep specification')
+    run.add_argument('--out', required=True, help='Columnar .npz of the summary series')
+    run.add_argument('--constants', default=None, help='Constants file written by calibrate')
+    run.add_argument('--steps', type=int, default=None, help='MCS to simulate (default: spec steps, else Potts Steps)')
+    fit = commands.add_parser('calibrate', help='Fit the free constants to CPM summaries')
+    fit.add_argument('targets', nargs='+', help='Sweep output directories or summary.cols files')
+    fit.add_argument('--out', required=True, help='JSON file for the fitted constants')
+    fit.add_argument('--fit', nargs='+', default=None, choices=sorted(FREE_CONSTANTS),
+                     help='Constants to fit (default: all)')
+    fit.add_argument('--constants', default=None, help='Starting constants file')
+    fit.add_argument('--iterations', type=int, default=200, help='Nelder-Mead iterations')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        with open(args.spec) as fh:
+            spec = json.load(fh)
+        columns = run_spec(spec, constants=_load_constants(args.constants), steps=args.steps)
+        np.savez_compressed(args.out, **columns)
+        logger.info(f"[SURROGATE] {len(np.unique(columns['run_id']))} parameter sets, "
+                    f"{len(columns['mcs'])} rows written to {args.out}")
+    else:
+        result = calibrate(args.targets, args.fit, args.iterations, initial=_load_constants(args.constants))
+        with open(args.out, 'w') as fh:
+            json.dump(result, fh, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Headless parameter sweeps over the <UserParameters> of mitosis_O2.xml.
+
+A sweep spec (JSON) names the parameters to vary, either as a full grid or as a
+Latin-hypercube sample, plus replicates and a master seed:
+
+    {
+        "mode": "lhs",                      # or "grid"
+        "parameters": {"O2_Thresh_NormoxicHypoxic": [0.10, 0.20],
+                       "GrowthRateNormoxic": [1.5, 2.5]},
+        "samples": 32,                      # lhs only
+        "replicates": 4,
+        "seed": 1234,
+        "fixed": {"RT_Enable": 1},          # optional, applied to every run
+        "steps": 3000                       # optional Potts <Steps> override
+    }
+
+For grid mode each parameter maps to the list of values to combine. Every run gets
+its own project directory whose parameters are injected through a JSON overlay
+(``MITOSIS_O2_PARAMS``, see mitosis_O2Params); only the Potts seed and step count
+are patched into the run's XML copy, and the master XML is never touched. The
+per-run seed drives both the Potts lattice and Python-side randomness. Runs are executed across a ProcessPoolExecutor. A run counts as done
+once its streamed summary file has been closed, so rerunning the same command resumes
+an interrupted sweep. Per-run summary series are merged into one columnar ``results.npz``.
+
+Usage:
+    python mitosis_O2Sweep.py spec.json --out sweep_out --workers 32
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from mitosis_O2Params import OVERLAY_ENV_VAR, SCHEMA, coerce, load_user_parameters
+from mitosis_O2Output import is_closed, read_columns
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+SIMULATION_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SIMULATION_DIR)
+PROJECT_FILE = 'mitosis_O2.cc3d'
+XML_NAME = 'mitosis_O2.xml'
+# Must match mitosis_O2Steppables.SUMMARY_ENV_VAR; kept literal so this module never imports cc3d
+SUMMARY_ENV_VAR = 'MITOSIS_O2_SUMMARY'
+SUMMARY_FILE = 'summary.cols'
+OVERLAY_FILE = 'params.json'
+MANIFEST_FILE = 'manifest.json'
+RESULTS_FILE = 'results.npz'
+DEFAULT_COMMAND = (sys.executable, '-m', 'cc3d.run_script', '-i', '{cc3d}')
+
+
+# ------------------------- XML HELPERS ---------------------------- #
+def _parse_xml(xml_path: str):
+    # Keep comments so materialized XML files stay readable
+    parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True))
+    return ET.parse(xml_path, parser=parser)
+
+def write_run_xml(src_xml: str, dst_xml: str, seed: int, steps: int | None = None):
+    """Copy the XML with the Potts seed and optional step count set; UserParameters stay as-is."""
+    tree = _parse_xml(src_xml)
+    potts = tree.getroot().find('Potts')
+    if potts is not None:
+        seed_node = potts.find('RandomSeed')
+        if seed_node is None:
+            seed_node = ET.SubElement(potts, 'RandomSeed')
+        seed_node.text = str(seed)
+        if steps is not None:
+            potts.find('Steps').text = str(int(steps))
+    tree.write(dst_xml)
+
+
+# ------------------------- SPEC EXPANSION ---------------------------- #
+def latin_hypercube(bounds: dict, samples: int, rng) -> list:
+    """One stratified sample per row and per dimension, randomly paired across dimensions."""
+    columns = {}
+    for name, (low, high) in bounds.items():
+        u = (rng.permutation(samples) + rng.random(samples)) / samples
+        columns[name] = low + u * (high - low)
+    return [{name: columns[name][i] for name in bounds} for i in range(samples)]
+
+def param_type(name: str, defaults: dict) -> type:
+    """Declared type of ``name``, or the type of its default when it is not in the schema."""
+    spec = SCHEMA.get(name)
+    return spec.type if spec is not None else type(defaults[name])
+
+def expand_spec(spec: dict, defaults: dict) -> list:
+    """Turn a sweep spec into a list of run descriptions with per-run parameters and seeds.
+
+    Numeric parameters are cast to their type (integers rounded after sampling); others
+    (e.g. ``InitMode``) take the values of an explicit grid list as they are.
+    """
+    mode = spec.get('mode', 'grid')
+    varied = spec.get('parameters', {})
+    fixed = spec.get('fixed', {})
+    unknown = sorted((set(varied) | set(fixed)) - set(defaults))
+    if unknown:
+        raise KeyError(f"Unknown parameters in sweep spec: {', '.join(unknown)}")
+    kinds = {name: param_type(name, defaults) for name in varied}
+
+    master = np.random.SeedSequence(spec.get('seed'))
+    rng = np.random.default_rng(master.spawn(1)[0])
+    if mode == 'grid':
+        names = list(varied)
+        points = [dict(zip(names, values)) for values in itertools.product(*(varied[n] for n in names))]
+    elif mode == 'lhs':
+        categorical = sorted(name for name, kind in kinds.items() if kind not in (int, float))
+        if categorical:
+            raise ValueError(f"LHS sweeps need numeric bounds; use a grid for {', '.join(categorical)}")
+        points = latin_hypercube({n: tuple(b) for n, b in varied.items()}, int(spec['samples']), rng)
+    else:
+        raise ValueError(f"Unknown sweep mode '{mode}' (expected 'grid' or 'lhs')")
+
+    replicates = int(spec.get('replicates', 1))
+    # Independent, reproducible seed per run (not per worker) so results don't depend on scheduling
+    seeds = master.spawn(len(points) * replicates)
+    runs = []
+    for p_idx, point in enumerate(points):
+        params = dict(fixed)
+        for name, value in point.items():
+            # Integer-typed parameters stay integers after sampling
+            if kinds[name] is int:
+                value = int(round(value))
+            elif kinds[name] is float:
+                value = float(value)
+            params[name] = value
+        # Fail at expansion time rather than in a worker if a value is out of range
+        for name, value in params.items():
+            coerce(name, value)
+        for rep in range(replicates):
+            run_idx = p_idx * replicates + rep
+            runs.append({
+                'run_id': run_idx,
+                'point': p_idx,
+                'replicate': rep,
+                # CC3D wants a positive 31-bit seed
+                'seed': int(seeds[run_idx].generate_state(1)[0] % (2**31 - 1)) + 1,
+                'params': params,
+            })
+    return runs
+
+
+# ------------------------- MATERIALIZATION ---------------------------- #
+def run_dir(out_dir: str, run_id: int) -> str:
+    return os.path.join(out_dir, 'runs', f"run_{run_id:05d}")
+
+def materialize_run(run: dict, out_dir: str, steps: int | None = None) -> str:
+    """Create the per-run project copy and return the path of its .cc3d file."""
+    dst = run_dir(out_dir, run['run_id'])
+    sim_dst = os.path.join(dst, 'Simulation')
+    os.makedirs(sim_dst, exist_ok=True)
+    shutil.copy2(os.path.join(PROJECT_DIR, PROJECT_FILE), dst)
+    for name in os.listdir(SIMULATION_DIR):
+        if name.endswith('.py'):
+            shutil.copy2(os.path.join(SIMULATION_DIR, name), sim_dst)
+    params = dict(run['params'])
+    params['RandomSeed'] = run['seed']
+    # Sweep runs are headless: skip the plot windows unless the spec pins them
+    params.setdefault('AnalysisPlots', 0)
+    with open(os.path.join(dst, OVERLAY_FILE), 'w') as fh:
+        json.dump(params, fh, indent=1)
+    write_run_xml(os.path.join(SIMULATION_DIR, XML_NAME), os.path.join(sim_dst, XML_NAME),
+                  run['seed'], steps)
+    with open(os.path.join(dst, 'run.json'), 'w') as fh:
+        json.dump(run, fh, indent=1)
+    return os.path.join(dst, PROJECT_FILE)
+
+
+# ------------------------- EXECUTION ---------------------------- #
+def execute_run(run: dict, out_dir: str, command: tuple, steps: int | None = None) -> tuple:
+    """Worker entry point: materialize and run one simulation; returns (run_id, returncode)."""
+    cc3d_path = materialize_run(run, out_dir, steps)
+    dst = os.path.dirname(cc3d_path)
+    env = dict(os.environ)
+    env[SUMMARY_ENV_VAR] = os.path.join(dst, SUMMARY_FILE)
+    env[OVERLAY_ENV_VAR] = os.path.join(dst, OVERLAY_FILE)
+    # Each worker runs one simulation at a time; keep native thread pools from oversubscribing
+    env.setdefault('OMP_NUM_THREADS', '1')
+    argv = [part.format(cc3d=cc3d_path, out=dst) for part in command]
+    with open(os.path.join(dst, 'run.log'), 'w') as log:
+        proc = subprocess.run(argv, cwd=os.path.join(dst, 'Simulation'), env=env,
+                              stdout=log, stderr=subprocess.STDOUT)
+    return run['run_id'], proc.returncode
+
+def is_complete(out_dir: str, run_id: int) -> bool:
+    # The summary is streamed during the run; only a closed file marks a finished run
+    return is_closed(os.path.join(run_dir(out_dir, run_id), SUMMARY_FILE))
+
+def run_sweep(spec: dict, out_dir: str, workers: int | None = None,
+              command: tuple = DEFAULT_COMMAND, xml_path: str | None = None) -> list:
+    """Run (or resume) every run of the sweep; returns ids of runs that failed."""
+    xml_path = xml_path or os.path.join(SIMULATION_DIR, XML_NAME)
+    runs = expand_spec(spec, load_user_parameters(xml_path))
+    # Simulations run from their own directory, so every path handed to them must be absolute
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as fh:
+            previous = json.load(fh)
+        if previous['spec'] != spec:
+            raise RuntimeError(f"{out_dir} holds a different sweep; use a new output directory")
+    else:
+        with open(manifest_path, 'w') as fh:
+            json.dump({'spec': spec, 'runs': runs}, fh, indent=1)
+
+    pending = [run for run in runs if not is_complete(out_dir, run['run_id'])]
+    logger.info(f"[SWEEP] {len(runs)} runs, {len(runs) - len(pending)} already complete")
+    failed = []
+    steps = spec.get('steps')
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(execute_run, run, out_dir, tuple(command), steps) for run in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            run_id, code = future.result()
+            if code != 0 or not is_complete(out_dir, run_id):
+                failed.append(run_id)
+                logger.info(f"[SWEEP] run {run_id} FAILED (exit {code}), see {run_dir(out_dir, run_id)}/run.log")
+            else:
+                logger.debug(f"[SWEEP] run {run_id} done")
+            if done % 10 == 0 or done == len(futures):
+                logger.info(f"[SWEEP] {done}/{len(futures)} runs finished")
+    return sorted(failed)
+
+
+# ------------------------- RESULT COLLECTION ---------------------------- #
+def collect_results(out_dir: str, results_path: str | None = None) -> str:
+    """Concatenate all completed run summaries into one columnar .npz keyed by run."""
+    with open(os.path.join(out_dir, MANIFEST_FILE)) as fh:
+        runs = json.load(fh)['runs']
+    # String parameters (paths) are not numeric columns
+    param_names = sorted({name for run in runs for name, value in run['params'].items() if not isinstance(value, str)})
+    columns = {}
+    n_done = 0
+    for run in runs:
+        path = os.path.join(run_dir(out_dir, run['run_id']), SUMMARY_FILE)
+        if not is_closed(path):
+            continue
+        series = read_columns(path)
+        n_rows = len(series['mcs'])
+        meta = {'run_id': run['run_id'], 'point': run['point'],
+                'replicate': run['replicate'], 'seed': run['seed']}
+        for name, value in meta.items():
+            columns.setdefault(name, []).append(np.full(n_rows, value, dtype=np.int64))
+        for name in param_names:
+            value = run['params'].get(name, np.nan)
+            columns.setdefault(f"param_{name}", []).append(np.full(n_rows, value, dtype=np.float64))
+        for name, values in series.items():
+            columns.setdefault(name, []).append(values)
+        n_done += 1
+    if not n_done:
+        raise RuntimeError(f"No completed runs in {out_dir}")
+    results_path = results_path or os.path.join(out_dir, RESULTS_FILE)
+    np.savez_compressed(results_path, **{name: np.concatenate(parts) for name, parts in columns.items()})
+    logger.info(f"[SWEEP] Collected {n_done}/{len(runs)} runs into {results_path}")
+    return results_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('spec', help='JSON sweep specification')
+    parser.add_argument('--out', required=True, help='Output directory (reuse it to resume)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Parallel simulations')
+    parser.add_argument('--command', default=None,
+                        help="Simulation command template, '{cc3d}' is replaced by the project file")
+    parser.add_argument('--dry-run', action='store_true', help='Only materialize the run directories')
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as fh:
+        spec = json.load(fh)
+    if args.dry_run:
+        runs = expand_spec(spec, load_user_parameters(os.path.join(SIMULATION_DIR, XML_NAME)))
+        for run in runs:
+            materialize_run(run, args.out, spec.get('steps'))
+        logger.info(f"[SWEEP] Materialized {len(runs)} runs under {args.out}")
+        return 0
+    command = tuple(args.command.split()) if args.command else DEFAULT_COMMAND
+    failed = run_sweep(spec, args.out, args.workers, command)
+    collect_results(args.out)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The simulation modules import each other by bare name, as CompuCell3D runs them from Simulation/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Simulation'))
+
+
+@pytest.fixture
+def steppables():
+    """mitosis_O2Steppables on the benchmark's mock CompuCell3D runtime; overrides are cleared afterwards."""
+    from mitosis_O2Benchmark import install_mock_runtime
+    install_mock_runtime()
+    import mitosis_O2Steppables
+    from mitosis_O2Params import PARAMETERS
+    yield mitosis_O2Steppables
+    PARAMETERS.clear_overrides()
@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+
+import mitosis_O2Benchmark as bench
+from mitosis_O2Checkpoint import list_checkpoints
+from mitosis_O2Events import RESTORE, lineage_keys, read_events
+from mitosis_O2Output import read_columns
+from mitosis_O2Params import PARAMETERS
+
+PERIOD = 20
+N_MCS = 45
+SEED = 7
+
+
+def paint_population(steppable):
+    """Paint every synthetic cell as the cube around its COM; cells left without voxels are removed."""
+    for cell in sorted(bench.WORLD.cells.values(), key=lambda c: c.id):
+        half = max(1, int(round(cell.volume ** (1.0 / 3.0) / 2.0)))
+        x, y, z = (int(round(v)) for v in (cell.xCOM, cell.yCOM, cell.zCOM))
+        steppable.cell_field[x - half:x + half, y - half:y + half, z - half:z + half] = cell
+    for cell in list(bench.WORLD.cells.values()):
+        if cell.volume == 0:
+            steppable.delete_cell(cell)
+
+
+def start_run(S, directory: str, **overrides) -> list:
+    """The registered pipeline, the event log and a checkpoint steppable writing into ``directory``."""
+    os.makedirs(directory)
+    PARAMETERS.override(
+        AnalysisPlots=0, Profiling=0, AdaptiveCadence=0, OutputFrequency=1, RandomSeed=SEED,
+        FateBatchMode=1, MitosisScheduled=1, NecroticLifetime=10,
+        RT_Enable=1, RT_StartMCS=0, RT_PeriodMCS=5, RT_Fractions=100, RT_DoseGy=1.0,
+        AnalysisOutput=os.path.join(directory, 'summary.cols'),
+        ProfileOutput=os.path.join(directory, 'profile.cols'),
+        EventLog=1, EventLogOutput=os.path.join(directory, 'events.cols'),
+        CheckpointPeriod=PERIOD, CheckpointKeep=10, CheckpointDir=os.path.join(directory, 'checkpoints'),
+        **overrides)
+    S.CELL_SNAPSHOT.invalidate()
+    pipeline = bench.build_pipeline(S) + [S.EventLogSteppable()]
+    checkpoint = S.CheckpointSteppable(frequency=1, steppables=pipeline)
+    for steppable in pipeline + [checkpoint]:
+        steppable.start()
+    return pipeline + [checkpoint]
+
+
+def run(S, steppables: list, n_mcs: int):
+    for _ in range(n_mcs):
+        mcs = bench.WORLD.mcs
+        # Stands in for the Potts RNG, which checkpoints do not capture (it drives division planes)
+        np.random.seed(SEED + S.RUN_CLOCK.absolute(mcs))
+        for steppable in steppables:
+            if mcs % steppable.frequency == 0:
+                steppable.step(mcs)
+        bench.engine_step(np.random.default_rng(SEED))
+        S.CELL_SNAPSHOT.invalidate()
+
+
+def final_state(S, steppables: list) -> dict:
+    """What a resumed run must reproduce, with ids as sorted-id ranks and MCS values absolute."""
+    snap = S.CELL_SNAPSHOT.get(steppables[0])
+    ids = np.sort(snap.ids)
+    offset = S.RUN_CLOCK.offset
+    state = {
+        'ids': np.searchsorted(ids, snap.ids),
+        'types': snap.types.copy(), 'com': snap.com.copy(), 'volume': snap.volume.copy(),
+        'target_volume': snap.target_volume.copy(), 'target_surface': snap.target_surface.copy(),
+        'necrotic_mcs': np.array([cell.dict.get('necrotic_mcs', np.nan) + offset for cell in snap.cells]),
+        'oxygen': bench.WORLD.field.Oxygen.copy(),
+        'absolute_mcs': S.RUN_CLOCK.absolute(bench.WORLD.mcs),
+    }
+    for name, scheduler in (('necrotic', S.NECROTIC_SCHEDULER), ('division', S.DIVISION_SCHEDULER)):
+        scheduled, due = scheduler.state()
+        order = np.argsort(scheduled)
+        state[f'{name}_ids'] = np.searchsorted(ids, scheduled[order])
+        state[f'{name}_due'] = due[order] + offset
+        assert np.isin(scheduled, ids).all()
+    return state
+
+
+def event_rows(path: str) -> dict:
+    """Event file columns without RESTORE records; cells numbered in order of first appearance."""
+    events = read_events(path)
+    cell, parent = lineage_keys(events)
+    keep = events['kind'] != RESTORE
+    events, cell, parent = events[keep], cell[keep], parent[keep]
+    first = {}
+    for key in np.concatenate([cell[:, None], parent[:, None]], axis=1).ravel().tolist():
+        if key >= 0:
+            first.setdefault(key, len(first))
+    rows = {name: events[name] for name in ('mcs', 'kind', 'from_type', 'to_type', 'volume', 'o2')}
+    rows['cell'] = np.array([first[key] for key in cell.tolist()])
+    rows['parent'] = np.array([first.get(key, -1) for key in parent.tolist()])
+    return rows
+
+
+def finish(steppables: list):
+    for steppable in steppables:
+        steppable.finish()
+
+
+def test_restored_run_continues_like_an_uninterrupted_one(steppables, tmp_path):
+    S = steppables
+    bench.build_population(300, seed=SEED)
+    paint_population(bench.MockSteppableBasePy())
+    shape = bench.WORLD.field.Oxygen.shape
+
+    reference_dir = str(tmp_path / 'reference')
+    reference = start_run(S, reference_dir)
+    run(S, reference, N_MCS)
+    expected = final_state(S, reference)
+    finish(reference)
+    checkpoints = list_checkpoints(os.path.join(reference_dir, 'checkpoints'))
+    assert [os.path.basename(path) for path in checkpoints] == \
+        ['checkpoint_00000020.npz', 'checkpoint_00000040.npz']
+    assert S.EVENT_COUNTS.divisions and S.EVENT_COUNTS.kills and S.EVENT_COUNTS.deletions
+
+    # A fresh lattice restored from the first checkpoint, writing its own outputs
+    bench.WORLD.reset(shape)
+    resumed_dir = str(tmp_path / 'resumed')
+    resumed = start_run(S, resumed_dir, CheckpointRestore=checkpoints[0])
+    assert S.RUN_CLOCK.offset == PERIOD
+    run(S, resumed, N_MCS - PERIOD)
+    actual = final_state(S, resumed)
+    finish(resumed)
+
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_array_equal(actual[name], expected[name], err_msg=name)
+    # The outputs were cut at the checkpoint's positions and continued without gaps or repeats
+    for name in ('summary.cols', 'profile.cols', 'profile_rims.cols'):
+        want, got = (read_columns(os.path.join(directory, name)) for directory in (reference_dir, resumed_dir))
+        assert got.keys() == want.keys()
+        for column in want:
+            np.testing.assert_array_equal(got[column], want[column], err_msg=f'{name}:{column}')
+    want, got = (event_rows(os.path.join(directory, 'events.cols')) for directory in (reference_dir, resumed_dir))
+    for column in want:
+        np.testing.assert_array_equal(got[column], want[column], err_msg=f'events:{column}')
@@ -0,0 +1,33 @@
+import numpy as np
+
+from mitosis_O2Events import CREATE, DIVISION, RESTORE, TRANSITION, EventLog, lineage, lineage_keys, read_events
+
+
+def test_resume_in_place_keeps_events_before_checkpoint(tmp_path):
+    path = str(tmp_path / 'events.cols')
+    log = EventLog()
+    log.open(path, chunk_rows=4)
+    log.extend(0, CREATE, [1, 2])
+    log.record(10, DIVISION, 3, parent=1)
+    log.record(20, TRANSITION, 2, from_type=1, to_type=2)
+    state = log.state()
+    log.record(30, DIVISION, 4, parent=3)
+    log.close()
+
+    # Resume in the same file: the steppable opens the log, then restores it
+    resumed = EventLog()
+    resumed.open(path, chunk_rows=4)
+    resumed.load_state(state, old_ids=[1, 2, 3], new_ids=[7, 8, 9], mcs=20)
+    resumed.record(25, DIVISION, 10, parent=9)
+    resumed.close()
+
+    events = read_events(path)
+    np.testing.assert_array_equal(events['kind'], [CREATE, CREATE, DIVISION, TRANSITION,
+                                                   RESTORE, RESTORE, RESTORE, DIVISION])
+    np.testing.assert_array_equal(events['mcs'], [0, 0, 10, 20, 20, 20, 20, 25])
+    np.testing.assert_array_equal(events['segment'], [0, 0, 0, 0, 1, 1, 1, 1])
+    for name in ('cell', 'parent', 'kind'):
+        np.testing.assert_array_equal(events[name], resumed.events[name])
+    # The division after the restore continues the lineage written before it
+    cell, _ = lineage_keys(events)
+    assert lineage(events, cell[-1]) == [1, 3, cell[-1]]
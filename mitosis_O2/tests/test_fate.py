@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import mitosis_O2Benchmark as bench
+from mitosis_O2Params import PARAMETERS
+
+HEADLESS = {'AnalysisPlots': 0, 'CheckpointPeriod': 0, 'Profiling': 0, 'AdaptiveCadence': 0}
+
+
+def start_pipeline(S, n_cells: int, seed: int, **overrides) -> list:
+    """Fate, mitosis and radiotherapy on a synthetic spheroid, started and seeded."""
+    PARAMETERS.override(**HEADLESS, **overrides)
+    thresholds = (PARAMETERS.get('O2_Thresh_NormoxicHypoxic'), PARAMETERS.get('O2_Thresh_HypoxicNecrotic'))
+    bench.build_population(n_cells, thresholds=thresholds, necrotic_lifetime=PARAMETERS.get('NecroticLifetime'),
+                           seed=seed)
+    np.random.seed(seed)
+    S.random.seed(seed)
+    S.RANDOM_STREAMS.reseed(seed)
+    S.CELL_SNAPSHOT.invalidate()
+    S.RUN_CLOCK.offset = 0
+    pipeline = [S.O2DrivenFateSteppable(frequency=5), S.O2MitosisSteppable(frequency=1),
+                S.RadiotherapySteppable(frequency=1)]
+    for steppable in pipeline:
+        steppable.start()
+    return pipeline
+
+
+def run_pipeline(S, pipeline: list, n_mcs: int, seed: int):
+    rng = np.random.default_rng(seed)
+    for _ in range(n_mcs):
+        mcs = bench.WORLD.mcs
+        for steppable in pipeline:
+            if mcs % steppable.frequency == 0:
+                steppable.step(mcs)
+        bench.engine_step(rng)
+        S.CELL_SNAPSHOT.invalidate()
+
+
+def necrotic_ids() -> set:
+    return {cell.id for cell in bench.WORLD.cells.values() if cell.type == bench.MockSteppableBasePy.NECROTIC}
+
+
+@pytest.mark.parametrize('batch', [0, 1])
+def test_necrotic_scheduler_only_tracks_cells_in_batch_mode(steppables, batch):
+    S = steppables
+    kills = S.EVENT_COUNTS.kills
+    deletions = S.EVENT_COUNTS.deletions
+    pipeline = start_pipeline(S, 400, seed=2, FateBatchMode=batch, NecroticLifetime=10,
+                              RT_Enable=1, RT_StartMCS=0, RT_PeriodMCS=5, RT_Fractions=100, RT_DoseGy=2.0)
+    run_pipeline(S, pipeline, 60, seed=2)
+    assert S.EVENT_COUNTS.kills > kills and S.EVENT_COUNTS.deletions > deletions
+    if batch:
+        # Live necrotic cells, and no deleted ones, are scheduled
+        assert set(S.NECROTIC_SCHEDULER.registered_ids().tolist()) <= necrotic_ids()
+    else:
+        # The per-cell path never pops the heap, so nothing may be registered
+        assert len(S.NECROTIC_SCHEDULER) == 0
+        assert not S.NECROTIC_SCHEDULER._heap
+        assert S.NECROTIC_SCHEDULER.state()[0].size == 0
+
+
+def world_state() -> list:
+    """Every cell's id, type, volume, targets and COM, sorted by id."""
+    return [(cell.id, cell.type, cell.volume, cell.targetVolume, cell.targetSurface, cell.lambdaVolume,
+             cell.xCOM, cell.yCOM, cell.zCOM, cell.dict.get('necrotic_mcs'))
+            for cell in sorted(bench.WORLD.cells.values(), key=lambda c: c.id)]
+
+
+def run_modes(S, fate_batch: int, scheduled: int, n_mcs: int = 100) -> list:
+    # Necrotic removals draw in a different order on the two paths, so none may fall due
+    pipeline = start_pipeline(S, 1000, seed=5, FateBatchMode=fate_batch, MitosisScheduled=scheduled,
+                              NecroticLifetime=10 ** 6, RT_Enable=0)
+    run_pipeline(S, pipeline, n_mcs, seed=5)
+    return world_state()
+
+
+def test_batched_fate_matches_per_cell_path(steppables):
+    reference = run_modes(steppables, fate_batch=0, scheduled=0)
+    assert len(reference) > 1500  # Divisions and transitions actually happened
+    assert run_modes(steppables, fate_batch=1, scheduled=0) == reference
+
+
+def test_scheduled_mitosis_matches_scan(steppables):
+    reference = run_modes(steppables, fate_batch=0, scheduled=0)
+    assert run_modes(steppables, fate_batch=0, scheduled=1) == reference
+    assert run_modes(steppables, fate_batch=1, scheduled=1) == reference
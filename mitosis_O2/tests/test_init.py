@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from mitosis_O2Init import ball_mask, lattice_seeds, sphere_radius, voronoi_ball
+
+SHAPE = (48, 48, 48)
+CENTER = (24.2, 23.7, 24.0)
+
+
+class ConstantStream:
+    """Stand-in for a random stream that always draws ``value``: every seed moves the same way."""
+
+    def __init__(self, value: float):
+        self.value = value
+
+    def random_batch(self, n: int) -> np.ndarray:
+        return np.full(n, self.value)
+
+
+class UniformStream:
+    def __init__(self, seed: int):
+        self.rng = np.random.default_rng(seed)
+
+    def random_batch(self, n: int) -> np.ndarray:
+        return self.rng.random(n)
+
+
+@pytest.mark.parametrize('stream', [ConstantStream(0.0), ConstantStream(1.0), UniformStream(3)])
+@pytest.mark.parametrize('n_cells, cell_volume', [(8, 64.0), (50, 27.0), (200, 125.0)])
+def test_voronoi_ball_has_no_holes_at_maximum_jitter(n_cells, cell_volume, stream):
+    jitter = 0.5
+    seeds = lattice_seeds(n_cells, cell_volume, CENTER, jitter, stream)
+    radius = float(sphere_radius(n_cells * cell_volume))
+    labels = voronoi_ball(SHAPE, seeds, CENTER, radius, cell_volume, jitter)
+    mask = ball_mask(SHAPE, CENTER, radius)
+    assert not (mask & (labels == 0)).any()
+    assert not (~mask & (labels != 0)).any()
+
+    # Every voxel belongs to its nearest seed
+    points = np.argwhere(mask).astype(np.float64)
+    dist2 = ((points[:, None, :] - seeds[None, :, :]) ** 2).sum(axis=2)
+    chosen = dist2[np.arange(points.shape[0]), labels[mask] - 1]
+    np.testing.assert_allclose(chosen, dist2.min(axis=1))
@@ -0,0 +1,57 @@
+import numpy as np
+
+from mitosis_O2Output import ColumnarWriter, is_closed, read_columns
+
+COLUMNS = {'mcs': np.int32, 'value': np.float64}
+
+
+def write_rows(writer, rows):
+    for i in rows:
+        writer.append(i, 0.5 * i)
+
+
+def test_resume_in_place_keeps_rows_before_checkpoint(tmp_path):
+    path = str(tmp_path / 'summary.cols')
+    writer = ColumnarWriter(path, COLUMNS, chunk_rows=4)
+    write_rows(writer, range(10))
+    position = writer.checkpoint()
+    write_rows(writer, range(10, 13))
+    writer.close()
+
+    resumed = ColumnarWriter(path, COLUMNS, chunk_rows=4)
+    resumed.restore(position)
+    assert resumed.rows_written == 10
+    write_rows(resumed, range(100, 103))
+    resumed.close()
+
+    columns = read_columns(path)
+    np.testing.assert_array_equal(columns['mcs'], list(range(10)) + [100, 101, 102])
+    np.testing.assert_array_equal(columns['value'], 0.5 * columns['mcs'])
+    assert is_closed(path)
+
+
+def test_resume_into_new_path_copies_rows_before_checkpoint(tmp_path):
+    source = str(tmp_path / 'a.cols')
+    writer = ColumnarWriter(source, COLUMNS, chunk_rows=4)
+    write_rows(writer, range(10))
+    position = writer.checkpoint()
+    write_rows(writer, range(10, 13))
+    writer.close()
+
+    target = str(tmp_path / 'b.cols')
+    resumed = ColumnarWriter(target, COLUMNS)
+    resumed.restore(position)
+    write_rows(resumed, [20])
+    resumed.close()
+
+    np.testing.assert_array_equal(read_columns(target)['mcs'], list(range(10)) + [20])
+    np.testing.assert_array_equal(read_columns(source)['mcs'], range(13))
+
+
+def test_restore_of_missing_file_starts_fresh(tmp_path):
+    path = str(tmp_path / 'summary.cols')
+    writer = ColumnarWriter(path, COLUMNS)
+    writer.restore({'path': str(tmp_path / 'gone.cols'), 'bytes': 64})
+    write_rows(writer, range(3))
+    writer.close()
+    np.testing.assert_array_equal(read_columns(path)['mcs'], range(3))
@@ -0,0 +1,82 @@
+"""Checkpoint/restore of the analysis output files the way the analysis steppables drive it."""
+import os
+
+import numpy as np
+
+from mitosis_O2Output import ColumnarWriter, is_closed, read_columns
+
+# Column subsets of the steppables' SUMMARY_COLUMNS / PROFILE_COLUMNS / RIM_COLUMNS
+SUMMARY = {'mcs': np.int64, 'normoxic': np.int64, 'total_volume': np.float64}
+PROFILES = {'mcs': np.int64, 'radius': np.float64, 'o2_mean': np.float64}
+RIMS = {'mcs': np.int64, 'outer_radius': np.float64}
+N_BINS = 4
+
+
+def open_writers(directory):
+    return {
+        'summary': ColumnarWriter(os.path.join(directory, 'summary.cols'), SUMMARY),
+        'profiles': ColumnarWriter(os.path.join(directory, 'profiles.cols'), PROFILES),
+        'rims': ColumnarWriter(os.path.join(directory, 'profiles_rims.cols'), RIMS),
+    }
+
+
+def step(writers, mcs):
+    writers['summary'].append(mcs, 10 * mcs, 2.0 * mcs)
+    writers['profiles'].extend(mcs, np.arange(N_BINS, dtype=np.float64), np.linspace(1.0, 0.0, N_BINS))
+    writers['rims'].append(mcs, 0.1 * mcs)
+
+
+def test_restore_into_same_directory(tmp_path):
+    directory = str(tmp_path)
+    writers = open_writers(directory)
+    for mcs in range(0, 50, 5):
+        step(writers, mcs)
+    state = {name: writer.checkpoint() for name, writer in writers.items()}
+    for mcs in range(50, 80, 5):
+        step(writers, mcs)
+    for writer in writers.values():
+        writer.close()
+
+    # Resume in the same directory: start() opens the writers, then restore_checkpoint()
+    resumed = open_writers(directory)
+    for name, writer in resumed.items():
+        writer.restore(state[name])
+    for mcs in range(50, 60, 5):
+        step(resumed, mcs)
+    for writer in resumed.values():
+        writer.close()
+
+    expected = np.arange(0, 60, 5)
+    summary = read_columns(os.path.join(directory, 'summary.cols'))
+    np.testing.assert_array_equal(summary['mcs'], expected)
+    np.testing.assert_array_equal(summary['normoxic'], 10 * expected)
+    profiles = read_columns(os.path.join(directory, 'profiles.cols'))
+    np.testing.assert_array_equal(profiles['mcs'], np.repeat(expected, N_BINS))
+    np.testing.assert_array_equal(profiles['radius'], np.tile(np.arange(N_BINS), expected.size))
+    rims = read_columns(os.path.join(directory, 'profiles_rims.cols'))
+    np.testing.assert_allclose(rims['outer_radius'], 0.1 * expected)
+    assert all(is_closed(writer.path) for writer in resumed.values())
+
+
+def test_restore_after_crash_drops_rows_past_checkpoint(tmp_path):
+    directory = str(tmp_path)
+    writers = open_writers(directory)
+    for mcs in range(10):
+        step(writers, mcs)
+    state = {name: writer.checkpoint() for name, writer in writers.items()}
+    for mcs in range(10, 20):
+        step(writers, mcs)
+    # A crash leaves buffered rows unwritten and the files unclosed
+    for writer in writers.values():
+        writer.flush()
+
+    resumed = open_writers(directory)
+    for name, writer in resumed.items():
+        writer.restore(state[name])
+    assert resumed['summary'].rows_written == 10
+    assert resumed['profiles'].rows_written == 10 * N_BINS
+    step(resumed, 10)
+    for writer in resumed.values():
+        writer.close()
+    np.testing.assert_array_equal(read_columns(os.path.join(directory, 'summary.cols'))['mcs'], np.arange(11))
+    np.testing.assert_array_equal(read_columns(os.path.join(directory, 'profiles_rims.cols'))['mcs'], np.arange(11))
@@ -0,0 +1,43 @@
+import os
+import shutil
+
+import pytest
+
+import mitosis_O2Params as P
+from mitosis_O2Sweep import SIMULATION_DIR, XML_NAME
+
+
+@pytest.fixture
+def xml_copy(tmp_path, monkeypatch):
+    path = str(tmp_path / XML_NAME)
+    shutil.copy(os.path.join(SIMULATION_DIR, XML_NAME), path)
+    monkeypatch.setattr(P, '_MEMORY_CACHE', {})
+    calls = []
+    parse = P._parse_user_parameters
+    monkeypatch.setattr(P, '_parse_user_parameters', lambda xml: calls.append(xml) or parse(xml))
+    return path, calls
+
+
+def test_disk_cache_reused_by_a_new_process(xml_copy, monkeypatch):
+    path, calls = xml_copy
+    first = P.load_user_parameters(path)
+    assert os.path.exists(P._cache_path(path))
+    monkeypatch.setattr(P, '_MEMORY_CACHE', {})
+    assert P.load_user_parameters(path) == first
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('change', ['schema', 'version'])
+def test_disk_cache_ignored_when_parser_or_schema_changed(xml_copy, monkeypatch, change):
+    path, calls = xml_copy
+    P.load_user_parameters(path)
+    monkeypatch.setattr(P, '_MEMORY_CACHE', {})
+    if change == 'schema':
+        monkeypatch.setitem(P.SCHEMA, 'RT_DoseGy', P.ParamSpec(str))
+    else:
+        monkeypatch.setattr(P, 'PARSER_VERSION', P.PARSER_VERSION + 1)
+    params = P.load_user_parameters(path)
+    assert len(calls) == 2
+    if change == 'schema':
+        # The new schema's parse, not the cached float
+        assert params['RT_DoseGy'] == '2.0'
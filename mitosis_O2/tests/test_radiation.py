@@ -0,0 +1,22 @@
+import numpy as np
+
+from mitosis_O2Radiation import gaussian_beam, shift_dose_maps
+
+
+def test_shift_dose_maps_follows_shifted_content():
+    maps = np.arange(2 * 4 * 5 * 6, dtype=np.float32).reshape(2, 4, 5, 6)
+    shifted = shift_dose_maps(maps, (8, 9, 6), (2, 3, 0))
+    assert shifted.shape == (2, 8, 9, 6)
+    # Old voxel (x, y, z) now sits at (x + 2, y + 3, z)
+    np.testing.assert_array_equal(shifted[:, 2:6, 3:8, :], maps)
+    # Grown voxels repeat the nearest old voxel
+    np.testing.assert_array_equal(shifted[:, 0, 3:8, :], maps[:, 0])
+    np.testing.assert_array_equal(shifted[:, 7, 3:8, :], maps[:, -1])
+    np.testing.assert_array_equal(shifted[:, 2:6, 8, :], maps[:, :, -1])
+
+
+def test_shift_dose_maps_keeps_beam_centred_on_cells():
+    beam = gaussian_beam((20, 20, 20), axis=2, sigma=3.0, center=(10, 10, 10))[None]
+    shifted = shift_dose_maps(beam, (40, 40, 20), (10, 10, 0))
+    peak = np.unravel_index(np.argmax(shifted[0, :, :, 0]), (40, 40))
+    assert peak == (20, 20)
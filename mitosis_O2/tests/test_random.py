@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pytest
+
+from mitosis_O2Random import RandomStreams
+
+
+def draws(streams, name, n):
+    return np.array([streams.stream(name).random() for _ in range(n)])
+
+
+def test_same_seed_gives_same_streams():
+    a, b = RandomStreams(42), RandomStreams(42)
+    # Creation order and other streams' consumption do not matter
+    b.stream('rt').random_batch(5000)
+    np.testing.assert_array_equal(draws(a, 'fate', 3000), draws(b, 'fate', 3000))
+    np.testing.assert_array_equal(a.stream('rt').random_batch(5100)[5000:], b.stream('rt').random_batch(100))
+
+
+def test_streams_differ_by_name_and_seed():
+    a = RandomStreams(42)
+    assert not np.array_equal(draws(a, 'fate', 10), draws(a, 'rt', 10))
+    assert not np.array_equal(draws(RandomStreams(42), 'fate', 10), draws(RandomStreams(43), 'fate', 10))
+
+
+def test_reseed_restarts_existing_streams():
+    streams = RandomStreams(7)
+    fate = streams.stream('fate')
+    first = fate.random_batch(10)
+    streams.reseed(7)
+    np.testing.assert_array_equal(fate.random_batch(10), first)
+
+
+@pytest.mark.parametrize('buffer_size', [1, 7, 1024])
+@pytest.mark.parametrize('chunks', [[1, 3, 1500, 2, 700], [1024, 1024, 1], [5000]])
+def test_batch_draws_match_single_draws(buffer_size, chunks):
+    single = RandomStreams(11).stream('fate')
+    single.buffer_size = buffer_size
+    mixed = RandomStreams(11).stream('fate')
+    mixed.buffer_size = buffer_size
+    total = sum(chunks)
+    expected = np.array([single.random() for _ in range(total)])
+    # Alternate single draws and batches of every size across buffer boundaries
+    got = []
+    for i, n in enumerate(chunks):
+        if i % 2:
+            got.extend(mixed.random() for _ in range(n))
+        else:
+            got.extend(mixed.random_batch(n).tolist())
+    np.testing.assert_array_equal(np.array(got), expected)
+
+
+def test_state_round_trip_mid_buffer():
+    streams = RandomStreams(3)
+    streams.stream('fate').random_batch(10)
+    streams.stream('rt').random()
+    state = json.loads(json.dumps(streams.state()))
+    expected = {name: draws(streams, name, 2000) for name in ('fate', 'rt')}
+    restored = RandomStreams(99)
+    restored.load_state(state)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(draws(restored, name, 2000), values)
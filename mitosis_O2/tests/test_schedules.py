@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from mitosis_O2Params import load_user_parameters
+from mitosis_O2Schedules import fork_point
+from mitosis_O2Sweep import SIMULATION_DIR, XML_NAME
+
+
+@pytest.fixture(scope='module')
+def defaults():
+    # Output every 20 MCS and fate every 5: forks fall on multiples of 20
+    return dict(load_user_parameters(os.path.join(SIMULATION_DIR, XML_NAME)), OutputFrequency=20)
+
+
+def test_fork_defaults_to_earliest_start_on_cadence(defaults):
+    assert fork_point({'parameters': {'RT_StartMCS': [1010, 1500]}}, defaults) == 1000
+    assert fork_point({'fixed': {'RT_StartMCS': 730}}, defaults) == 720
+
+
+def test_explicit_fork_before_every_start(defaults):
+    assert fork_point({'fork_mcs': 1000, 'parameters': {'RT_StartMCS': [1000, 2000]}}, defaults) == 1000
+    assert fork_point({'fork_mcs': 500, 'fixed': {'RT_StartMCS': 800}}, defaults) == 500
+
+
+@pytest.mark.parametrize('spec', [
+    {'fork_mcs': 1000, 'parameters': {'RT_StartMCS': [500, 2000]}},
+    {'fork_mcs': 1000, 'fixed': {'RT_StartMCS': 500}},
+    {'fork_mcs': 1000, 'prefix': {'RT_StartMCS': 500}},
+])
+def test_explicit_fork_after_a_start_is_rejected(defaults, spec):
+    with pytest.raises(ValueError, match='before the fork'):
+        fork_point(spec, defaults)
+
+
+def test_explicit_fork_after_xml_start_is_rejected(defaults):
+    with pytest.raises(ValueError, match='before the fork'):
+        fork_point({'fork_mcs': 1000}, dict(defaults, RT_StartMCS=500))
+
+
+def test_fork_off_cadence_is_rejected(defaults):
+    with pytest.raises(ValueError, match='multiple'):
+        fork_point({'fork_mcs': 1010, 'fixed': {'RT_StartMCS': 2000}}, defaults)
@@ -0,0 +1,103 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from mitosis_O2Oxygen import read_diffusion_config
+from mitosis_O2Output import ColumnarWriter
+from mitosis_O2Params import load_user_parameters
+from mitosis_O2Surrogate import (FREE_CONSTANTS, RIM_NAMES, SUMMARY_NAMES, RadialSurrogate, calibrate, nelder_mead,
+                                 run_spec, simulate)
+from mitosis_O2Sweep import OVERLAY_FILE, SIMULATION_DIR, XML_NAME
+
+XML_PATH = os.path.join(SIMULATION_DIR, XML_NAME)
+SPHEROID = {'InitMode': 'spheres', 'InitCellCount': 200}
+
+
+@pytest.fixture(scope='module')
+def defaults():
+    return load_user_parameters(XML_PATH)
+
+
+def test_run_spec_smoke(defaults):
+    spec = {'mode': 'lhs', 'samples': 64, 'seed': 3, 'fixed': SPHEROID,
+            'parameters': {'GrowthRateNormoxic': [0.5, 3.0], 'O2_Thresh_NormoxicHypoxic': [0.1, 0.3]}}
+    result = run_spec(spec, steps=1500)
+    rows = -(-1500 // int(defaults['OutputFrequency']))
+    assert len(result['run_id']) == 64 * rows
+    for name in SUMMARY_NAMES + RIM_NAMES + ('point', 'param_GrowthRateNormoxic', 'param_SurrogatePacking'):
+        assert result[name].shape == (64 * rows,), name
+    np.testing.assert_array_equal(result['point'], np.repeat(np.arange(64), rows))
+    np.testing.assert_array_equal(result['mcs'].reshape(64, rows)[0], np.arange(rows) * defaults['OutputFrequency'])
+    for name in ('normoxic', 'hypoxic', 'necrotic', 'total_volume', 'o2_mean'):
+        assert np.isfinite(result[name]).all() and (result[name] >= 0).all(), name
+    # Growth rate drives the final size, and the run is deterministic
+    final = result['total_volume'].reshape(64, rows)[:, -1]
+    growth = result['param_GrowthRateNormoxic'].reshape(64, rows)[:, 0]
+    assert np.corrcoef(growth, final)[0, 1] > 0.5
+    np.testing.assert_array_equal(run_spec(spec, steps=1500)['total_volume'], result['total_volume'])
+
+
+def test_pack_conserves_material(defaults):
+    config = read_diffusion_config(XML_PATH)
+    model = RadialSurrogate([defaults | SPHEROID | {'SurrogatePacking': p} for p in (0.6, 0.9, 1.0)], config)
+    rng = np.random.default_rng(0)
+    # Scatter a small spheroid's material over the inner shells
+    model.amounts[:, :, :12] = rng.random((6, 3, 12)) * model.shell_volume[:12]
+    model.amounts[:, :, 12:] = 0.0
+    before = model.amounts.sum(axis=2)
+    model._pack()
+    np.testing.assert_allclose(model.amounts.sum(axis=2), before, rtol=1e-12)
+    assert (model.amounts >= -1e-12).all()
+    # Packed volume fills each shell to the packing density, from the centre out
+    filled = model.amounts[:3].sum(axis=0)
+    capacity = model.packing[:, None] * model.shell_volume
+    assert (filled <= capacity * (1 + 1e-9)).all()
+    full = np.flatnonzero(filled[1] < capacity[1] * (1 - 1e-9))[0]
+    np.testing.assert_allclose(filled[1, :full], capacity[1, :full])
+
+
+def test_simulate_groups_by_init_mode(defaults):
+    sets = [defaults | SPHEROID, defaults | {'InitMode': 'single'}, defaults | SPHEROID | {'GrowthRateNormoxic': 1.0}]
+    mixed = simulate(sets, 600, 20)
+    spheres = simulate([sets[0], sets[2]], 600, 20)
+    single = simulate([sets[1]], 600, 20)
+    for name in ('normoxic', 'total_volume', 'outer_radius'):
+        np.testing.assert_array_equal(mixed[name][[0, 2]], spheres[name])
+        np.testing.assert_array_equal(mixed[name][[1]], single[name])
+
+
+def test_nelder_mead_finds_quadratic_minimum():
+    center = np.array([1.5, -2.0, 0.25])
+    weight = np.array([1.0, 10.0, 0.1])
+    calls = []
+
+    def loss(points):
+        calls.append(len(points))
+        return (weight * (points - center) ** 2).sum(axis=1)
+
+    x, f, iterations = nelder_mead(loss, np.zeros(3), step=0.5, iterations=2000, tol=1e-14, x_tol=1e-8)
+    np.testing.assert_allclose(x, center, atol=1e-5)
+    assert f < 1e-10 and iterations < 2000
+    # Batched: the initial simplex, then four trials (or a shrink) per evaluation
+    assert calls[0] == 4 and max(calls) <= 4
+
+
+def test_calibrate_recovers_uptake_scale(defaults, tmp_path):
+    truth = 2.5
+    params = {**SPHEROID, 'InitCellCount': 400}
+    series = simulate([defaults | params | {'SurrogateUptakeScale': truth}], 1000, 20)
+    path = str(tmp_path / 'summary.cols')
+    writer = ColumnarWriter(path, {name: np.float64 for name in SUMMARY_NAMES})
+    writer.extend(*(series[name][0] for name in SUMMARY_NAMES))
+    writer.close()
+    with open(tmp_path / OVERLAY_FILE, 'w') as fh:
+        json.dump(params, fh)
+
+    fit = calibrate([path], names=['SurrogateUptakeScale'], iterations=60)
+    assert fit['fitted'] == ['SurrogateUptakeScale'] and fit['runs'] == 1
+    assert fit['loss'] < 1e-3 * fit['initial_loss']
+    assert fit['constants']['SurrogateUptakeScale'] == pytest.approx(truth, rel=1e-2)
+    # Constants that were not fitted keep their defaults
+    assert fit['constants']['SurrogatePacking'] == FREE_CONSTANTS['SurrogatePacking'][0]
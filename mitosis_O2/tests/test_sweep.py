@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from mitosis_O2Params import load_user_parameters
+from mitosis_O2Sweep import SIMULATION_DIR, XML_NAME, expand_spec
+
+
+@pytest.fixture(scope='module')
+def defaults():
+    return load_user_parameters(os.path.join(SIMULATION_DIR, XML_NAME))
+
+
+def test_grid_over_categorical_parameter(defaults):
+    runs = expand_spec({'parameters': {'InitMode': ['single', 'spheres'], 'InitCellCount': [10.0, 20.4]}}, defaults)
+    points = [run['params'] for run in runs]
+    assert [p['InitMode'] for p in points] == ['single', 'single', 'spheres', 'spheres']
+    assert [p['InitCellCount'] for p in points] == [10, 20, 10, 20]
+    assert all(type(p['InitCellCount']) is int for p in points)
+
+
+def test_lhs_casts_numeric_parameters(defaults):
+    runs = expand_spec({'mode': 'lhs', 'samples': 8, 'seed': 1,
+                        'parameters': {'InitCellCount': [10, 50], 'InitCellVolume': [20, 40]}}, defaults)
+    assert len(runs) == 8
+    for run in runs:
+        assert type(run['params']['InitCellCount']) is int
+        assert type(run['params']['InitCellVolume']) is float
+        assert 20 <= run['params']['InitCellVolume'] <= 40
+
+
+def test_lhs_rejects_categorical_parameter(defaults):
+    with pytest.raises(ValueError, match='InitMode'):
+        expand_spec({'mode': 'lhs', 'samples': 4, 'parameters': {'InitMode': ['single', 'voronoi']}}, defaults)